@@ -0,0 +1,205 @@
+"""
+Admission control for planning requests.
+
+At most ``max_concurrency`` slots are in use at once; a request takes one
+slot per plan it computes (a batch takes several, up to all of them). Up to
+``max_queue`` more slots' worth of requests wait, each for at most
+``queue_timeout`` seconds; anything beyond that is rejected straight away so
+the server can answer with a fast 503 and ``Retry-After`` instead of letting
+every request's latency grow until clients time out.
+
+Waiting requests are grouped into lanes. Freed slots go to the first waiter
+of the highest-priority non-empty lane, so cheap requests (e.g. plans
+already in the cache) skip the line behind expensive ones. When the queue is
+full, a higher-priority request takes the place of the newest lower-priority
+waiters, which are rejected.
+"""
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Sequence
+import math
+import threading
+import time
+
+from metrics import ADMISSION_REJECTIONS, ADMISSION_WAIT, REGISTRY
+
+# Lanes in priority order; "background" is for work nobody waits on (jobs)
+LANES = ("priority", "default", "background")
+# Longest Retry-After suggested to clients, in seconds.
+MAX_RETRY_AFTER = 60
+# Weight of the newest observation in the moving average of service time.
+SERVICE_TIME_SMOOTHING = 0.1
+
+
+class AdmissionRejected(Exception):
+    """The request was shed; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("event", "weight", "granted", "shed")
+
+    def __init__(self, weight: int):
+        self.event = threading.Event()
+        self.weight = weight
+        self.granted = False
+        self.shed = False
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-aware, prioritised wait queue.
+
+    ``max_concurrency <= 0`` disables admission control. Slots are handed
+    directly from a finishing request to the waiters in order, so a newly
+    arriving request can never overtake one that is already queued.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        lanes: Sequence[str] = LANES,
+        name: str = "plan",
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.lanes = tuple(lanes)
+        self.name = name
+        self.active = 0
+        self._queues: Dict[str, deque] = {lane: deque() for lane in self.lanes}
+        # Slots requested by all waiters, across lanes
+        self._queued_weight = 0
+        self._service_seconds = 0.0
+        self._lock = threading.Lock()
+        REGISTRY.register_collector(f"admission_{name}", self._metrics)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free, from the queue length and service time."""
+        backlog = self._queued_weight + 1
+        estimate = self._service_seconds * backlog / max(self.max_concurrency, 1)
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def acquire(self, lane: str = "default", weight: int = 1) -> float:
+        """Take ``weight`` slots, waiting if needed; returns the seconds spent queued.
+
+        ``weight`` is capped at ``max_concurrency``. Raises
+        :class:`AdmissionRejected` when the queue is full or the slots do not
+        free up within ``queue_timeout``.
+        """
+        weight = self._weight(weight)
+        start = time.monotonic()
+        with self._lock:
+            if self.active + weight <= self.max_concurrency and not self._queued_weight:
+                self.active += weight
+                return 0.0
+            if self._queued_weight + weight > self.max_queue and not self._make_room(lane, weight):
+                self._reject("queue_full", lane)
+            waiter = _Waiter(weight)
+            self._queues[lane].append(waiter)
+            self._queued_weight += weight
+            self._dispatch()
+
+        if not waiter.event.wait(self.queue_timeout):
+            with self._lock:
+                # The slots may have been handed over just after the wait expired
+                if not waiter.granted and not waiter.shed:
+                    self._queues[lane].remove(waiter)
+                    self._queued_weight -= weight
+                    # A smaller waiter behind this one may fit now
+                    self._dispatch()
+                    self._reject("queue_timeout", lane)
+        if waiter.shed:
+            self._reject("queue_full", lane)
+        return time.monotonic() - start
+
+    def _weight(self, weight: int) -> int:
+        return max(1, min(weight, self.max_concurrency))
+
+    def _make_room(self, lane: str, weight: int) -> bool:
+        """Shed the newest lower-lane waiters so ``weight`` more fits in the queue."""
+        needed = self._queued_weight + weight - self.max_queue
+        victims = []
+        for lower in reversed(self.lanes[self.lanes.index(lane) + 1:]):
+            for waiter in reversed(self._queues[lower]):
+                if needed <= 0:
+                    break
+                victims.append((lower, waiter))
+                needed -= waiter.weight
+        if needed > 0:
+            return False
+        for lower, waiter in victims:
+            self._queues[lower].remove(waiter)
+            self._queued_weight -= waiter.weight
+            waiter.shed = True
+            waiter.event.set()
+        return True
+
+    def _dispatch(self):
+        """Hand free slots to waiters in lane and arrival order; call with the lock held."""
+        for lane in self.lanes:
+            queue = self._queues[lane]
+            while queue and self.active + queue[0].weight <= self.max_concurrency:
+                waiter = queue.popleft()
+                self._queued_weight -= waiter.weight
+                self.active += waiter.weight
+                waiter.granted = True
+                waiter.event.set()
+            if queue:
+                # Lower lanes must not overtake a waiter still short of slots
+                return
+
+    def _reject(self, reason: str, lane: str):
+        ADMISSION_REJECTIONS.inc(reason=reason, lane=lane)
+        raise AdmissionRejected(reason, self.retry_after())
+
+    def release(self, service_seconds: float, weight: int = 1):
+        with self._lock:
+            self._service_seconds += SERVICE_TIME_SMOOTHING * (service_seconds - self._service_seconds)
+            self.active -= weight
+            self._dispatch()
+
+    def enter(self, lane: str = "default", weight: int = 1) -> Callable[[], None]:
+        """Take slots like :meth:`admit` and return the function that gives them back.
+
+        For work that outlives the calling frame, such as a streamed response.
+        """
+        if not self.enabled:
+            return lambda: None
+        weight = self._weight(weight)
+        ADMISSION_WAIT.observe(self.acquire(lane, weight), lane=lane)
+        start = time.monotonic()
+        return lambda: self.release(time.monotonic() - start, weight)
+
+    @contextmanager
+    def admit(self, lane: str = "default", weight: int = 1) -> Iterator[None]:
+        """Run the ``with`` block once ``weight`` slots are available."""
+        release = self.enter(lane, weight)
+        try:
+            yield
+        finally:
+            release()
+
+    def _metrics(self):
+        with self._lock:
+            active = self.active
+            queued = {lane: len(queue) for lane, queue in self._queues.items()}
+        labels = {"controller": self.name}
+        return [
+            ("travel_admission_in_flight", "gauge", "Admission slots in use",
+             [("travel_admission_in_flight", labels, active)]),
+            ("travel_admission_queued", "gauge", "Requests waiting for an admission slot",
+             [("travel_admission_queued", {**labels, "lane": lane}, count) for lane, count in queued.items()]),
+        ]
@@ -2,9 +2,13 @@
 Accommodation Agent - Suggests hotels, hostels, and apartment-style stays.
 """
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-from data import MARKET_PROFILES
+from data import MarketCatalog, get_catalog
+from metrics import FALLBACKS
+from .results import AccommodationResult, CityStays
+from .route_planner import trip_route
 
 logger = logging.getLogger(__name__)
 
@@ -12,48 +16,55 @@ logger = logging.getLogger(__name__)
 class AccommodationAgent:
     """Agent responsible for accommodation recommendations."""
 
-    def __init__(self, _=None):
-        self.market_profiles = MARKET_PROFILES
+    def __init__(self, _=None, catalog: Optional[MarketCatalog] = None):
+        self.catalog = catalog or get_catalog()
+        # The catalog is read-only, so each city's stay list is rendered once
+        self.city_stay_lines = lru_cache(maxsize=4096)(self._city_stay_lines)
 
-    def get_accommodation_recommendations(self, itinerary: dict, user_preferences: dict) -> dict:
+    def get_accommodation_recommendations(self, itinerary: dict, user_preferences: dict) -> AccommodationResult:
         """Return curated accommodation ideas for each city."""
         try:
-            recommendations = self._build_accommodation_summary(user_preferences)
+            stays = self._collect_stays(user_preferences)
+            recommendations = self._build_accommodation_summary(user_preferences, stays)
             return {
                 "accommodations": recommendations,
                 "raw_response": recommendations,
                 "preferences": user_preferences,
+                "stays": stays,
             }
         except Exception as exc:
             logger.error("Error getting accommodation recommendations: %s", exc)
+            FALLBACKS.inc(stage="accommodations", reason="agent_error")
             return self._get_fallback_accommodations(user_preferences)
 
     # ------------------------------------------------------------------ helpers
-    def _build_accommodation_summary(self, preferences: dict) -> str:
-        markets: List[str] = preferences.get("recommended_markets", [])
-        if not markets:
-            markets = list(self.market_profiles.keys())[:3]
+    def _collect_stays(self, preferences: dict) -> List[CityStays]:
+        # The cities the itinerary visits, in the same order
+        markets = trip_route(self.catalog, preferences, preferences.get("recommended_markets") or []).order
+
+        return [
+            {
+                "city": city,
+                "options": [
+                    {
+                        "name": option.name,
+                        "type": option.type,
+                        "price": option.price,
+                        "note": option.note,
+                    }
+                    for option in self.catalog.record(city).accommodations
+                ],
+            }
+            for city in markets
+        ]
 
+    def _build_accommodation_summary(self, preferences: dict, stays: List[CityStays]) -> str:
         budget = preferences.get("budget", "Mid-range")
 
         lines = [f"Stay suggestions ({budget} focus):", ""]
 
-        for city in markets:
-            profile = self.market_profiles.get(city, {})
-            lines.append(f"{city}:")
-
-            accommodations = profile.get("accommodations", [])
-            if not accommodations:
-                lines.append("  - Stay inside the old town walls for quick market access.")
-                lines.append("")
-                continue
-
-            for option in accommodations:
-                lines.append(
-                    f"  - {option['name']} ({option['price']}): {option['type']}. {option['note']}"
-                )
-
-            lines.append("")
+        for city_stays in stays:
+            lines.extend(self.city_stay_lines(city_stays["city"]))
 
         lines.extend(
             [
@@ -66,7 +77,20 @@ class AccommodationAgent:
 
         return "\n".join(lines).strip()
 
-    def _get_fallback_accommodations(self, preferences: dict) -> dict:
+    def _city_stay_lines(self, city: str) -> Tuple[str, ...]:
+        lines = [f"{city}:"]
+        options = self.catalog.record(city).accommodations
+
+        if not options:
+            lines.append("  - Stay inside the old town walls for quick market access.")
+
+        for option in options:
+            lines.append(f"  - {option.name} ({option.price}): {option.type}. {option.note}")
+
+        lines.append("")
+        return tuple(lines)
+
+    def _get_fallback_accommodations(self, preferences: dict) -> AccommodationResult:
         """Provide fallback accommodation recommendations."""
         markets = preferences.get("recommended_markets", [])
         text = (
@@ -80,5 +104,6 @@ class AccommodationAgent:
             "accommodations": text,
             "raw_response": text,
             "preferences": preferences,
+            "stays": [],
         }
 
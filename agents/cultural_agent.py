@@ -2,9 +2,13 @@
 Cultural Agent - Provides local insights, food recommendations, events, and cultural tips.
 """
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-from data import MARKET_PROFILES
+from data import MarketCatalog, get_catalog
+from metrics import FALLBACKS
+from .results import CityInsights, CulturalResult
+from .route_planner import trip_route
 
 logger = logging.getLogger(__name__)
 
@@ -12,56 +16,52 @@ logger = logging.getLogger(__name__)
 class CulturalAgent:
     """Agent responsible for cultural information and local insights."""
 
-    def __init__(self, _=None):
-        self.market_profiles = MARKET_PROFILES
+    def __init__(self, _=None, catalog: Optional[MarketCatalog] = None):
+        self.catalog = catalog or get_catalog()
+        # The catalog is read-only, so each city's notes are rendered once
+        self.city_notes = lru_cache(maxsize=4096)(self._city_notes)
 
-    def get_cultural_insights(self, recommended_markets: list, user_preferences: dict) -> dict:
+    def get_cultural_insights(self, recommended_markets: list, user_preferences: dict) -> CulturalResult:
         """Return cultural notes and insider tips for each market."""
         try:
-            insights = self._build_cultural_notes(recommended_markets)
+            cities = self._collect_insights(user_preferences, recommended_markets)
+            insights = self._build_cultural_notes(cities)
             return {
                 "cultural_insights": insights,
                 "raw_response": insights,
                 "preferences": user_preferences,
+                "cities": cities,
             }
         except Exception as exc:
             logger.error("Error getting cultural insights: %s", exc)
+            FALLBACKS.inc(stage="cultural_insights", reason="agent_error")
             return self._get_fallback_cultural_info(recommended_markets)
 
     # ------------------------------------------------------------------ helpers
-    def _build_cultural_notes(self, markets: List[str]) -> str:
-        if not markets:
-            markets = list(self.market_profiles.keys())[:3]
+    def _collect_insights(self, preferences: dict, markets: List[str]) -> List[CityInsights]:
+        # The cities the itinerary visits, in the same order
+        route = trip_route(self.catalog, preferences, markets or [])
+        return [self._city_insight(city) for city in route.order]
 
-        lines = ["Cultural snapshots to keep your trip effortless:", ""]
-
-        for city in markets:
-            profile = self.market_profiles.get(city, {})
-            culture = profile.get("culture", {})
-            foods = profile.get("foods", [])
-            experiences = profile.get("experiences", [])
-
-            lines.append(f"{city}:")
-
-            if foods:
-                lines.append(f"  • Must-try bites: {', '.join(foods[:2])}.")
+    def _city_insight(self, city: str) -> CityInsights:
+        def first(values):
+            return values[0] if values else None
 
-            customs = culture.get("customs", [])
-            if customs:
-                lines.append(f"  • Local tradition: {customs[0]}")
-
-            tips = culture.get("tips", [])
-            if tips:
-                lines.append(f"  • Insider tip: {tips[0]}")
-
-            phrases = culture.get("phrases", [])
-            if phrases:
-                lines.append(f"  • Say it like a local: {phrases[0]}")
+        record = self.catalog.record(city)
+        return {
+            "city": city,
+            "foods": list(record.foods[:2]),
+            "tradition": first(record.culture.customs),
+            "tip": first(record.culture.tips),
+            "phrase": first(record.culture.phrases),
+            "evening": first(record.experiences),
+        }
 
-            if experiences:
-                lines.append(f"  • Evening vibe: {experiences[0]}")
+    def _build_cultural_notes(self, cities: List[CityInsights]) -> str:
+        lines = ["Cultural snapshots to keep your trip effortless:", ""]
 
-            lines.append("")
+        for insight in cities:
+            lines.extend(self.city_notes(insight["city"]))
 
         lines.extend(
             [
@@ -74,7 +74,29 @@ class CulturalAgent:
 
         return "\n".join(lines).strip()
 
-    def _get_fallback_cultural_info(self, markets: list) -> dict:
+    def _city_notes(self, city: str) -> Tuple[str, ...]:
+        insight = self._city_insight(city)
+        lines = [f"{city}:"]
+
+        if insight["foods"]:
+            lines.append(f"  • Must-try bites: {', '.join(insight['foods'])}.")
+
+        if insight["tradition"]:
+            lines.append(f"  • Local tradition: {insight['tradition']}")
+
+        if insight["tip"]:
+            lines.append(f"  • Insider tip: {insight['tip']}")
+
+        if insight["phrase"]:
+            lines.append(f"  • Say it like a local: {insight['phrase']}")
+
+        if insight["evening"]:
+            lines.append(f"  • Evening vibe: {insight['evening']}")
+
+        lines.append("")
+        return tuple(lines)
+
+    def _get_fallback_cultural_info(self, markets: list) -> CulturalResult:
         """Provide fallback cultural information."""
         markets_str = ", ".join(markets) if isinstance(markets, list) else str(markets)
 
@@ -91,5 +113,6 @@ class CulturalAgent:
             "cultural_insights": text,
             "raw_response": text,
             "preferences": {},
+            "cities": [],
         }
 
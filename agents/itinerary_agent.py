@@ -2,48 +2,94 @@
 Itinerary Agent - Creates optimized travel plans and day-by-day itineraries.
 """
 from datetime import datetime, timedelta
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 import logging
 
-from data import MARKET_PROFILES
+from data import MarketCatalog, MarketRecord, get_catalog
+from metrics import FALLBACKS
+from .route_planner import route_planner_for, trip_route
+from .results import Activity, ItineraryDay, ItineraryResult
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _date_heading(date: str) -> str:
+    """``2025-12-15`` -> ``Monday, December 15, 2025``; trips share few dates."""
+    return datetime.strptime(date, "%Y-%m-%d").strftime("%A, %B %d, %Y")
+
+
 class ItineraryAgent:
     """Agent responsible for creating travel itineraries."""
 
-    def __init__(self, _=None):
-        self.market_profiles = MARKET_PROFILES
+    def __init__(self, _=None, catalog: Optional[MarketCatalog] = None):
+        self.catalog = catalog or get_catalog()
+        self.transport_graph = self.catalog.transport_graph
+        self.route_planner = route_planner_for(self.catalog)
+        self.availability = self.catalog.availability
 
-    def create_itinerary(self, user_preferences: dict, recommended_markets: list) -> dict:
+    def create_itinerary(self, user_preferences: dict, recommended_markets: list) -> ItineraryResult:
         """Create a detailed travel itinerary using curated market data."""
         try:
-            itinerary_text = self._build_structured_itinerary(
+            days = self._build_structured_itinerary(
                 user_preferences,
                 recommended_markets,
             )
-            return {
-                "itinerary": itinerary_text,
-                "raw_response": itinerary_text,
-                "preferences": user_preferences,
-            }
+            return self._build_result(days, user_preferences)
         except Exception as exc:
             logger.error("Error creating itinerary: %s", exc)
+            FALLBACKS.inc(stage="itinerary", reason="agent_error")
             return self._get_fallback_itinerary(user_preferences, recommended_markets)
 
     # ------------------------------------------------------------------ helpers
+    def _build_result(self, days: List[ItineraryDay], preferences: dict) -> ItineraryResult:
+        itinerary_text = self._render_itinerary(days)
+        return {
+            "itinerary": itinerary_text,
+            "raw_response": itinerary_text,
+            "preferences": preferences,
+            "days": days,
+        }
+
+    def _render_itinerary(self, days: List[ItineraryDay]) -> str:
+        """Render structured days into the readable itinerary text."""
+        day_sections: List[str] = []
+
+        for day in days:
+            day_lines = [f"Day {day['day']}: {day['city']}"]
+            if day["date"]:
+                day_lines.append(_date_heading(day["date"]))
+
+            if not day["market_open"]:
+                day_lines.append(
+                    f"Note: The {day['city']} Christmas market is closed today — enjoy the old town instead."
+                )
+
+            day_lines.extend(
+                self._format_activity(activity["time"], activity["title"], activity["description"])
+                for activity in day["activities"]
+            )
+
+            if day["travel"]:
+                day_lines.append(f"21:30 Travel - {day['travel']}")
+
+            if day["tip"]:
+                day_lines.append(f"Tip: {day['tip']}")
+
+            day_sections.append("\n".join(day_lines))
+
+        return "\n\n".join(day_sections)
+
     def _build_structured_itinerary(
         self,
         preferences: dict,
         markets: List[str],
-    ) -> str:
-        """Build a readable itinerary leveraging our static market profiles."""
-        if not markets:
-            markets = list(self.market_profiles.keys())[:3]
-
-        total_days = preferences.get("duration_days") or max(3, len(markets))
-        total_days = max(3, min(total_days, 10))
+    ) -> List[ItineraryDay]:
+        """Build structured days leveraging the curated market catalog."""
+        # Cities ordered for the least transfer time, days grouped per city
+        day_cities = list(trip_route(self.catalog, preferences, markets).days)
+        total_days = len(day_cities)
 
         try:
             current_date = (
@@ -54,45 +100,49 @@ class ItineraryAgent:
         except Exception:
             current_date = None
 
-        day_sections: List[str] = []
+        days: List[ItineraryDay] = []
 
-        for index in range(total_days):
-            city = markets[index % len(markets)]
-            profile = self.market_profiles.get(city, {})
-            next_city = markets[(index + 1) % len(markets)] if index + 1 < total_days else None
-
-            day_lines = [f"Day {index + 1}: {city}"]
-            if current_date:
-                day_lines.append(current_date.strftime("%A, %B %d, %Y"))
-
-            day_lines.extend(self._build_day_schedule(city, profile, preferences))
+        for index, city in enumerate(day_cities):
+            record = self.catalog.record(city)
+            next_city = day_cities[index + 1] if index + 1 < total_days else None
 
+            travel = None
             if next_city and next_city != city:
-                connection = self._connection_line(city, next_city)
-                if connection:
-                    day_lines.append(connection)
-
-            tip = profile.get("culture", {}).get("tips", [])
-            if tip:
-                day_lines.append(f"Tip: {tip[index % len(tip)]}")
-
-            day_sections.append("\n".join(day_lines))
+                travel = self._connection_line(city, next_city)
+
+            tips = record.culture.tips
+
+            days.append(
+                {
+                    "day": index + 1,
+                    "city": city,
+                    "date": current_date.strftime("%Y-%m-%d") if current_date else None,
+                    "market_open": (
+                        self.availability.is_open(city, current_date.date())
+                        if current_date
+                        else True
+                    ),
+                    "activities": self._build_day_schedule(city, record, preferences),
+                    "travel": travel,
+                    "tip": tips[index % len(tips)] if tips else None,
+                }
+            )
 
             if current_date:
                 current_date += timedelta(days=1)
 
-        return "\n\n".join(day_sections)
+        return days
 
-    def _build_day_schedule(self, city: str, profile: dict, preferences: dict) -> List[str]:
+    def _build_day_schedule(self, city: str, record: MarketRecord, preferences: dict) -> List[Activity]:
         """Create a morning-afternoon-evening plan for a single day."""
-        signature = profile.get("signature_market", f"{city} Christmas Market")
-        highlights = profile.get("highlights", [])
-        foods = profile.get("foods", [])
-        experiences = profile.get("experiences", [])
-        accommodations = profile.get("accommodations", [])
-        side_trip = profile.get("side_trip")
-
-        def safe_list(lst: List[str], fallback: str) -> str:
+        signature = record.signature_market or f"{city} Christmas Market"
+        highlights = record.highlights
+        foods = record.foods
+        experiences = record.experiences
+        accommodations = record.accommodations
+        side_trip = record.side_trip
+
+        def safe_list(lst, fallback: str) -> str:
             return lst[0] if lst else fallback
 
         morning_food = safe_list(
@@ -104,21 +154,21 @@ class ItineraryAgent:
         evening_activity = safe_list(
             experiences, f"Evening wander through {signature}"
         )
-        stay = accommodations[0]["name"] if accommodations else f"Cozy hotel in {city}"
-        stay_note = accommodations[0]["note"] if accommodations else "Stay near the old town for easy walks."
+        stay = accommodations[0].name if accommodations else f"Cozy hotel in {city}"
+        stay_note = accommodations[0].note if accommodations else "Stay near the old town for easy walks."
 
         schedule = [
-            self._format_activity(
+            self._activity(
                 "09:00",
                 f"Arrive at {signature}",
                 f"Ease into the day with {morning_food} and capture the first light on the stalls.",
             ),
-            self._format_activity(
+            self._activity(
                 "11:30",
                 "Local lunch",
                 f"Grab a seat near the main square and sample seasonal specials inspired by {morning_food}.",
             ),
-            self._format_activity(
+            self._activity(
                 "14:30",
                 "Afternoon highlights",
                 afternoon_highlight,
@@ -127,7 +177,7 @@ class ItineraryAgent:
 
         if side_trip:
             schedule.append(
-                self._format_activity(
+                self._activity(
                     "16:00",
                     "Side adventure",
                     side_trip,
@@ -135,7 +185,7 @@ class ItineraryAgent:
             )
         else:
             schedule.append(
-                self._format_activity(
+                self._activity(
                     "16:00",
                     "Warm-up break",
                     "Step inside a café for hot chocolate and people watching.",
@@ -144,12 +194,12 @@ class ItineraryAgent:
 
         schedule.extend(
             [
-                self._format_activity(
+                self._activity(
                     "18:30",
                     "Golden hour magic",
                     evening_activity,
                 ),
-                self._format_activity(
+                self._activity(
                     "20:30",
                     f"Check into {stay}",
                     stay_note,
@@ -159,36 +209,42 @@ class ItineraryAgent:
 
         return schedule
 
+    def _activity(self, time: str, title: str, description: str = "") -> Activity:
+        return {"time": time, "title": title, "description": description}
+
     def _format_activity(self, time: str, title: str, description: str) -> str:
         """Helper to keep activity formatting consistent."""
+        if not description:
+            return f"{time} {title}"
         return f"{time} {title} - {description}"
 
     def _connection_line(self, current_city: str, next_city: str) -> str:
         """Look up suggested transport between two cities."""
-        profile = self.market_profiles.get(current_city, {})
-        connections = profile.get("transport", {}).get("connections", [])
+        description = self.transport_graph.describe(current_city, next_city)
+        if description:
+            return description
 
-        for conn in connections:
-            if current_city in conn and next_city in conn:
-                return f"21:30 Travel - {conn}"
+        return f"Evening transfer to {next_city} (book tickets in advance)."
 
-        return f"21:30 Travel - Evening transfer to {next_city} (book tickets in advance)."
-
-    def _get_fallback_itinerary(self, preferences: dict, markets: list) -> dict:
+    def _get_fallback_itinerary(self, preferences: dict, markets: list) -> ItineraryResult:
         """Provide a fallback itinerary."""
-        markets = markets or list(self.market_profiles.keys())[:3]
-        sections = []
+        markets = markets or list(self.catalog.cities[:3])
+        days: List[ItineraryDay] = []
         for idx, market in enumerate(markets[:3], start=1):
-            sections.append(
-                f"Day {idx}: {market}\n"
-                f"09:00 Explore the main Christmas market and sample local treats.\n"
-                f"13:00 Visit nearby museums and warm cafés.\n"
-                f"18:00 Enjoy evening lights before settling into your hotel."
+            days.append(
+                {
+                    "day": idx,
+                    "city": market,
+                    "date": None,
+                    "market_open": True,
+                    "activities": [
+                        self._activity("09:00", "Explore the main Christmas market and sample local treats."),
+                        self._activity("13:00", "Visit nearby museums and warm cafés."),
+                        self._activity("18:00", "Enjoy evening lights before settling into your hotel."),
+                    ],
+                    "travel": None,
+                    "tip": None,
+                }
             )
 
-        itinerary = "\n\n".join(sections)
-        return {
-            "itinerary": itinerary,
-            "raw_response": itinerary,
-            "preferences": preferences,
-        }
+        return self._build_result(days, preferences)
@@ -1,12 +1,15 @@
 """
 Market Recommendation Agent - Suggests Christmas markets based on user preferences.
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional
 
 import logging
 
 from config import CHRISTMAS_MARKETS
-from data import MARKET_PROFILES
+from data import MarketCatalog, MarketRecord, get_catalog
+from metrics import FALLBACKS
+from .market_scoring import MarketScoringEngine
+from .results import MarketRecommendationResult, RankedMarket
 
 logger = logging.getLogger(__name__)
 
@@ -14,15 +17,16 @@ logger = logging.getLogger(__name__)
 class MarketRecommendationAgent:
     """Agent responsible for recommending Christmas markets."""
 
-    def __init__(self, _=None):
+    def __init__(self, _=None, catalog: Optional[MarketCatalog] = None):
         """
         Initialize the market recommendation agent.
         Gemini is optional – we use curated data when no model is configured.
         """
         self.markets = CHRISTMAS_MARKETS
-        self.market_profiles = MARKET_PROFILES
+        self.catalog = catalog or get_catalog()
+        self.scoring_engine = MarketScoringEngine(self.catalog)
 
-    def recommend_markets(self, user_preferences: dict) -> dict:
+    def recommend_markets(self, user_preferences: dict) -> MarketRecommendationResult:
         """
         Recommend Christmas markets based on user preferences.
         """
@@ -31,88 +35,106 @@ class MarketRecommendationAgent:
             if not top_markets:
                 raise ValueError("No markets scored.")
 
-            formatted = self._format_recommendations(top_markets, user_preferences)
-            return {
-                "recommendations": formatted,
-                "raw_response": formatted,
-                "user_preferences": user_preferences,
-            }
+            return self._build_result(top_markets, user_preferences)
         except Exception as exc:
             logger.error("Error in market recommendation: %s", exc)
+            FALLBACKS.inc(stage="market_recommendations", reason="agent_error")
             fallback = self._get_fallback_recommendations(user_preferences)
             return fallback
 
+    def recommend_markets_batch(self, preferences_batch: List[dict]) -> List[MarketRecommendationResult]:
+        """Batch counterpart of :meth:`recommend_markets` with a single scoring pass."""
+        try:
+            scored = self.score_markets_batch(preferences_batch)
+        except Exception as exc:
+            logger.error("Error in batch market scoring: %s", exc)
+            return [self.recommend_markets(preferences) for preferences in preferences_batch]
+
+        results: List[MarketRecommendationResult] = []
+        for preferences, top_markets in zip(preferences_batch, scored):
+            if top_markets:
+                results.append(self._build_result(top_markets, preferences))
+            else:
+                logger.error("Error in market recommendation: No markets scored.")
+                FALLBACKS.inc(stage="market_recommendations", reason="agent_error")
+                results.append(self._get_fallback_recommendations(preferences))
+        return results
+
     # ------------------------------------------------------------------ helpers
     def _score_markets(self, preferences: dict) -> List[Dict]:
         """Score markets using static knowledge and user interests."""
-        interests = preferences.get("interests", [])
-        budget = (preferences.get("budget") or "").lower()
-        pace = preferences.get("pace", "moderate")
-        duration_days = preferences.get("duration_days", 5)
-
-        scored: List[Tuple[str, float]] = []
-
-        for city, profile in self.market_profiles.items():
-            score = 50.0
-
-            # Interests
-            for interest in interests:
-                if interest in profile.get("best_for", []):
-                    score += 8
-
-            # Budget alignment
-            price_level = profile.get("price_level", "")
-            if budget.startswith("budget") and price_level == "budget":
-                score += 6
-            elif budget.startswith("mid") and price_level == "mid":
-                score += 6
-            elif budget.startswith("lux") and price_level in {"premium", "luxury"}:
-                score += 6
-
-            # Travel pace
-            if pace == profile.get("ideal_pace"):
-                score += 5
-
-            # Seasonal availability boost for longer trips (encourage variety)
-            score += min(duration_days, 8) * 0.8
-
-            scored.append(
+        return self.score_markets_batch([preferences])[0]
+
+    def score_markets_batch(self, preferences_batch: List[dict], limit: int = 5) -> List[List[Dict]]:
+        """Score many preference sets in one pass and keep the top ``limit`` of each."""
+        engine = self.scoring_engine
+        return [
+            [
                 {
-                    "city": city,
+                    "city": engine.cities[index],
                     "score": score,
-                    "profile": profile,
+                    "record": engine.records[index],
                 }
-            )
-
-        scored.sort(key=lambda item: item["score"], reverse=True)
-        return scored[:5]
+                for index, score in top
+            ]
+            for top in engine.top_k(preferences_batch, limit)
+        ]
 
-    def _format_recommendations(
+    def _build_result(
         self, markets: List[Dict], preferences: dict
-    ) -> str:
+    ) -> MarketRecommendationResult:
+        ranked = self._rank_markets(markets)
+        formatted = self._format_recommendations(ranked)
+        return {
+            "recommendations": formatted,
+            "raw_response": formatted,
+            "user_preferences": preferences,
+            "markets": [item["city"] for item in ranked],
+            "ranked": ranked,
+        }
+
+    def _rank_markets(self, markets: List[Dict]) -> List[RankedMarket]:
+        """Turn scored catalog records into the structured ranking."""
+        ranked: List[RankedMarket] = []
+        for index, item in enumerate(markets, start=1):
+            record: MarketRecord = item["record"]
+            ranked.append(
+                {
+                    "rank": index,
+                    "city": item["city"],
+                    "country": record.country,
+                    "dates": record.dates,
+                    "score": item["score"],
+                    "summary": record.summary,
+                    "highlight": record.highlights[0] if record.highlights else None,
+                    "foods": list(record.foods[:2]),
+                    "best_for": list(record.best_for),
+                }
+            )
+        return ranked
+
+    def _format_recommendations(self, ranked: List[RankedMarket]) -> str:
         """Format recommendations into human-friendly text."""
         lines = [
             "Top Christmas markets selected for your wish list:",
             "",
         ]
 
-        for index, item in enumerate(markets, start=1):
-            profile = item["profile"]
+        for item in ranked:
             lines.append(
-                f"{index}. {item['city']} ({profile['country']}) – {profile['dates']}"
+                f"{item['rank']}. {item['city']} ({item['country']}) – {item['dates']}"
             )
-            lines.append(f"   Why it fits: {profile['summary']}")
+            lines.append(f"   Why it fits: {item['summary']}")
 
-            highlights = profile.get("highlights", [])
-            if highlights:
-                lines.append(f"   Don't miss: {highlights[0]}")
+            if item["highlight"]:
+                lines.append(f"   Don't miss: {item['highlight']}")
 
-            foods = profile.get("foods", [])
+            foods = item["foods"]
             if foods:
                 lines.append(f"   Taste: {foods[0]} & {foods[1] if len(foods) > 1 else foods[0]}")
 
             lines.append(
-                f"   Best for: {', '.join(profile.get('best_for', []))}"
+                f"   Best for: {', '.join(item['best_for'])}"
             )
             lines.append("")
 
@@ -122,7 +144,7 @@ class MarketRecommendationAgent:
 
         return "\n".join(lines).strip()
 
-    def _get_fallback_recommendations(self, preferences: dict) -> dict:
+    def _get_fallback_recommendations(self, preferences: dict) -> MarketRecommendationResult:
         """Provide fallback recommendations if scoring fails."""
         default_markets = ["Nuremberg", "Munich", "Vienna", "Strasbourg", "Prague"]
         default_profile = {
@@ -133,21 +155,16 @@ class MarketRecommendationAgent:
             "highlights": [],
             "foods": [],
         }
-        recommendations = self._format_recommendations(
+        return self._build_result(
             [
                 {
                     "city": city,
                     "score": 0,
-                    "profile": self.market_profiles.get(city, default_profile),
+                    "record": self.catalog.get(city)
+                    or MarketRecord.from_profile(-1, city, default_profile),
                 }
                 for city in default_markets
             ],
             preferences,
         )
 
-        return {
-            "recommendations": recommendations,
-            "raw_response": recommendations,
-            "user_preferences": preferences,
-        }
-
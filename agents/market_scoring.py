@@ -0,0 +1,147 @@
+"""
+Vectorized market scoring.
+
+The market catalog is compiled once into feature matrices so a whole batch of
+preference sets can be scored with a single matrix product.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from data import MarketCatalog, trip_window
+
+INTEREST_WEIGHT = 8.0
+BUDGET_WEIGHT = 6.0
+PACE_WEIGHT = 5.0
+BASE_SCORE = 50.0
+
+# Budget tiers, keyed by the prefix of the user's budget label, and the
+# price levels each tier matches.
+BUDGET_TIERS: Tuple[Tuple[str, frozenset], ...] = (
+    ("budget", frozenset({"budget"})),
+    ("mid", frozenset({"mid"})),
+    ("lux", frozenset({"premium", "luxury"})),
+)
+
+
+class MarketScoringEngine:
+    """Scores preference sets against every catalog market at once.
+
+    Features per market:
+      * a one-hot ``best_for`` matrix (markets x interest vocabulary)
+      * a budget-match matrix (budget tiers x markets) from ``price_level``
+      * a pace-match matrix (paces x markets) from ``ideal_pace``
+
+    Markets closed for the whole trip window are masked out before ranking.
+    """
+
+    def __init__(self, catalog: MarketCatalog):
+        self.catalog = catalog
+        self.cities: Tuple[str, ...] = catalog.cities
+        self.records = catalog.records
+        self.availability = catalog.availability
+
+        vocabulary: Dict[str, int] = {}
+        paces: Dict[str, int] = {}
+        for record in self.records:
+            for interest in record.best_for:
+                vocabulary.setdefault(interest, len(vocabulary))
+            if record.ideal_pace:
+                paces.setdefault(record.ideal_pace, len(paces))
+        self.vocabulary = vocabulary
+        self.paces = paces
+
+        count = len(self.cities)
+        self.interest_matrix = np.zeros((count, len(vocabulary)), dtype=np.float64)
+        # The extra trailing row is all zeros and stands for "no match".
+        self.budget_matrix = np.zeros((len(BUDGET_TIERS) + 1, count), dtype=np.float64)
+        self.pace_matrix = np.zeros((len(paces) + 1, count), dtype=np.float64)
+
+        for column, record in enumerate(self.records):
+            for interest in set(record.best_for):
+                self.interest_matrix[column, vocabulary[interest]] = 1.0
+            for row, (_, levels) in enumerate(BUDGET_TIERS):
+                if record.price_level in levels:
+                    self.budget_matrix[row, column] = 1.0
+            if record.ideal_pace:
+                self.pace_matrix[paces[record.ideal_pace], column] = 1.0
+
+    def encode(self, preferences_batch: Sequence[dict]):
+        """Encode preference dicts into interest counts, budget rows, pace rows and bonuses."""
+        size = len(preferences_batch)
+        interests = np.zeros((size, len(self.vocabulary)), dtype=np.float64)
+        budget_rows = np.full(size, len(BUDGET_TIERS), dtype=np.intp)
+        pace_rows = np.full(size, len(self.paces), dtype=np.intp)
+        bonuses = np.zeros(size, dtype=np.float64)
+
+        for row, preferences in enumerate(preferences_batch):
+            for interest in preferences.get("interests") or []:
+                column = self.vocabulary.get(interest)
+                if column is not None:
+                    interests[row, column] += 1.0
+
+            budget = (preferences.get("budget") or "").lower()
+            for tier, (prefix, _) in enumerate(BUDGET_TIERS):
+                if budget.startswith(prefix):
+                    budget_rows[row] = tier
+                    break
+
+            pace_rows[row] = self.paces.get(preferences.get("pace", "moderate"), len(self.paces))
+
+            # Seasonal availability boost for longer trips (encourage variety)
+            duration_days = preferences.get("duration_days") or 5
+            bonuses[row] = min(duration_days, 8) * 0.8
+
+        return interests, budget_rows, pace_rows, bonuses
+
+    def score(self, preferences_batch: Sequence[dict]) -> np.ndarray:
+        """Return a (batch x markets) score matrix."""
+        interests, budget_rows, pace_rows, bonuses = self.encode(preferences_batch)
+        scores = BASE_SCORE + INTEREST_WEIGHT * (interests @ self.interest_matrix.T)
+        scores += BUDGET_WEIGHT * self.budget_matrix[budget_rows]
+        scores += PACE_WEIGHT * self.pace_matrix[pace_rows]
+        scores += bonuses[:, None]
+
+        for row, preferences in enumerate(preferences_batch):
+            window = trip_window(preferences)
+            if window is None:
+                continue
+            open_ids = self.availability.overlapping(*window)
+            # If nothing is open (e.g. a summer trip) keep every market rather
+            # than recommending nothing.
+            if open_ids and len(open_ids) < len(self.cities):
+                mask = np.full(len(self.cities), -np.inf)
+                mask[open_ids] = 0.0
+                scores[row] += mask
+        return scores
+
+    def top_k(self, preferences_batch: Sequence[dict], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Return the ``k`` best ``(market index, score)`` pairs for each preference set.
+
+        Ties keep catalog order, matching a stable sort on descending score.
+        """
+        if not self.cities or not preferences_batch:
+            return [[] for _ in preferences_batch]
+
+        scores = self.score(preferences_batch)
+        k = min(k, scores.shape[1])
+        results = []
+        for row in scores:
+            if k < row.shape[0]:
+                # argpartition does not keep ties in order, so take every market
+                # above the k-th best score plus the earliest ones tied with it.
+                threshold = row[np.argpartition(-row, k - 1)[k - 1]]
+                above = np.flatnonzero(row > threshold)
+                tied = np.flatnonzero(row == threshold)[: k - above.shape[0]]
+                candidates = np.concatenate((above, tied))
+            else:
+                candidates = np.arange(row.shape[0])
+            order = np.lexsort((candidates, -row[candidates]))[:k]
+            results.append(
+                [
+                    (int(candidates[i]), float(row[candidates[i]]))
+                    for i in order
+                    if np.isfinite(row[candidates[i]])
+                ]
+            )
+        return results
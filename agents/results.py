@@ -0,0 +1,106 @@
+"""
+Structured results returned by the agents.
+
+Every agent returns a plain dict so plans stay JSON-serialisable. Alongside the
+rendered text (kept for the UI and CLI), each result carries the structured data
+the text was rendered from, so the orchestrator never has to parse prose.
+"""
+from typing import List, Optional, TypedDict
+
+
+class RankedMarket(TypedDict):
+    rank: int
+    city: str
+    country: str
+    dates: str
+    score: float
+    summary: str
+    highlight: Optional[str]
+    foods: List[str]
+    best_for: List[str]
+
+
+class MarketRecommendationResult(TypedDict):
+    recommendations: str
+    raw_response: str
+    user_preferences: dict
+    markets: List[str]
+    ranked: List[RankedMarket]
+
+
+class Activity(TypedDict):
+    time: str
+    title: str
+    description: str
+
+
+class ItineraryDay(TypedDict):
+    day: int
+    city: str
+    date: Optional[str]
+    market_open: bool
+    activities: List[Activity]
+    travel: Optional[str]
+    tip: Optional[str]
+
+
+class ItineraryResult(TypedDict):
+    itinerary: str
+    raw_response: str
+    preferences: dict
+    days: List[ItineraryDay]
+
+
+class Connection(TypedDict):
+    origin: str
+    destination: str
+    description: str
+
+
+class LocalTip(TypedDict):
+    city: str
+    tip: str
+
+
+class TransportResult(TypedDict):
+    transport_options: str
+    raw_response: str
+    preferences: dict
+    arrival: str
+    connections: List[Connection]
+    local_tips: List[LocalTip]
+
+
+class StayOption(TypedDict):
+    name: str
+    type: str
+    price: str
+    note: str
+
+
+class CityStays(TypedDict):
+    city: str
+    options: List[StayOption]
+
+
+class AccommodationResult(TypedDict):
+    accommodations: str
+    raw_response: str
+    preferences: dict
+    stays: List[CityStays]
+
+
+class CityInsights(TypedDict):
+    city: str
+    foods: List[str]
+    tradition: Optional[str]
+    tip: Optional[str]
+    phrase: Optional[str]
+    evening: Optional[str]
+
+
+class CulturalResult(TypedDict):
+    cultural_insights: str
+    raw_response: str
+    preferences: dict
+    cities: List[CityInsights]
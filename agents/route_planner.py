@@ -0,0 +1,186 @@
+"""
+Route planning for multi-city trips.
+
+Orders the cities of a trip to minimise total transfer time and splits the
+trip's days into consecutive blocks per city.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import threading
+import weakref
+
+from data import AvailabilityIndex, MarketCatalog, TransportGraph, trip_window
+
+# Cost of a hop the connection graph cannot route (keeps such hops last resort).
+UNREACHABLE_MINUTES = 24 * 60
+# Up to this many cities the order is solved exactly (Held-Karp); above it,
+# nearest-neighbour + 2-opt keeps planning fast.
+EXACT_LIMIT = 8
+MIN_TRIP_DAYS = 3
+MAX_TRIP_DAYS = 10
+
+
+class RoutePlan(NamedTuple):
+    order: Tuple[str, ...]
+    days: Tuple[str, ...]
+
+
+def trip_length(preferences: dict, markets: Sequence[str]) -> int:
+    """Number of itinerary days for a request (clamped to 3-10)."""
+    total_days = preferences.get("duration_days") or max(MIN_TRIP_DAYS, len(markets))
+    return max(MIN_TRIP_DAYS, min(total_days, MAX_TRIP_DAYS))
+
+
+class RoutePlanner:
+    """Finds a travel-time-optimal visiting order over a transport graph."""
+
+    def __init__(self, graph: TransportGraph, exact_limit: int = EXACT_LIMIT):
+        self.graph = graph
+        self.exact_limit = exact_limit
+        self.order = lru_cache(maxsize=4096)(self._order)
+
+    def plan(self, markets: Sequence[str], total_days: int) -> RoutePlan:
+        """Pick the cities that fit into ``total_days``, order them and assign days.
+
+        Markets are given best first; when there are more markets than days the
+        lower-ranked ones are dropped, and spare days go to the higher-ranked
+        cities.
+        """
+        visited = tuple(dict.fromkeys(markets))[:total_days]
+        if not visited:
+            return RoutePlan((), ())
+
+        order = self.order(visited)
+        base, extra = divmod(total_days, len(visited))
+        rank = {city: index for index, city in enumerate(visited)}
+
+        days: List[str] = []
+        for city in order:
+            days.extend([city] * (base + (1 if rank[city] < extra else 0)))
+        return RoutePlan(order, tuple(days))
+
+    def total_minutes(self, order: Sequence[str]) -> int:
+        return sum(self._cost(a, b) for a, b in zip(order, order[1:]))
+
+    def _cost(self, origin: str, destination: str) -> int:
+        minutes = self.graph.minutes(origin, destination)
+        return UNREACHABLE_MINUTES if minutes is None else minutes
+
+    def _order(self, cities: Tuple[str, ...]) -> Tuple[str, ...]:
+        if len(cities) <= 2:
+            return cities
+
+        costs = [[self._cost(a, b) for b in cities] for a in cities]
+        if len(cities) <= self.exact_limit:
+            path = self._held_karp(costs)
+        else:
+            path = self._two_opt(self._nearest_neighbour(costs), costs)
+
+        # Both directions cost the same; start closer to the top recommendation.
+        if path[-1] < path[0]:
+            path.reverse()
+        return tuple(cities[index] for index in path)
+
+    @staticmethod
+    def _held_karp(costs: List[List[int]]) -> List[int]:
+        """Exact shortest open path visiting every city once."""
+        size = len(costs)
+        full = (1 << size) - 1
+        best: List[List[Optional[int]]] = [[None] * size for _ in range(1 << size)]
+        parent = [[-1] * size for _ in range(1 << size)]
+        for city in range(size):
+            best[1 << city][city] = 0
+
+        for mask in range(1, full + 1):
+            row = best[mask]
+            for last in range(size):
+                cost = row[last]
+                if cost is None:
+                    continue
+                for nxt in range(size):
+                    if mask & (1 << nxt):
+                        continue
+                    candidate = cost + costs[last][nxt]
+                    target = best[mask | (1 << nxt)]
+                    if target[nxt] is None or candidate < target[nxt]:
+                        target[nxt] = candidate
+                        parent[mask | (1 << nxt)][nxt] = last
+
+        last = min(range(size), key=lambda city: (best[full][city], city))
+        path, mask = [], full
+        while last != -1:
+            path.append(last)
+            last, mask = parent[mask][last], mask & ~(1 << last)
+        return path[::-1]
+
+    @staticmethod
+    def _nearest_neighbour(costs: List[List[int]]) -> List[int]:
+        path = [0]
+        remaining = set(range(1, len(costs)))
+        while remaining:
+            last = path[-1]
+            nxt = min(remaining, key=lambda city: (costs[last][city], city))
+            path.append(nxt)
+            remaining.remove(nxt)
+        return path
+
+    @staticmethod
+    def _two_opt(path: List[int], costs: List[List[int]]) -> List[int]:
+        """Reverse segments while that shortens the open path."""
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(path) - 1):
+                for j in range(i + 1, len(path)):
+                    before = costs[path[i - 1]][path[i]] if i > 0 else 0
+                    after = costs[path[j]][path[j + 1]] if j + 1 < len(path) else 0
+                    swapped_before = costs[path[i - 1]][path[j]] if i > 0 else 0
+                    swapped_after = costs[path[i]][path[j + 1]] if j + 1 < len(path) else 0
+                    if swapped_before + swapped_after < before + after:
+                        path[i:j + 1] = reversed(path[i:j + 1])
+                        improved = True
+        return path
+
+
+_planners: "weakref.WeakKeyDictionary[MarketCatalog, RoutePlanner]" = weakref.WeakKeyDictionary()
+_planners_lock = threading.Lock()
+
+
+def route_planner_for(catalog: MarketCatalog) -> RoutePlanner:
+    """Planner over the catalog's transport graph, shared by all agents using it."""
+    with _planners_lock:
+        planner = _planners.get(catalog)
+        if planner is None:
+            planner = RoutePlanner(catalog.transport_graph)
+            _planners[catalog] = planner
+        return planner
+
+
+def trip_route(catalog: MarketCatalog, preferences: dict, markets: Sequence[str]) -> RoutePlan:
+    """The route of a request as every section presents it.
+
+    With trip dates, markets closed for the whole trip are skipped and the
+    route runs in whichever direction lands on fewer closed market days
+    (travel time is the same both ways).
+    """
+    markets = list(markets) or list(catalog.cities[:3])
+    window = trip_window(preferences)
+    if window:
+        markets = catalog.availability.open_during(markets, *window) or markets
+
+    route = route_planner_for(catalog).plan(markets, trip_length(preferences, markets))
+    if window:
+        reverse = RoutePlan(route.order[::-1], route.days[::-1])
+        if _closed_days(catalog.availability, reverse.days, window[0]) < _closed_days(
+            catalog.availability, route.days, window[0]
+        ):
+            route = reverse
+    return route
+
+
+def _closed_days(availability: AvailabilityIndex, day_cities: Sequence[str], start: date) -> int:
+    return sum(
+        not availability.is_open(city, start + timedelta(days=offset))
+        for offset, city in enumerate(day_cities)
+    )
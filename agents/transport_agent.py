@@ -2,9 +2,13 @@
 Transport Agent - Provides transportation options and recommendations.
 """
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Optional
 
-from data import MARKET_PROFILES
+from data import MarketCatalog, get_catalog
+from metrics import FALLBACKS
+from .route_planner import route_planner_for, trip_route
+from .results import Connection, LocalTip, TransportResult
 
 logger = logging.getLogger(__name__)
 
@@ -12,46 +16,76 @@ logger = logging.getLogger(__name__)
 class TransportAgent:
     """Agent responsible for transportation recommendations."""
 
-    def __init__(self, _=None):
-        self.market_profiles = MARKET_PROFILES
+    def __init__(self, _=None, catalog: Optional[MarketCatalog] = None):
+        self.catalog = catalog or get_catalog()
+        self.transport_graph = self.catalog.transport_graph
+        self.route_planner = route_planner_for(self.catalog)
+        # The catalog is read-only, so each city's tip is looked up once
+        self.local_tip = lru_cache(maxsize=4096)(self._local_tip)
 
-    def get_transport_options(self, itinerary: dict, user_preferences: dict) -> dict:
+    def get_transport_options(self, itinerary: dict, user_preferences: dict) -> TransportResult:
         """Return transport guidance using curated rail and flight tips."""
         try:
-            plan = self._build_transport_plan(user_preferences)
-            return {
-                "transport_options": plan,
-                "raw_response": plan,
-                "preferences": user_preferences,
-            }
+            return self._build_transport_plan(user_preferences)
         except Exception as exc:
             logger.error("Error getting transport options: %s", exc)
+            FALLBACKS.inc(stage="transport", reason="agent_error")
             return self._get_fallback_transport(user_preferences)
 
     # ------------------------------------------------------------------ helpers
-    def _build_transport_plan(self, preferences: dict) -> str:
-        markets: List[str] = preferences.get("recommended_markets", [])
-        if not markets:
-            markets = list(self.market_profiles.keys())[:3]
+    def _build_transport_plan(self, preferences: dict) -> TransportResult:
+        # Follow the same visiting order as the itinerary
+        markets: List[str] = list(
+            trip_route(self.catalog, preferences, preferences.get("recommended_markets") or []).order
+        )
+
+        arrival = (
+            self.catalog.record(markets[0]).transport.arrival
+            or f"Book a flight into the nearest major airport for {markets[0]} and connect by rail."
+        )
+
+        connections: List[Connection] = [
+            {
+                "origin": markets[i],
+                "destination": markets[i + 1],
+                "description": self._connection_text(markets[i], markets[i + 1]),
+            }
+            for i in range(len(markets) - 1)
+        ]
 
-        departure = preferences.get("departure_city", "your city")
-        first_profile = self.market_profiles.get(markets[0], {})
+        local_tips: List[LocalTip] = [{"city": city, "tip": self.local_tip(city)} for city in markets]
 
+        plan = self._render_transport_plan(
+            preferences.get("departure_city", "your city"),
+            arrival,
+            connections,
+            local_tips,
+        )
+        return {
+            "transport_options": plan,
+            "raw_response": plan,
+            "preferences": preferences,
+            "arrival": arrival,
+            "connections": connections,
+            "local_tips": local_tips,
+        }
+
+    def _render_transport_plan(
+        self,
+        departure: str,
+        arrival: str,
+        connections: List[Connection],
+        local_tips: List[LocalTip],
+    ) -> str:
         lines = [
             f"Arriving from {departure}:",
-            first_profile.get(
-                "transport", {}
-            ).get(
-                "arrival",
-                f"Book a flight into the nearest major airport for {markets[0]} and connect by rail.",
-            ),
+            arrival,
             "",
             "Inter-city connections:",
         ]
 
-        for i in range(len(markets) - 1):
-            step = self._connection_text(markets[i], markets[i + 1])
-            lines.append(f"- {step}")
+        for connection in connections:
+            lines.append(f"- {connection['description']}")
 
         lines.extend(
             [
@@ -60,12 +94,8 @@ class TransportAgent:
             ]
         )
 
-        for city in markets:
-            profile = self.market_profiles.get(city, {})
-            local_tip = profile.get("transport", {}).get(
-                "local", "Compact old town — walk everywhere."
-            )
-            lines.append(f"• {city}: {local_tip}")
+        for local_tip in local_tips:
+            lines.append(f"• {local_tip['city']}: {local_tip['tip']}")
 
         lines.extend(
             [
@@ -79,17 +109,19 @@ class TransportAgent:
 
         return "\n".join(lines)
 
-    def _connection_text(self, current_city: str, next_city: str) -> str:
-        profile = self.market_profiles.get(current_city, {})
-        connections = profile.get("transport", {}).get("connections", [])
+    def _local_tip(self, city: str) -> str:
+        return self.catalog.record(city).transport.local or "Compact old town — walk everywhere."
 
-        for conn in connections:
-            if current_city in conn and next_city in conn:
-                return conn
+    def _connection_text(self, current_city: str, next_city: str) -> str:
+        # Direct entries keep their curated wording; otherwise the fastest
+        # multi-hop route through the connection graph is described.
+        description = self.transport_graph.describe(current_city, next_city)
+        if description:
+            return description
 
         return f"{current_city} → {next_city}: Regional train or FlixBus (1-3h depending on service)."
 
-    def _get_fallback_transport(self, preferences: dict) -> dict:
+    def _get_fallback_transport(self, preferences: dict) -> TransportResult:
         """Provide fallback transport information."""
         text = (
             f"Recommended transportation from {preferences.get('departure_city', 'your city')}:\n"
@@ -101,4 +133,7 @@ class TransportAgent:
             "transport_options": text,
             "raw_response": text,
             "preferences": preferences,
+            "arrival": "",
+            "connections": [],
+            "local_tips": [],
         }
@@ -2,12 +2,34 @@
 Flask API server for the Christmas Market Travel Agent.
 Provides REST API endpoints for the frontend UI.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from travel_agent import ChristmasMarketTravelAgent
-from config import GEMINI_API_KEY
+from admission import AdmissionController, AdmissionRejected
+from config import (
+    CHRISTMAS_MARKETS,
+    GEMINI_API_KEY,
+    MARKETS_PAGE_SIZE,
+    PLAN_BATCH_MAX_SIZE,
+    PLAN_JOB_MAX_PENDING,
+    PLAN_JOB_MAX_STORED,
+    PLAN_JOB_STORE_PATH,
+    PLAN_JOB_TTL_SECONDS,
+    PLAN_JOB_WORKERS,
+    PLAN_MAX_CONCURRENCY,
+    PLAN_MAX_QUEUE,
+    PLAN_QUEUE_TIMEOUT_SECONDS,
+)
+from jobs import JobRunner, JobStore
+from metrics import REGISTRY
+from plan_format import SECTION_TEXT_FIELDS, compact_plan, dumps, parse_fields, project, raw_plan, section_text
+from datetime import datetime, timezone
+from functools import lru_cache
+import base64
+import hashlib
 import logging
 import os
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,13 +38,98 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
 
-# Initialize the travel agent
-try:
-    travel_agent = ChristmasMarketTravelAgent(GEMINI_API_KEY)
-    logger.info("Travel agent initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize travel agent: {str(e)}")
-    travel_agent = None
+# The travel agent (and with it numpy, the catalog and the Gemini client) is
+# built on first use, so the server starts listening without waiting for it.
+_travel_agent = None
+_travel_agent_failed = False
+_travel_agent_lock = threading.Lock()
+
+
+def get_travel_agent():
+    """Return the shared travel agent, building it on the first call.
+    
+    Returns ``None`` if construction failed; the failure is logged once.
+    """
+    global _travel_agent, _travel_agent_failed
+    if _travel_agent is None and not _travel_agent_failed:
+        with _travel_agent_lock:
+            if _travel_agent is None and not _travel_agent_failed:
+                try:
+                    from travel_agent import ChristmasMarketTravelAgent
+                    _travel_agent = ChristmasMarketTravelAgent(GEMINI_API_KEY)
+                    logger.info("Travel agent initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize travel agent: {str(e)}")
+                    _travel_agent_failed = True
+    return _travel_agent
+
+
+# Bounds the plans computed at once; excess requests queue briefly or get a 503
+plan_admission = AdmissionController(PLAN_MAX_CONCURRENCY, PLAN_MAX_QUEUE, PLAN_QUEUE_TIMEOUT_SECONDS)
+
+
+def _run_plan_job(user_preferences: dict) -> dict:
+    travel_agent = get_travel_agent()
+    if not travel_agent:
+        raise RuntimeError("Travel agent not initialized. Please check API key configuration.")
+    # Jobs share the planning slots with /api/plan but only get the ones
+    # interactive requests leave free; when shed, the job waits and retries
+    while True:
+        try:
+            with plan_admission.admit('background'):
+                travel_plan = travel_agent.process_request(user_preferences)
+            break
+        except AdmissionRejected as e:
+            time.sleep(e.retry_after)
+    return {"travel_plan": travel_plan, "user_preferences": user_preferences}
+
+
+# Plans requested through /api/plan/jobs run here instead of on request threads
+plan_jobs = JobRunner(
+    _run_plan_job,
+    JobStore(PLAN_JOB_STORE_PATH, PLAN_JOB_MAX_STORED, PLAN_JOB_TTL_SECONDS),
+    workers=PLAN_JOB_WORKERS,
+    max_pending=PLAN_JOB_MAX_PENDING,
+)
+
+# Set once the agent is built and warmed up; reported by /api/ready
+_ready = threading.Event()
+WARM_UP_PAYLOAD = {
+    "startDate": "2025-12-15",
+    "endDate": "2025-12-20",
+    "departureCity": "Berlin",
+    "budget": [1500],
+    "interests": ["food", "culture"],
+    "pace": "moderate",
+    "language": "en",
+}
+
+
+def warm_up() -> bool:
+    """Build the travel agent and run its curated stages once.
+    
+    Marks the server ready on success. Safe to call before forking workers:
+    no Gemini calls are made and no threads are started.
+    """
+    travel_agent = get_travel_agent()
+    if travel_agent is None:
+        return False
+    try:
+        travel_agent.warm_up(_build_user_preferences(WARM_UP_PAYLOAD))
+        from data import MarketQuery
+        _markets_page(get_market_index(), MarketQuery(limit=MARKETS_PAGE_SIZE))
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        return False
+    _ready.set()
+    return True
+
+
+def start_warm_up() -> threading.Thread:
+    """Warm up in a background thread so the server can accept requests meanwhile."""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
 
 
 @app.route('/api/health', methods=['GET'])
@@ -34,6 +141,134 @@ def health_check():
     })
 
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 once the agent is built and warmed up, 503 before."""
+    if not _ready.is_set():
+        return jsonify({"status": "warming_up"}), 503
+    return jsonify({"status": "ready"})
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Per-stage latencies, fallback counts and cache hit rates for Prometheus."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+STREAM_FORMATS = {
+    'sse': 'text/event-stream',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _build_user_preferences(data: dict) -> dict:
+    """Map the frontend form payload onto the agent's preference dictionary."""
+    # Extract and format user preferences
+    start_date = data.get('startDate', '')
+    end_date = data.get('endDate', '')
+    travel_dates = f"{start_date} to {end_date}" if start_date and end_date else "Not specified"
+    
+    # Calculate duration
+    duration = "Not specified"
+    duration_days = None
+    if start_date and end_date:
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            days = max((end - start).days + 1, 1)
+            duration_days = days
+            duration = f"{days} days"
+        except Exception:
+            duration = "Not specified"
+    
+    # Map budget slider value to budget category
+    budget_value = data.get('budget', [1500])[0] if isinstance(data.get('budget'), list) else data.get('budget', 1500)
+    if budget_value < 1000:
+        budget_category = "Budget-friendly"
+    elif budget_value < 2500:
+        budget_category = "Mid-range"
+    else:
+        budget_category = "Luxury"
+    
+    # Map interests
+    interests = data.get('interests', [])
+    if isinstance(interests, str):
+        interests = [interests]
+    elif not isinstance(interests, list):
+        interests = []
+    # Interests are matched as words; anything else in the list is ignored
+    interests = [interest for interest in interests if isinstance(interest, str)]
+    mapped_interests = interests if interests else ['food', 'culture']
+    
+    # Map pace
+    pace_mapping = {
+        'relaxed': 'relaxed',
+        'moderate': 'moderate',
+        'active': 'intense'
+    }
+    pace = data.get('pace', 'moderate')
+    pace = pace_mapping.get(pace, 'moderate') if isinstance(pace, str) else 'moderate'
+    
+    # Build user preferences dictionary
+    return {
+        'departure_city': data.get('departureCity', 'Not specified'),
+        'travel_dates': travel_dates,
+        'duration': duration,
+        'budget': budget_category,
+        'interests': mapped_interests,
+        'pace': pace,
+        'language': data.get('language', 'en'),
+        'travel_companions': 'Not specified',  # Can be added to form later
+        'start_date': start_date,
+        'end_date': end_date,
+        'duration_days': duration_days,
+        'budget_value': budget_value,
+    }
+
+
+def _json_response(payload, status: int = 200) -> Response:
+    """JSON response without ``jsonify``'s key sorting and indentation."""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def _format_plan(travel_plan: dict, user_preferences: dict, compact: bool, fields=None) -> dict:
+    """Shape a plan the way ``/api/plan`` returns it."""
+    if compact:
+        response = {
+            "travel_plan": compact_plan(travel_plan),
+            "user_preferences": user_preferences,
+        }
+        if fields:
+            response = project(response, fields)
+        return {"success": True, **response}
+    
+    # Format response for frontend
+    return {
+        "success": True,
+        "travel_plan": {
+            **{
+                section: section_text(section, travel_plan.get(section, {}))
+                for section in SECTION_TEXT_FIELDS
+            },
+            "summary": travel_plan.get('summary', ''),
+            "raw_data": raw_plan(travel_plan)  # Include full data for advanced parsing
+        },
+        "user_preferences": user_preferences
+    }
+
+
+def _busy_response(e: AdmissionRejected):
+    """503 with ``Retry-After`` for a request shed by admission control."""
+    logger.warning(f"Shedding travel plan request: {e.reason}")
+    response = jsonify({
+        "error": "Server is busy, please retry later",
+        "reason": e.reason,
+        "retry_after": e.retry_after,
+    })
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 503
+
+
 @app.route('/api/plan', methods=['POST'])
 def create_travel_plan():
     """
@@ -49,7 +284,20 @@ def create_travel_plan():
         "pace": "moderate",
         "language": "en"
     }
+    
+    Query parameters:
+        format=compact  Return each value once: one object per section with its
+                        ``text`` and structured fields, no ``raw_data``.
+        fields=...      Comma-separated dotted paths into the compact response,
+                        e.g. ``travel_plan.itinerary.days,travel_plan.summary``.
+                        Implies ``format=compact``.
+    
+    When all planning slots are busy the request waits in a bounded queue;
+    plans already in the cache go to the front. If the queue is full or the
+    wait exceeds ``PLAN_QUEUE_TIMEOUT_SECONDS`` the answer is a 503 with a
+    ``Retry-After`` header.
     """
+    travel_agent = get_travel_agent()
     if not travel_agent:
         return jsonify({
             "error": "Travel agent not initialized. Please check API key configuration."
@@ -61,83 +309,21 @@ def create_travel_plan():
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
-        # Extract and format user preferences
-        start_date = data.get('startDate', '')
-        end_date = data.get('endDate', '')
-        travel_dates = f"{start_date} to {end_date}" if start_date and end_date else "Not specified"
-        
-        # Calculate duration
-        duration = "Not specified"
-        duration_days = None
-        if start_date and end_date:
-            from datetime import datetime
-            try:
-                start = datetime.strptime(start_date, '%Y-%m-%d')
-                end = datetime.strptime(end_date, '%Y-%m-%d')
-                days = max((end - start).days + 1, 1)
-                duration_days = days
-                duration = f"{days} days"
-            except Exception:
-                duration = "Not specified"
-        
-        # Map budget slider value to budget category
-        budget_value = data.get('budget', [1500])[0] if isinstance(data.get('budget'), list) else data.get('budget', 1500)
-        if budget_value < 1000:
-            budget_category = "Budget-friendly"
-        elif budget_value < 2500:
-            budget_category = "Mid-range"
-        else:
-            budget_category = "Luxury"
-        
-        # Map interests
-        interests = data.get('interests', [])
-        mapped_interests = interests if interests else ['food', 'culture']
-        
-        # Map pace
-        pace_mapping = {
-            'relaxed': 'relaxed',
-            'moderate': 'moderate',
-            'active': 'intense'
-        }
-        pace = pace_mapping.get(data.get('pace', 'moderate'), 'moderate')
-        
-        # Build user preferences dictionary
-        user_preferences = {
-            'departure_city': data.get('departureCity', 'Not specified'),
-            'travel_dates': travel_dates,
-            'duration': duration,
-            'budget': budget_category,
-            'interests': mapped_interests,
-            'pace': pace,
-            'language': data.get('language', 'en'),
-            'travel_companions': 'Not specified',  # Can be added to form later
-            'start_date': start_date,
-            'end_date': end_date,
-            'duration_days': duration_days,
-            'budget_value': budget_value,
-        }
+        user_preferences = _build_user_preferences(data)
         
         logger.info(f"Processing travel plan request: {user_preferences}")
         
         # Process the request
-        travel_plan = travel_agent.process_request(user_preferences)
-        
-        # Format response for frontend
-        response = {
-            "success": True,
-            "travel_plan": {
-                "market_recommendations": travel_plan.get('market_recommendations', {}).get('recommendations', ''),
-                "itinerary": travel_plan.get('itinerary', {}).get('itinerary', ''),
-                "transport": travel_plan.get('transport', {}).get('transport_options', ''),
-                "accommodations": travel_plan.get('accommodations', {}).get('accommodations', ''),
-                "cultural_insights": travel_plan.get('cultural_insights', {}).get('cultural_insights', ''),
-                "summary": travel_plan.get('summary', ''),
-                "raw_data": travel_plan  # Include full data for advanced parsing
-            },
-            "user_preferences": user_preferences
-        }
+        lane = 'priority' if travel_agent.has_cached_plan(user_preferences) else 'default'
+        with plan_admission.admit(lane):
+            travel_plan = travel_agent.process_request(user_preferences)
         
-        return jsonify(response)
+        fields = parse_fields(request.args.get('fields'))
+        compact = bool(fields) or request.args.get('format') == 'compact'
+        return _json_response(_format_plan(travel_plan, user_preferences, compact, fields))
+    
+    except AdmissionRejected as e:
+        return _busy_response(e)
         
     except Exception as e:
         logger.error(f"Error creating travel plan: {str(e)}")
@@ -147,23 +333,358 @@ def create_travel_plan():
         }), 500
 
 
+@app.route('/api/plan/batch', methods=['POST'])
+def create_travel_plans():
+    """
+    Create travel plans for many preference sets in one request.
+    
+    Expects a JSON array of ``/api/plan`` payloads, or ``{"requests": [...]}``,
+    with at most ``PLAN_BATCH_MAX_SIZE`` entries. Returns
+    ``{"success": true, "results": [...], "total": n}`` with one result per
+    payload in input order, each shaped like an ``/api/plan`` response; an
+    invalid payload gets ``{"success": false, "error": ...}`` in its slot.
+    Takes the same ``format`` and ``fields`` parameters.
+    
+    Identical payloads are planned once, market scoring runs once for the
+    whole batch and per-city text is rendered once and reused. The batch
+    takes one admission slot per payload (at most all of them) and answers
+    503 with ``Retry-After`` like ``/api/plan`` when they are not free.
+    """
+    travel_agent = get_travel_agent()
+    if not travel_agent:
+        return jsonify({
+            "error": "Travel agent not initialized. Please check API key configuration."
+        }), 500
+    
+    data = request.get_json(silent=True)
+    payloads = data.get('requests') if isinstance(data, dict) else data
+    if not isinstance(payloads, list) or not payloads:
+        return jsonify({"error": "Expected a non-empty JSON array of plan requests"}), 400
+    if len(payloads) > PLAN_BATCH_MAX_SIZE:
+        return jsonify({
+            "error": f"Batch too large: {len(payloads)} requests (limit {PLAN_BATCH_MAX_SIZE})"
+        }), 413
+    
+    results = [None] * len(payloads)
+    valid = []
+    for index, payload in enumerate(payloads):
+        if not isinstance(payload, dict) or not payload:
+            results[index] = {"success": False, "error": "No data provided"}
+            continue
+        try:
+            valid.append((index, _build_user_preferences(payload)))
+        except Exception as e:
+            results[index] = {"success": False, "error": f"Invalid request: {e}"}
+    
+    logger.info(f"Processing batch of {len(payloads)} travel plan requests ({len(valid)} valid)")
+    
+    try:
+        if valid:
+            with plan_admission.admit(weight=len(valid)):
+                travel_plans = travel_agent.process_batch([preferences for _, preferences in valid])
+        else:
+            travel_plans = []
+        
+        fields = parse_fields(request.args.get('fields'))
+        compact = bool(fields) or request.args.get('format') == 'compact'
+        for (index, user_preferences), travel_plan in zip(valid, travel_plans):
+            results[index] = _format_plan(travel_plan, user_preferences, compact, fields)
+        
+        return _json_response({"success": True, "results": results, "total": len(results)})
+    
+    except AdmissionRejected as e:
+        return _busy_response(e)
+    
+    except Exception as e:
+        logger.error(f"Error creating travel plans: {str(e)}")
+        return jsonify({
+            "error": "Failed to create travel plans",
+            "message": str(e)
+        }), 500
+
+
+def _timestamp(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec='milliseconds')
+
+
+@app.route('/api/plan/jobs', methods=['POST'])
+def submit_travel_plan_job():
+    """
+    Queue a travel plan and return at once.
+    
+    Takes the same payload as ``/api/plan`` and answers ``202`` with the
+    ``job_id`` and a ``status_url`` (also sent as ``Location``) to poll. The
+    plan is built by a background worker pool, so no request thread waits for
+    it. When ``PLAN_JOB_MAX_PENDING`` jobs are already queued or running in
+    this process the answer is a 503 with a ``Retry-After`` header.
+    """
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "No data provided"}), 400
+    
+    try:
+        user_preferences = _build_user_preferences(data)
+        job_id = plan_jobs.submit(user_preferences)
+    except AdmissionRejected as e:
+        return _busy_response(e)
+    except Exception as e:
+        logger.error(f"Error submitting travel plan job: {str(e)}")
+        return jsonify({
+            "error": "Failed to submit travel plan job",
+            "message": str(e)
+        }), 500
+    
+    logger.info(f"Queued travel plan job {job_id}")
+    status_url = f"/api/plan/jobs/{job_id}"
+    response = jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": status_url,
+    })
+    response.headers['Location'] = status_url
+    return response, 202
+
+
+@app.route('/api/plan/jobs/<job_id>', methods=['GET'])
+def get_travel_plan_job(job_id: str):
+    """
+    Report a job's status: ``queued``, ``running``, ``succeeded`` or ``failed``.
+    
+    A succeeded job carries the plan under ``result``, shaped like an
+    ``/api/plan`` response and honouring the same ``format`` and ``fields``
+    parameters; a failed one carries ``error`` and ``message``. Unknown and
+    expired jobs (``PLAN_JOB_TTL_SECONDS`` after finishing) return 404.
+    """
+    try:
+        job = plan_jobs.get(job_id)
+    except Exception as e:
+        logger.error(f"Error reading travel plan job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to read travel plan job", "message": str(e)}), 500
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    
+    response = {
+        "job_id": job_id,
+        "status": job["status"],
+        "created_at": _timestamp(job["created"]),
+        "started_at": _timestamp(job["started"]),
+        "finished_at": _timestamp(job["finished"]),
+    }
+    if job["status"] == "succeeded":
+        fields = parse_fields(request.args.get('fields'))
+        compact = bool(fields) or request.args.get('format') == 'compact'
+        result = job["result"]
+        response["result"] = _format_plan(result["travel_plan"], result["user_preferences"], compact, fields)
+    elif job["status"] == "failed":
+        response["error"] = "Failed to create travel plan"
+        response["message"] = job["error"]
+    return _json_response(response)
+
+
+@app.route('/api/plan/stream', methods=['POST'])
+def stream_travel_plan():
+    """
+    Stream a travel plan section by section.
+    
+    Takes the same payload as ``/api/plan``. Each section is sent as soon as
+    its stage finishes, followed by a ``summary`` event. ``?format=sse`` (the
+    default) emits Server-Sent Events; ``?format=ndjson`` emits one JSON
+    object per line. Every event carries ``section`` and ``content``.
+    
+    The stream holds a planning slot until it ends, so it is queued or shed
+    with a 503 like ``/api/plan``.
+    """
+    travel_agent = get_travel_agent()
+    if not travel_agent:
+        return jsonify({
+            "error": "Travel agent not initialized. Please check API key configuration."
+        }), 500
+    
+    stream_format = request.args.get('format', 'sse').lower()
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported stream format: {stream_format}"}), 400
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    user_preferences = _build_user_preferences(data)
+    logger.info(f"Streaming travel plan request: {user_preferences}")
+    
+    lane = 'priority' if travel_agent.has_cached_plan(user_preferences) else 'default'
+    try:
+        release = plan_admission.enter(lane)
+    except AdmissionRejected as e:
+        return _busy_response(e)
+    
+    def encode(event: dict) -> str:
+        payload = dumps(event).decode('utf-8')
+        if stream_format == 'ndjson':
+            return payload + "\n"
+        return f"event: {event['section']}\ndata: {payload}\n\n"
+    
+    def generate():
+        start = time.perf_counter()
+        try:
+            for section, result in travel_agent.stream_request(user_preferences):
+                event = {
+                    "section": section,
+                    "content": section_text(section, result),
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+                if section == 'summary':
+                    event["user_preferences"] = user_preferences
+                yield encode(event)
+        except Exception as e:
+            logger.error(f"Error streaming travel plan: {str(e)}")
+            yield encode({
+                "section": "error",
+                "content": "Failed to create travel plan",
+                "message": str(e),
+            })
+    
+    response = Response(
+        generate(),
+        mimetype=STREAM_FORMATS[stream_format],
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # let nginx pass events through immediately
+        },
+    )
+    # Runs once the stream is finished or the client went away
+    response.call_on_close(release)
+    return response
+
+
+_market_index = None
+_market_index_lock = threading.Lock()
+
+
+def get_market_index():
+    """Return the market listing index, built once from the shared catalog."""
+    global _market_index
+    from data import MarketIndex, get_catalog
+    
+    if _market_index is None:
+        with _market_index_lock:
+            if _market_index is None:
+                _market_index = MarketIndex(get_catalog(), CHRISTMAS_MARKETS)
+    return _market_index
+
+
+@lru_cache(maxsize=256)
+def _markets_page(index, query) -> tuple:
+    """Serialized ``/api/markets`` body and its ETag for one index and query."""
+    markets, total, last = index.search(query)
+    next_cursor = None
+    if last is not None:
+        next_cursor = base64.urlsafe_b64encode(f"{index.version}:{last}".encode()).decode().rstrip('=')
+    body = dumps({"markets": markets, "total": total, "next_cursor": next_cursor})
+    return body, hashlib.sha1(body).hexdigest()[:20]
+
+
+def _split(args, name: str) -> tuple:
+    """All comma-separated values of a repeatable query parameter."""
+    return tuple(value.strip() for raw in args.getlist(name) for value in raw.split(',') if value.strip())
+
+
+def _parse_date(value: str, name: str):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{name} must be a date like 2025-12-20")
+
+
+def _market_query(args, index):
+    """Build a ``MarketQuery`` from the request arguments; raises ``ValueError`` on bad input."""
+    from data import MarketQuery
+    
+    open_between = None
+    open_from, open_until = args.get('open_from'), args.get('open_until')
+    if open_from or open_until:
+        start = _parse_date(open_from or open_until, 'open_from')
+        end = _parse_date(open_until, 'open_until') if open_until else start
+        if end < start:
+            raise ValueError("open_until must not be before open_from")
+        open_between = (start, end)
+    
+    curated = args.get('curated')
+    if curated is not None:
+        if curated.lower() not in ('true', 'false'):
+            raise ValueError("curated must be true or false")
+        curated = curated.lower() == 'true'
+    
+    try:
+        limit = int(args.get('limit', MARKETS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= MARKETS_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MARKETS_PAGE_SIZE}")
+    
+    after = -1
+    cursor = args.get('cursor')
+    if cursor:
+        try:
+            version, _, position = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode().partition(':')
+            after = int(position)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        if version != index.version:
+            raise ValueError("The market list has changed since this cursor was issued; start again without it")
+    
+    return MarketQuery(
+        countries=_split(args, 'country'),
+        regions=_split(args, 'region'),
+        price_levels=_split(args, 'price_level'),
+        interests=_split(args, 'interest'),
+        open_between=open_between,
+        text=args.get('q', '').strip(),
+        curated=curated,
+        after=after,
+        limit=limit,
+    )
+
+
 @app.route('/api/markets', methods=['GET'])
 def get_markets():
-    """Get list of available Christmas markets."""
-    from config import CHRISTMAS_MARKETS
-    
-    markets = []
-    for country, market_list in CHRISTMAS_MARKETS.items():
-        for market in market_list:
-            markets.append({
-                "name": market,
-                "country": country.replace('_', ' ').title()
-            })
+    """
+    List Christmas markets, optionally filtered and paginated.
     
-    return jsonify({
-        "markets": markets,
-        "total": len(markets)
-    })
+    Covers the curated catalog plus the cities only named in
+    ``CHRISTMAS_MARKETS`` (listed with ``"curated": false`` and no details).
+    Returns ``{"markets": [...], "total": n, "next_cursor": ...}`` where
+    ``total`` counts every match and ``next_cursor`` is ``null`` on the last
+    page.
+    
+    Query parameters (comma-separated or repeated values match any of them):
+        country=germany,austria  region=bavaria  price_level=budget,mid
+        interest=food,history    markets suited to every listed interest
+        open_from=2025-12-27     open on at least one day from this date ...
+        open_until=2026-01-02    ... to this one (defaults to open_from)
+        q=krumlov                search names, countries and summaries
+        curated=true|false       only markets with / without curated details
+        limit=20                 page size, at most ``MARKETS_PAGE_SIZE``
+        cursor=...               ``next_cursor`` of the previous page
+    
+    Responses carry an ETag; sending it back in ``If-None-Match`` yields 304.
+    """
+    index = get_market_index()
+    try:
+        query = _market_query(request.args, index)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    body, etag = _markets_page(index, query)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
 
 
 if __name__ == '__main__':
@@ -171,5 +692,7 @@ if __name__ == '__main__':
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     
     logger.info(f"Starting API server on port {port}")
+    # Development server; use serve.py for multi-worker production serving
+    start_warm_up()
     app.run(host='0.0.0.0', port=port, debug=debug)
 
@@ -0,0 +1,289 @@
+"""
+Benchmark the planning pipeline on synthetic catalogs.
+
+    python -m benchmarks.run --output benchmark-results.json
+    python -m benchmarks.run --sizes 10,1000 --baseline benchmark-results.json --tolerance 0.25
+
+For every catalog size the harness times building the catalog, its indexes
+and the agent, then each agent method and a full ``process_request`` for
+every preference shape. Results are written as JSON; a previous results file
+can be passed as ``--baseline`` and the run exits with status 1 when a case's
+median (or ``--metric``) got slower than the baseline by more than
+``--tolerance``.
+
+Plans are built from curated data (no Gemini client unless
+``GEMINI_BACKEND=stub`` is set). Per-instance lookup caches such as route
+orders warm up during the first repetitions, so repeated cases measure the
+steady state; ``process_request`` and ``process_batch`` clear the plan cache
+before each call.
+"""
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import argparse
+import json
+import logging
+import math
+import platform
+import statistics
+import sys
+import time
+
+from data import MarketCatalog
+from travel_agent import ChristmasMarketTravelAgent
+
+from .synthetic import synthetic_profiles
+
+DEFAULT_SIZES = (10, 1000, 100000)
+# Slowdowns below this many milliseconds are treated as noise.
+NOISE_FLOOR_MS = 0.05
+SCORING_BATCH_SIZE = 64
+
+# Preference dictionaries as built by the API server for typical requests.
+PREFERENCE_SHAPES: Dict[str, dict] = {
+    "minimal": {
+        "departure_city": "Not specified",
+        "travel_dates": "Not specified",
+        "duration": "Not specified",
+        "budget": "Mid-range",
+        "interests": [],
+        "pace": "moderate",
+        "language": "en",
+    },
+    "food_luxury": {
+        "departure_city": "Paris",
+        "travel_dates": "December 2025",
+        "duration": "4 days",
+        "budget": "Luxury",
+        "interests": ["food", "luxury", "shopping"],
+        "pace": "relaxed",
+        "language": "en",
+        "duration_days": 4,
+    },
+    "all_interests": {
+        "departure_city": "Berlin",
+        "travel_dates": "December 2025",
+        "duration": "7 days",
+        "budget": "Budget-friendly",
+        "interests": ["food", "history", "crafts", "shopping", "music", "photo", "romance", "nightlife"],
+        "pace": "intense",
+        "language": "de",
+        "duration_days": 7,
+    },
+    "dated_window": {
+        "departure_city": "Vienna",
+        "travel_dates": "2025-12-27 to 2026-01-02",
+        "duration": "7 days",
+        "budget": "Mid-range",
+        "interests": ["history", "music"],
+        "pace": "moderate",
+        "language": "fr",
+        "start_date": "2025-12-27",
+        "end_date": "2026-01-02",
+        "duration_days": 7,
+    },
+    "long_trip": {
+        "departure_city": "Rome",
+        "travel_dates": "December 2025",
+        "duration": "10 days",
+        "budget": "Mid-range",
+        "interests": ["culture", "photo"],
+        "pace": "moderate",
+        "language": "en",
+        "duration_days": 10,
+    },
+}
+
+
+def _stats(samples: List[float]) -> dict:
+    ordered = sorted(seconds * 1000 for seconds in samples)
+    return {
+        "repeats": len(ordered),
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, max(0, math.ceil(0.95 * len(ordered)) - 1))],
+        "min_ms": ordered[0],
+        "mean_ms": statistics.fmean(ordered),
+    }
+
+
+def measure(fn: Callable[[], object], min_time: float, min_repeats: int = 5, max_repeats: int = 1000) -> dict:
+    """Time ``fn`` after one warm-up call until ``min_time`` seconds are spent."""
+    fn()
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < max_repeats and (
+        len(samples) < min_repeats or time.perf_counter() - started < min_time
+    ):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+
+def measure_setup(fn: Callable[[], object], min_time: float, max_repeats: int = 100) -> Tuple[object, dict]:
+    """Time a construction step, cold call included; returns ``(result, stats)``.
+
+    Steps are repeated while they fit into ``min_time``, so large catalogs
+    are built only once.
+    """
+    samples: List[float] = []
+    started = time.perf_counter()
+    while not samples or (len(samples) < max_repeats and time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, _stats(samples)
+
+
+def run_size(size: int, seed: int, min_time: float) -> Iterator[Tuple[str, dict]]:
+    """Yield ``(case, stats)`` for one synthetic catalog size."""
+    profiles, stats = measure_setup(lambda: synthetic_profiles(size, seed), min_time)
+    yield "generate_profiles", stats
+    catalog, stats = measure_setup(lambda: MarketCatalog.from_profiles(profiles), min_time)
+    yield "build_catalog", stats
+    # Indexes are built lazily once per catalog; time them on fresh copies
+    _, stats = measure_setup(lambda: MarketCatalog(catalog.records).transport_graph, min_time)
+    yield "build_transport_graph", stats
+    _, stats = measure_setup(lambda: MarketCatalog(catalog.records).availability, min_time)
+    yield "build_availability", stats
+    agent, stats = measure_setup(lambda: ChristmasMarketTravelAgent(None, catalog=catalog), min_time)
+    yield "build_agent", stats
+
+    batch = [dict(shape) for _, shape in zip(range(SCORING_BATCH_SIZE), _cycle(PREFERENCE_SHAPES.values()))]
+    yield f"score_markets_batch[{SCORING_BATCH_SIZE}]", measure(
+        lambda: agent.market_agent.score_markets_batch(batch), min_time
+    )
+    yield f"process_batch[{SCORING_BATCH_SIZE}]", measure(lambda: _uncached_batch(agent, batch), min_time)
+
+    for shape, base in PREFERENCE_SHAPES.items():
+        preferences = dict(base)
+        recommendations = agent.market_agent.recommend_markets(preferences)
+        markets = agent._select_markets(recommendations, preferences)
+
+        cases = {
+            "recommend_markets": lambda: agent.market_agent.recommend_markets(preferences),
+            "create_itinerary": lambda: agent.itinerary_agent.create_itinerary(preferences, markets),
+            "get_transport_options": lambda: agent.transport_agent.get_transport_options({}, preferences),
+            "get_accommodation_recommendations": lambda: (
+                agent.accommodation_agent.get_accommodation_recommendations({}, preferences)
+            ),
+            "get_cultural_insights": lambda: agent.cultural_agent.get_cultural_insights(markets, preferences),
+            "process_request": lambda: _uncached_request(agent, base),
+            "process_request[cached]": lambda: agent.process_request(dict(base)),
+        }
+        for case, fn in cases.items():
+            yield f"{shape}/{case}", measure(fn, min_time)
+
+
+def _cycle(values) -> Iterator[dict]:
+    values = list(values)
+    while True:
+        yield from values
+
+
+def _uncached_request(agent: ChristmasMarketTravelAgent, preferences: dict) -> dict:
+    if agent.plan_cache is not None:
+        agent.plan_cache.invalidate()
+    return agent.process_request(dict(preferences))
+
+
+def _uncached_batch(agent: ChristmasMarketTravelAgent, batch: List[dict]) -> List[dict]:
+    if agent.plan_cache is not None:
+        agent.plan_cache.invalidate()
+    return agent.process_batch([dict(preferences) for preferences in batch])
+
+
+def compare(
+    results: Dict[str, dict],
+    baseline: Dict[str, dict],
+    tolerance: float,
+    noise_floor_ms: float = NOISE_FLOOR_MS,
+    metric: str = "median_ms",
+) -> List[str]:
+    """Return a description of every case slower than the baseline allows."""
+    regressions = []
+    for key, stats in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        current, reference = stats[metric], previous[metric]
+        if current > reference * (1 + tolerance) and current - reference > noise_floor_ms:
+            regressions.append(
+                f"{key}: {metric[:-3]} {current:.3f}ms vs baseline {reference:.3f}ms "
+                f"(+{(current / reference - 1) * 100 if reference else math.inf:.0f}%)"
+            )
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the planning pipeline on synthetic catalogs")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated catalog sizes (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic catalogs")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2,
+        help="Seconds to spend timing each case (at least 5 repetitions)",
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed relative slowdown against the baseline (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metric", choices=("median_ms", "min_ms", "p95_ms", "mean_ms"), default="median_ms",
+        help="Statistic compared with the baseline; min_ms is the least noisy on shared machines",
+    )
+    parser.add_argument(
+        "--noise-floor-ms", type=float, default=NOISE_FLOOR_MS,
+        help="Ignore slowdowns smaller than this many milliseconds (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    results: Dict[str, dict] = {}
+    for size in sizes:
+        for case, stats in run_size(size, args.seed, args.min_time):
+            key = f"{size}/{case}"
+            results[key] = stats
+            print(
+                f"{key:<58} median {stats['median_ms']:10.3f}ms  p95 {stats['p95_ms']:10.3f}ms"
+                f"  x{stats['repeats']}",
+                file=sys.stderr,
+            )
+
+    if args.output:
+        document = {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "sizes": sizes,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(document, handle, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)["results"]
+    regressions = compare(results, baseline, args.tolerance, args.noise_floor_ms, args.metric)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
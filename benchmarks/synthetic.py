@@ -0,0 +1,118 @@
+"""
+Synthetic market profiles shaped like ``data.market_profiles.MARKET_PROFILES``.
+
+Every profile carries the same keys as a curated one, including
+accommodations, a transport block with parsable connections and a culture
+block, so catalogs of any size exercise the same code paths. Generation is
+deterministic for a given size and seed.
+"""
+from typing import Dict, List
+import random
+
+COUNTRIES = (
+    ("Germany", ("bavaria", "saxony", "rhineland")),
+    ("Austria", ("alps", "danube")),
+    ("France", ("alsace", "lorraine")),
+    ("Czech Republic", ("central_europe",)),
+    ("Switzerland", ("switzerland",)),
+    ("Belgium", ("flanders",)),
+    ("Netherlands", ("holland",)),
+    ("Hungary", ("danube_bend",)),
+    ("Poland", ("lesser_poland",)),
+    ("Denmark", ("zealand",)),
+)
+INTERESTS = ("food", "history", "crafts", "shopping", "music", "photo", "relaxed", "romance", "luxury", "nightlife")
+THEMES = ("tradition", "history", "food", "crafts", "music", "romance", "mountains", "nightlife", "luxury", "design")
+PRICE_LEVELS = ("budget", "mid", "mid", "premium")
+PACES = ("relaxed", "moderate", "active")
+TRANSPORT_MODES = ("ICE", "Railjet", "IC", "EC", "TGV", "Regional train", "Bus")
+ACCOMMODATION_TYPES = (
+    ("Boutique design hotel", "€€€"),
+    ("Mid-range suites", "€€"),
+    ("Family guesthouse", "€"),
+    ("Historic grand hotel", "€€€€"),
+)
+MONTHS = ("Nov", "Dec")
+
+# Cities in one region are chained together; neighbouring regions are linked
+# through their first city, so large catalogs form one big connected network.
+CITIES_PER_REGION = 12
+
+
+def city_name(index: int) -> str:
+    return f"Market Town {index:06d}"
+
+
+def _duration(rng: random.Random) -> str:
+    minutes = rng.randint(25, 300)
+    hours, rest = divmod(minutes, 60)
+    if not hours:
+        return f"{rest} min"
+    return f"{hours}h{rest:02d}" if rest else f"{hours}h"
+
+
+def _connection(rng: random.Random, origin: str, destination: str) -> str:
+    return f"{origin} → {destination}: {rng.choice(TRANSPORT_MODES)} {_duration(rng)}"
+
+
+def _dates(rng: random.Random) -> str:
+    start = rng.randint(14, 30)
+    if rng.random() < 0.3:
+        return f"{start} Nov – {rng.randint(1, 6)} Jan, 2026"
+    return f"{start} Nov – {rng.randint(22, 31)} Dec, 2025"
+
+
+def synthetic_profile(rng: random.Random, index: int, count: int) -> dict:
+    city = city_name(index)
+    region_index = index // CITIES_PER_REGION
+    country, regions = COUNTRIES[region_index % len(COUNTRIES)]
+    region = f"{regions[region_index % len(regions)]}_{region_index // len(COUNTRIES)}"
+
+    connections: List[str] = []
+    if index + 1 < count and (index + 1) % CITIES_PER_REGION:
+        connections.append(_connection(rng, city, city_name(index + 1)))
+    if index % CITIES_PER_REGION == 0 and index + CITIES_PER_REGION < count:
+        connections.append(_connection(rng, city, city_name(index + CITIES_PER_REGION)))
+    if index > 0 and rng.random() < 0.3:
+        connections.append(_connection(rng, city, city_name(rng.randrange(max(0, index - 40), index))))
+
+    return {
+        "country": country,
+        "region": region,
+        "dates": _dates(rng),
+        "summary": f"Lantern-lit squares and wooden huts in {city}.",
+        "themes": rng.sample(THEMES, 2),
+        "best_for": rng.sample(INTERESTS, 3),
+        "price_level": rng.choice(PRICE_LEVELS),
+        "ideal_pace": rng.choice(PACES),
+        "signature_market": f"Christkindlmarkt {city}",
+        "highlights": [f"{city} highlight {number}" for number in range(1, 4)],
+        "foods": [f"{city} gingerbread", "Mulled wine", "Roasted chestnuts"],
+        "experiences": [f"Evening choir in {city}", f"Craft workshop in {city}", "Tower climb at dusk"],
+        "accommodations": [
+            {
+                "name": f"Hotel {city} {number}",
+                "type": kind,
+                "price": price,
+                "note": f"{rng.randint(3, 20)} minutes to the main square.",
+            }
+            for number, (kind, price) in enumerate(rng.sample(ACCOMMODATION_TYPES, 2), 1)
+        ],
+        "transport": {
+            "arrival": f"Regional trains reach {city} hourly.",
+            "local": "The old town is walkable; buses run until midnight.",
+            "connections": connections,
+        },
+        "culture": {
+            "customs": [f"Stalls in {city} open at 11:00.", "Mugs carry a deposit."],
+            "tips": ["Arrive before 17:00 on weekends.", "Carry small change."],
+            "phrases": ["Frohe Weihnachten! (Merry Christmas)"],
+        },
+        "side_trip": f"Half-day detour to {city_name((index + 7) % count)}.",
+    }
+
+
+def synthetic_profiles(count: int, seed: int = 0) -> Dict[str, dict]:
+    """Return ``count`` synthetic profiles keyed by city name."""
+    rng = random.Random(seed)
+    return {city_name(index): synthetic_profile(rng, index, count) for index in range(count)}
@@ -0,0 +1,63 @@
+"""
+In-flight request coalescing ("single flight").
+
+When many identical requests arrive at once, only the first one computes the
+result; the others wait for it and share the outcome instead of repeating the
+same work.
+"""
+from typing import Any, Callable, Dict, Hashable, Tuple
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time across threads."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``.
+
+        ``shared`` is ``True`` when the result came from another caller's
+        in-flight computation. Its exception, if any, is re-raised for every
+        waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        return len(self._calls)
@@ -0,0 +1,110 @@
+"""
+Single-call Gemini generation for the downstream plan sections.
+
+Instead of one round trip per agent, the orchestrator sends one prompt that
+carries the shared context (preferences and curated facts about the selected
+cities) once and asks for every section, each under its own marker. The
+answer is split back per section; anything missing or empty falls back to
+the agent's curated text.
+"""
+from typing import Dict, Iterable, Sequence
+import json
+import re
+
+from data import MarketCatalog
+
+# Sections written by the combined call. Market recommendations stay curated:
+# they decide which cities the prompt is about.
+COMBINED_SECTIONS = ("itinerary", "transport", "accommodations", "cultural_insights")
+
+SECTION_INSTRUCTIONS = {
+    "itinerary": "A day-by-day itinerary. Start each day with 'Day N: City' and give timed activities.",
+    "transport": "How to arrive from the departure city and travel between the cities, with booking tips.",
+    "accommodations": "Two or three places to stay per city that fit the budget, with a one-line reason each.",
+    "cultural_insights": "Foods to try, local customs, a useful phrase and etiquette tips per city.",
+}
+LANGUAGE_NAMES = {"en": "English", "de": "German", "fr": "French"}
+
+MARKER_PATTERN = re.compile(r"^\s*={3,}\s*([a-z_]+)\s*={3,}\s*$", re.MULTILINE)
+CODE_FENCE_PATTERN = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def section_marker(section: str) -> str:
+    return f"=== {section} ==="
+
+
+def build_combined_prompt(
+    preferences: dict,
+    markets: Sequence[str],
+    catalog: MarketCatalog,
+    sections: Iterable[str] = COMBINED_SECTIONS,
+) -> str:
+    """One prompt for all ``sections``; shared context is included once."""
+    sections = list(sections)
+    language = LANGUAGE_NAMES.get(preferences.get("language"), "English")
+    lines = [
+        "You are planning a European Christmas market trip.",
+        f"Write in {language}. Use plain text, no Markdown headings.",
+        "",
+        "Traveller:",
+        f"- Departing from: {preferences.get('departure_city', 'Not specified')}",
+        f"- Dates: {preferences.get('travel_dates', 'Not specified')} ({preferences.get('duration', 'Not specified')})",
+        f"- Budget: {preferences.get('budget', 'Not specified')}",
+        f"- Interests: {', '.join(preferences.get('interests') or []) or 'Not specified'}",
+        f"- Pace: {preferences.get('pace', 'moderate')}",
+        "",
+        f"Cities, in visiting order: {', '.join(markets)}",
+    ]
+    for city in markets:
+        record = catalog.get(city)
+        if record is None:
+            continue
+        facts = [f"market dates {record.dates}"] if record.dates else []
+        if record.highlights:
+            facts.append("highlights: " + "; ".join(record.highlights[:2]))
+        if record.foods:
+            facts.append("foods: " + ", ".join(record.foods[:3]))
+        if record.transport.connections:
+            facts.append("connections: " + "; ".join(record.transport.connections[:2]))
+        lines.append(f"- {city}: " + " | ".join(facts))
+
+    lines.extend(["", "Answer with exactly these sections, each starting on its own marker line:"])
+    for section in sections:
+        lines.append(f"{section_marker(section)}")
+        lines.append(SECTION_INSTRUCTIONS[section])
+    return "\n".join(lines)
+
+
+def parse_sections(text: str, sections: Iterable[str] = COMBINED_SECTIONS) -> Dict[str, str]:
+    """Split a combined answer into ``{section: text}``.
+
+    Marker-delimited answers are expected; a JSON object keyed by section is
+    accepted too. Sections that are missing, empty or not strings are left
+    out, so the caller can fall back per section. A truncated answer keeps
+    every section that was completed before the cut.
+    """
+    wanted = set(sections)
+    text = text or ""
+
+    markers = list(MARKER_PATTERN.finditer(text))
+    if markers:
+        parsed = {}
+        for index, match in enumerate(markers):
+            name = match.group(1)
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+            body = text[match.end():end].strip()
+            if name in wanted and body and name not in parsed:
+                parsed[name] = body
+        return parsed
+
+    try:
+        data = json.loads(CODE_FENCE_PATTERN.sub("", text.strip()))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        name: value.strip()
+        for name, value in data.items()
+        if name in wanted and isinstance(value, str) and value.strip()
+    }
@@ -8,6 +8,31 @@ load_dotenv()
 
 # Gemini API Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+# Upper bound on concurrent Gemini calls issued from one event loop
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+# Tail-latency controls: per-call deadline, hedge a second request once a call
+# is slower than this latency quantile (0 disables hedging), and open the
+# circuit breaker when this share of recent calls failed
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "20"))
+GEMINI_HEDGE_QUANTILE = float(os.getenv("GEMINI_HEDGE_QUANTILE", "0.95"))
+GEMINI_BREAKER_FAILURE_RATIO = float(os.getenv("GEMINI_BREAKER_FAILURE_RATIO", "0.5"))
+GEMINI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("GEMINI_BREAKER_COOLDOWN_SECONDS", "30"))
+# "api" calls Google; "stub" uses the local stand-in from gemini_stub.py
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "api").lower()
+# Stub profile: latency spec (see gemini_stub.LatencyProfile), failure
+# probability, requests/second limit (0 = unlimited) and RNG seed
+GEMINI_STUB_LATENCY = os.getenv("GEMINI_STUB_LATENCY", "lognormal:0.8,0.5")
+GEMINI_STUB_FAILURE_RATE = float(os.getenv("GEMINI_STUB_FAILURE_RATE", "0"))
+GEMINI_STUB_MAX_RPS = float(os.getenv("GEMINI_STUB_MAX_RPS", "0"))
+GEMINI_STUB_SEED = int(os.getenv("GEMINI_STUB_SEED", "0"))
+# "curated" answers every section from curated data; "combined" asks Gemini
+# for itinerary, transport, accommodation and cultural text in one call
+GEMINI_PLAN_MODE = os.getenv("GEMINI_PLAN_MODE", "curated").lower()
+# Persistent cache of Gemini responses (an empty path disables it)
+GEMINI_CACHE_PATH = os.getenv("GEMINI_CACHE_PATH", ".cache/gemini_responses.sqlite3")
+GEMINI_CACHE_MAX_MB = float(os.getenv("GEMINI_CACHE_MAX_MB", "256"))
+# 0 keeps responses until they are evicted for space
+GEMINI_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "0"))
 
 # Default settings
 DEFAULT_LANGUAGE = "en"
@@ -36,6 +61,36 @@ CHRISTMAS_MARKETS = {
     ]
 }
 
+# Most markets returned per /api/markets page (also the default page size)
+MARKETS_PAGE_SIZE = int(os.getenv("MARKETS_PAGE_SIZE", "100"))
+
+# Pipeline settings
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "8"))
+STAGE_TIMEOUT_SECONDS = float(os.getenv("STAGE_TIMEOUT_SECONDS", "30"))
+
+# Plan cache settings (PLAN_CACHE_SIZE=0 disables the cache)
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+PLAN_CACHE_TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", "3600"))
+# Concurrent identical plan requests share one computation
+PLAN_COALESCE_REQUESTS = os.getenv("PLAN_COALESCE_REQUESTS", "true").lower() == "true"
+
+# Admission control for /api/plan: requests processed at once per worker
+# process (0 disables), requests allowed to wait for a slot, and how long
+# they may wait before being shed with 503 + Retry-After
+PLAN_MAX_CONCURRENCY = int(os.getenv("PLAN_MAX_CONCURRENCY", "8"))
+PLAN_MAX_QUEUE = int(os.getenv("PLAN_MAX_QUEUE", "24"))
+PLAN_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PLAN_QUEUE_TIMEOUT_SECONDS", "5"))
+# Most preference sets accepted by one POST /api/plan/batch request
+PLAN_BATCH_MAX_SIZE = int(os.getenv("PLAN_BATCH_MAX_SIZE", "500"))
+
+# Background plan jobs: worker threads and queued-or-running jobs per process,
+# and the shared job store (an empty path keeps jobs in process memory)
+PLAN_JOB_WORKERS = int(os.getenv("PLAN_JOB_WORKERS", "4"))
+PLAN_JOB_MAX_PENDING = int(os.getenv("PLAN_JOB_MAX_PENDING", "256"))
+PLAN_JOB_STORE_PATH = os.getenv("PLAN_JOB_STORE_PATH", ".cache/plan_jobs.sqlite3")
+PLAN_JOB_MAX_STORED = int(os.getenv("PLAN_JOB_MAX_STORED", "4096"))
+PLAN_JOB_TTL_SECONDS = float(os.getenv("PLAN_JOB_TTL_SECONDS", "900"))
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
@@ -1,7 +1,34 @@
 """Static knowledge used by the travel agent."""
 
+from .availability import AvailabilityIndex, trip_window
+from .catalog import (
+    Accommodation,
+    Culture,
+    MarketCatalog,
+    MarketRecord,
+    TransportInfo,
+    get_catalog,
+)
+from .fingerprint import catalog_fingerprint
+from .market_index import MarketIndex, MarketQuery
 from .market_profiles import MARKET_PROFILES
+from .name_matcher import MarketNameMatcher
+from .transport_graph import Route, TransportGraph
 
-__all__ = ["MARKET_PROFILES"]
-
-
+__all__ = [
+    "Accommodation",
+    "AvailabilityIndex",
+    "Culture",
+    "MARKET_PROFILES",
+    "MarketCatalog",
+    "MarketIndex",
+    "MarketNameMatcher",
+    "MarketQuery",
+    "MarketRecord",
+    "Route",
+    "TransportGraph",
+    "TransportInfo",
+    "catalog_fingerprint",
+    "get_catalog",
+    "trip_window",
+]
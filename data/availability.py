@@ -0,0 +1,195 @@
+"""Opening-date index over the markets' human-readable ``dates`` strings."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import re
+
+
+DATE_RANGE_PATTERN = re.compile(
+    r"(?P<start_day>\d{1,2})\s+(?P<start_month>[A-Za-z]{3})[a-z]*\.?\s*"
+    r"(?:,\s*(?P<start_year>\d{4})\s*)?[–—-]\s*"
+    r"(?P<end_day>\d{1,2})\s+(?P<end_month>[A-Za-z]{3})[a-z]*\.?,?\s*(?P<end_year>\d{4})"
+)
+MONTHS = {
+    name: index
+    for index, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+        start=1,
+    )
+}
+# Markets repeat every winter, so dates are compared on a season axis that
+# starts on 1 July. A trip in December 2026 therefore matches the opening
+# days recorded for the 2025 season.
+SEASON_START_MONTH = 7
+
+Interval = Tuple[int, int]
+
+
+def parse_date_range(text: str) -> Optional[Tuple[date, date]]:
+    """Parse "29 Nov – 24 Dec, 2025" or "21 Nov – 1 Jan, 2026" into dates."""
+    match = DATE_RANGE_PATTERN.search(text or "")
+    if not match:
+        return None
+    start_month = MONTHS.get(match.group("start_month").lower())
+    end_month = MONTHS.get(match.group("end_month").lower())
+    if not start_month or not end_month:
+        return None
+
+    end_year = int(match.group("end_year"))
+    start_year = int(match.group("start_year") or (end_year - 1 if start_month > end_month else end_year))
+    try:
+        return (
+            date(start_year, start_month, int(match.group("start_day"))),
+            date(end_year, end_month, int(match.group("end_day"))),
+        )
+    except ValueError:
+        return None
+
+
+def season_day(day: date) -> int:
+    """Days since the start of the market season containing ``day``."""
+    year = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return (day - date(year, SEASON_START_MONTH, 1)).days
+
+
+def season_interval(start: date, end: date) -> Interval:
+    """Map a date range onto the season axis."""
+    low = season_day(start)
+    return low, low + (end - start).days
+
+
+def trip_window(preferences: dict) -> Optional[Tuple[date, date]]:
+    """Return the trip's first and last day, or ``None`` when no dates were given."""
+    try:
+        start = datetime.strptime(preferences.get("start_date") or "", "%Y-%m-%d").date()
+    except ValueError:
+        return None
+    try:
+        end = datetime.strptime(preferences.get("end_date") or "", "%Y-%m-%d").date()
+    except ValueError:
+        end = start + timedelta(days=max((preferences.get("duration_days") or 1) - 1, 0))
+    return (start, end) if end >= start else (start, start)
+
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class AvailabilityIndex:
+    """Centered interval tree answering "which markets are open during [start, end]".
+
+    Queries take O(log n + k). Markets whose dates cannot be parsed are treated
+    as always open.
+    """
+
+    def __init__(self, cities: Sequence[str], date_ranges: Sequence[Optional[Tuple[date, date]]]):
+        self.cities: List[str] = list(cities)
+        self._ids: Dict[str, int] = {city: index for index, city in enumerate(self.cities)}
+        self.intervals: List[Optional[Interval]] = [
+            season_interval(*date_range) if date_range else None for date_range in date_ranges
+        ]
+        self.always_open: List[int] = [
+            index for index, interval in enumerate(self.intervals) if interval is None
+        ]
+        self._root = self._build(
+            [(interval[0], interval[1], index) for index, interval in enumerate(self.intervals) if interval]
+        )
+
+    @classmethod
+    def from_profiles(cls, profiles: Dict[str, dict]) -> "AvailabilityIndex":
+        return cls(
+            list(profiles),
+            [parse_date_range(profile.get("dates", "")) for profile in profiles.values()],
+        )
+
+    def _build(self, intervals: List[Tuple[int, int, int]]) -> Optional[_Node]:
+        if not intervals:
+            return None
+        endpoints = sorted(point for low, high, _ in intervals for point in (low, high))
+        center = endpoints[len(endpoints) // 2]
+
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        return _Node(
+            center,
+            sorted(here, key=lambda interval: interval[0]),
+            sorted(here, key=lambda interval: interval[1], reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def overlapping(self, start: date, end: date) -> List[int]:
+        """Ids of markets open on at least one day of ``[start, end]``, in catalog order."""
+        low, high = season_interval(start, end)
+        found = list(self.always_open)
+        node = self._root
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            if high < node.center:
+                for interval_low, _, index in node.by_start:
+                    if interval_low > high:
+                        break
+                    found.append(index)
+                if node.left:
+                    stack.append(node.left)
+            elif low > node.center:
+                for _, interval_high, index in node.by_end:
+                    if interval_high < low:
+                        break
+                    found.append(index)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(index for _, _, index in node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        found.sort()
+        return found
+
+    def overlapping_cities(self, start: date, end: date) -> List[str]:
+        return [self.cities[index] for index in self.overlapping(start, end)]
+
+    def open_during(self, cities: Sequence[str], start: date, end: date) -> List[str]:
+        """Filter ``cities`` to those open during ``[start, end]``, keeping their order.
+
+        Cities missing from the index are kept since nothing is known about them.
+        Each city's own interval is checked, so this costs O(len(cities)) rather
+        than a query over the whole index.
+        """
+        low, high = season_interval(start, end)
+        return [city for city in cities if self._overlaps(city, low, high)]
+
+    def _overlaps(self, city: str, low: int, high: int) -> bool:
+        index = self._ids.get(city)
+        if index is None or self.intervals[index] is None:
+            return True
+        interval_low, interval_high = self.intervals[index]
+        return interval_low <= high and interval_high >= low
+
+    def is_open(self, city: str, day: date) -> bool:
+        """Whether ``city`` is open on ``day`` (unknown cities and dates count as open)."""
+        index = self._ids.get(city)
+        if index is None or self.intervals[index] is None:
+            return True
+        low, high = self.intervals[index]
+        return low <= season_day(day) <= high
+
@@ -0,0 +1,230 @@
+"""Compact, read-only market catalog compiled from ``MARKET_PROFILES``."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+import sys
+import threading
+
+from .availability import AvailabilityIndex, parse_date_range
+from .fingerprint import catalog_fingerprint
+from .market_profiles import MARKET_PROFILES
+from .transport_graph import TransportGraph
+
+
+def _text(value) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+def _texts(values) -> Tuple[str, ...]:
+    return tuple(sys.intern(value) for value in values or ())
+
+
+class _FrozenRecord:
+    """Base for slot-based records that cannot be modified after creation."""
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:2])
+        return f"{type(self).__name__}({fields}, ...)"
+
+    def as_dict(self) -> dict:
+        """Plain-dict view, e.g. for JSON responses."""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _FrozenRecord):
+                value = value.as_dict()
+            elif isinstance(value, tuple):
+                value = [item.as_dict() if isinstance(item, _FrozenRecord) else item for item in value]
+            result[name] = value
+        return result
+
+
+class Accommodation(_FrozenRecord):
+    __slots__ = ("name", "type", "price", "note")
+
+
+class TransportInfo(_FrozenRecord):
+    __slots__ = ("arrival", "local", "connections")
+
+
+class Culture(_FrozenRecord):
+    __slots__ = ("customs", "tips", "phrases")
+
+
+class MarketRecord(_FrozenRecord):
+    """One market. ``id`` is its position in the catalog (-1 for placeholders)."""
+
+    __slots__ = (
+        "id",
+        "city",
+        "country",
+        "region",
+        "dates",
+        "date_range",
+        "summary",
+        "themes",
+        "best_for",
+        "price_level",
+        "ideal_pace",
+        "signature_market",
+        "highlights",
+        "foods",
+        "experiences",
+        "accommodations",
+        "transport",
+        "culture",
+        "side_trip",
+    )
+
+    @classmethod
+    def from_profile(cls, record_id: int, city: str, profile: dict) -> "MarketRecord":
+        transport = profile.get("transport", {})
+        culture = profile.get("culture", {})
+        return cls(
+            id=record_id,
+            city=sys.intern(city),
+            country=_text(profile.get("country")),
+            region=_text(profile.get("region")),
+            dates=_text(profile.get("dates")),
+            date_range=parse_date_range(profile.get("dates", "")),
+            summary=_text(profile.get("summary")),
+            themes=_texts(profile.get("themes")),
+            best_for=_texts(profile.get("best_for")),
+            price_level=_text(profile.get("price_level")),
+            ideal_pace=_text(profile.get("ideal_pace")),
+            signature_market=_text(profile.get("signature_market")),
+            highlights=_texts(profile.get("highlights")),
+            foods=_texts(profile.get("foods")),
+            experiences=_texts(profile.get("experiences")),
+            accommodations=tuple(
+                Accommodation(
+                    name=_text(option.get("name")),
+                    type=_text(option.get("type")),
+                    price=_text(option.get("price")),
+                    note=_text(option.get("note")),
+                )
+                for option in profile.get("accommodations", [])
+            ),
+            transport=TransportInfo(
+                arrival=_text(transport.get("arrival")),
+                local=_text(transport.get("local")),
+                connections=_texts(transport.get("connections")),
+            ),
+            culture=Culture(
+                customs=_texts(culture.get("customs")),
+                tips=_texts(culture.get("tips")),
+                phrases=_texts(culture.get("phrases")),
+            ),
+            side_trip=_text(profile.get("side_trip")),
+        )
+
+    @classmethod
+    def placeholder(cls, city: str) -> "MarketRecord":
+        """Empty record for a city without curated data."""
+        return cls.from_profile(-1, city, {})
+
+
+class MarketCatalog:
+    """Read-only collection of :class:`MarketRecord` with integer city ids.
+
+    Derived indexes (transport graph, opening dates) are built on first use
+    and shared by everything holding the catalog.
+    """
+
+    def __init__(self, records: Sequence[MarketRecord], fingerprint: str = ""):
+        self.records: Tuple[MarketRecord, ...] = tuple(records)
+        self.cities: Tuple[str, ...] = tuple(record.city for record in self.records)
+        self._by_city: Dict[str, MarketRecord] = {record.city: record for record in self.records}
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._transport_graph: Optional[TransportGraph] = None
+        self._availability: Optional[AvailabilityIndex] = None
+
+    @classmethod
+    def from_profiles(cls, profiles: Dict[str, dict]) -> "MarketCatalog":
+        return cls(
+            [
+                MarketRecord.from_profile(index, city, profile)
+                for index, (city, profile) in enumerate(profiles.items())
+            ],
+            catalog_fingerprint(profiles),
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[MarketRecord]:
+        return iter(self.records)
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._by_city
+
+    def get(self, city: str) -> Optional[MarketRecord]:
+        return self._by_city.get(city)
+
+    def record(self, city: str) -> MarketRecord:
+        """Return the record for ``city`` or an empty placeholder."""
+        return self._by_city.get(city) or MarketRecord.placeholder(city)
+
+    def id_of(self, city: str) -> Optional[int]:
+        record = self._by_city.get(city)
+        return record.id if record else None
+
+    @property
+    def transport_graph(self) -> TransportGraph:
+        if self._transport_graph is None:
+            with self._lock:
+                if self._transport_graph is None:
+                    self._transport_graph = TransportGraph(
+                        connection
+                        for record in self.records
+                        for connection in record.transport.connections
+                    )
+        return self._transport_graph
+
+    @property
+    def availability(self) -> AvailabilityIndex:
+        if self._availability is None:
+            with self._lock:
+                if self._availability is None:
+                    self._availability = AvailabilityIndex(
+                        self.cities,
+                        [record.date_range for record in self.records],
+                    )
+        return self._availability
+
+    def open_between(self, start: date, end: date) -> Tuple[MarketRecord, ...]:
+        return tuple(self.records[index] for index in self.availability.overlapping(start, end))
+
+
+_catalog: Optional[MarketCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> MarketCatalog:
+    """Return the shared catalog compiled from ``MARKET_PROFILES``.
+
+    It is compiled once per process, so edits to the profiles take effect
+    after a restart. Build it before forking workers so every process shares
+    the same pages.
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = MarketCatalog.from_profiles(MARKET_PROFILES)
+    return _catalog
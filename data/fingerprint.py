@@ -0,0 +1,22 @@
+"""Content fingerprint of the curated market data."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+from .market_profiles import MARKET_PROFILES
+
+
+def catalog_fingerprint(profiles: dict | None = None) -> str:
+    """Return a stable hash of the market profiles.
+
+    Anything derived from the profiles (cached plans, indexes) can compare
+    fingerprints to notice that the curated data changed.
+    """
+    payload = json.dumps(
+        MARKET_PROFILES if profiles is None else profiles,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
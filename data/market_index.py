@@ -0,0 +1,173 @@
+"""Filterable listing of every known market.
+
+Joins the curated catalog with cities that are only named in a
+``{country: [city, ...]}`` mapping such as ``config.CHRISTMAS_MARKETS`` and
+precomputes lookups by country, region, interest (``best_for``), price level
+and opening dates, so a query is a few set intersections.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import hashlib
+import unicodedata
+
+from .availability import AvailabilityIndex
+from .catalog import MarketCatalog
+
+
+def normalize_key(value: str) -> str:
+    """``"Czech_Republic"``, ``"czech republic"`` and ``"CZECH-REPUBLIC"`` compare equal; accents are ignored."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.replace("_", " ").replace("-", " ").casefold().split())
+
+
+class MarketQuery(NamedTuple):
+    """Filters for :meth:`MarketIndex.search`; several values in one field match any of them."""
+
+    countries: Tuple[str, ...] = ()
+    regions: Tuple[str, ...] = ()
+    price_levels: Tuple[str, ...] = ()
+    # Markets must suit every listed interest
+    interests: Tuple[str, ...] = ()
+    open_between: Optional[Tuple[date, date]] = None
+    text: str = ""
+    curated: Optional[bool] = None
+    # Position of the last market on the previous page
+    after: int = -1
+    limit: int = 100
+
+
+class MarketIndex:
+    """Read-only market listing with precomputed filter indexes.
+
+    Entries are plain dicts ready for JSON, in the order of the city mapping
+    followed by catalog cities it does not mention. Cities without curated
+    data are listed with ``"curated": False`` and count as always open, like
+    unknown dates elsewhere in the catalog.
+    """
+
+    def __init__(self, catalog: MarketCatalog, listed: Optional[Dict[str, Sequence[str]]] = None):
+        self.catalog = catalog
+        names: Dict[str, str] = {}
+        for country, cities in (listed or {}).items():
+            for city in cities:
+                names.setdefault(city, country.replace("_", " ").title())
+        for record in catalog:
+            names.setdefault(record.city, record.country)
+
+        entries: List[dict] = []
+        date_ranges = []
+        for city, country in names.items():
+            record = catalog.get(city)
+            entries.append(self._entry(city, country, record))
+            date_ranges.append(record.date_range if record else None)
+        self.entries: Tuple[dict, ...] = tuple(entries)
+        self.availability = AvailabilityIndex(list(names), date_ranges)
+
+        self._by_country = self._index(entry["country"] for entry in self.entries)
+        self._by_region = self._index(entry["region"] for entry in self.entries)
+        self._by_price_level = self._index(entry["price_level"] for entry in self.entries)
+        self._by_interest: Dict[str, Set[int]] = {}
+        for position, entry in enumerate(self.entries):
+            for interest in entry["best_for"]:
+                self._by_interest.setdefault(normalize_key(interest), set()).add(position)
+        self._curated = {position for position, entry in enumerate(self.entries) if entry["curated"]}
+        self._search_text = tuple(
+            normalize_key(" ".join(filter(None, (entry["name"], entry["country"], entry["summary"]))))
+            for entry in self.entries
+        )
+
+        digest = hashlib.sha1(catalog.fingerprint.encode("utf-8"))
+        for city, country in names.items():
+            digest.update(f"\0{city}\0{country}".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _entry(city: str, country: str, record) -> dict:
+        if record is None:
+            return {
+                "name": city,
+                "country": country,
+                "curated": False,
+                "region": None,
+                "dates": None,
+                "open_from": None,
+                "open_until": None,
+                "price_level": None,
+                "best_for": [],
+                "themes": [],
+                "ideal_pace": None,
+                "summary": None,
+            }
+        open_from, open_until = record.date_range or (None, None)
+        return {
+            "name": city,
+            "country": record.country or country,
+            "curated": True,
+            "region": record.region,
+            "dates": record.dates,
+            "open_from": open_from.isoformat() if open_from else None,
+            "open_until": open_until.isoformat() if open_until else None,
+            "price_level": record.price_level,
+            "best_for": list(record.best_for),
+            "themes": list(record.themes),
+            "ideal_pace": record.ideal_pace,
+            "summary": record.summary,
+        }
+
+    @staticmethod
+    def _index(values) -> Dict[str, Set[int]]:
+        index: Dict[str, Set[int]] = {}
+        for position, value in enumerate(values):
+            if value:
+                index.setdefault(normalize_key(value), set()).add(position)
+        return index
+
+    @staticmethod
+    def _any_of(index: Dict[str, Set[int]], keys: Sequence[str]) -> Set[int]:
+        matches: Set[int] = set()
+        for key in keys:
+            matches |= index.get(normalize_key(key), set())
+        return matches
+
+    def matching(self, query: MarketQuery) -> List[int]:
+        """Positions of all entries matching ``query``'s filters, in listing order."""
+        candidates: Optional[Set[int]] = None
+
+        def narrow(positions: Set[int]):
+            nonlocal candidates
+            candidates = positions if candidates is None else candidates & positions
+
+        if query.countries:
+            narrow(self._any_of(self._by_country, query.countries))
+        if query.regions:
+            narrow(self._any_of(self._by_region, query.regions))
+        if query.price_levels:
+            narrow(self._any_of(self._by_price_level, query.price_levels))
+        for interest in query.interests:
+            narrow(self._by_interest.get(normalize_key(interest), set()))
+        if query.curated is not None:
+            narrow(self._curated if query.curated else set(range(len(self.entries))) - self._curated)
+        if query.open_between:
+            narrow(set(self.availability.overlapping(*query.open_between)))
+
+        positions = range(len(self.entries)) if candidates is None else sorted(candidates)
+        text = normalize_key(query.text)
+        if text:
+            return [position for position in positions if text in self._search_text[position]]
+        return list(positions)
+
+    def search(self, query: MarketQuery) -> Tuple[List[dict], int, Optional[int]]:
+        """Return ``(page, total matches, last position or None if this is the last page)``."""
+        positions = self.matching(query)
+        start = bisect_right(positions, query.after)
+        page = positions[start:start + query.limit]
+        last = page[-1] if page and start + len(page) < len(positions) else None
+        return [self.entries[position] for position in page], len(positions), last
@@ -0,0 +1,84 @@
+"""Single-pass market name matching over free text (Aho-Corasick)."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+class MarketNameMatcher:
+    """Find known city names in text with one scan, whatever the catalog size.
+
+    Matching is case-insensitive and respects word boundaries, so "Colmar"
+    does not match inside "Colmarer". Results come back in order of first
+    appearance, which is how a model usually ranks its suggestions.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self.names: List[str] = []
+        self._lengths: List[int] = []
+
+        seen = set()
+        for name in names:
+            folded = name.casefold()
+            if not folded or folded in seen:
+                continue
+            seen.add(folded)
+            self._add(folded, len(self.names))
+            self.names.append(name)
+            self._lengths.append(len(folded))
+
+        self._build_failure_links()
+
+    def _add(self, word: str, index: int):
+        node = 0
+        for char in word:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = child
+        self._outputs[node].append(index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child].extend(self._outputs[self._fail[child]])
+
+    def find_all(self, text: str) -> List[str]:
+        """Return every distinct name found in ``text``, in order of appearance."""
+        folded = text.casefold()
+        goto, fail, outputs, lengths = self._goto, self._fail, self._outputs, self._lengths
+        found: Dict[int, int] = {}
+        node = 0
+
+        for position, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in outputs[node]:
+                if index in found:
+                    continue
+                start = position - lengths[index] + 1
+                if start > 0 and folded[start - 1].isalnum():
+                    continue
+                end = position + 1
+                if end < len(folded) and folded[end].isalnum():
+                    continue
+                found[index] = start
+
+        return [self.names[index] for index in sorted(found, key=found.get)]
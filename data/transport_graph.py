@@ -0,0 +1,304 @@
+"""Rail/bus network parsed from the curated ``transport.connections`` entries."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import heapq
+import re
+
+import numpy as np
+
+
+CONNECTION_PATTERN = re.compile(r"^\s*(?P<origin>[^→:]+?)\s*→\s*(?P<destination>[^:]+?)\s*:\s*(?P<detail>.+?)\s*$")
+DURATION_PATTERN = re.compile(r"(?<![\w/])(?:(?P<hours>\d+)h(?P<minutes>\d{2})?|(?P<only_minutes>\d+)\s*min)\b")
+
+# Weight used for connections whose text carries no duration.
+UNKNOWN_DURATION_MINUTES = 180
+# Components up to this many cities get a precomputed all-pairs matrix;
+# larger ones answer each lookup with an A* search, cached per pair.
+ALL_PAIRS_LIMIT = 512
+# Far-apart cities whose distances to every other city guide that A* search
+LANDMARKS = 4
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """Return the first duration in ``text`` in minutes ("1h05" -> 65, "35 min" -> 35)."""
+    match = DURATION_PATTERN.search(text)
+    if not match:
+        return None
+    if match.group("only_minutes"):
+        return int(match.group("only_minutes"))
+    return int(match.group("hours")) * 60 + int(match.group("minutes") or 0)
+
+
+def format_duration(minutes: int) -> str:
+    """Format minutes the way the curated data does ("1h05", "35 min")."""
+    hours, rest = divmod(int(minutes), 60)
+    if not hours:
+        return f"{rest} min"
+    return f"{hours}h{rest:02d}" if rest else f"{hours}h"
+
+
+class Leg(NamedTuple):
+    origin: str
+    destination: str
+    minutes: int
+    detail: str
+
+
+class Route(NamedTuple):
+    path: Tuple[str, ...]
+    minutes: int
+    legs: Tuple[Leg, ...]
+
+    @property
+    def is_direct(self) -> bool:
+        return len(self.legs) == 1
+
+
+class TransportGraph:
+    """Undirected, weighted graph of city connections.
+
+    Shortest paths are precomputed per connected component (Floyd-Warshall with
+    next-hop reconstruction), so travel times are constant-time lookups. Larger
+    components run A* with landmark distances as the estimate (ALT), which only
+    explores cities close to the shortest path.
+    """
+
+    def __init__(self, connections: Iterable[str]):
+        self._index: Dict[str, int] = {}
+        self.cities: List[str] = []
+        self._edges: Dict[Tuple[int, int], Tuple[int, str]] = {}
+        self._texts: Dict[Tuple[int, int], str] = {}
+
+        for text in connections:
+            match = CONNECTION_PATTERN.match(text)
+            if not match:
+                continue
+            origin = self._node(match.group("origin"))
+            destination = self._node(match.group("destination"))
+            if origin == destination:
+                continue
+            detail = match.group("detail")
+            minutes = parse_duration(detail) or UNKNOWN_DURATION_MINUTES
+            self._texts.setdefault((origin, destination), text.strip())
+            for pair in ((origin, destination), (destination, origin)):
+                if pair not in self._edges or minutes < self._edges[pair][0]:
+                    self._edges[pair] = (minutes, detail)
+
+        self._adjacency: List[List[Tuple[int, int]]] = [[] for _ in self.cities]
+        for (origin, destination), (minutes, _) in self._edges.items():
+            self._adjacency[origin].append((destination, minutes))
+
+        self._component: List[int] = [-1] * len(self.cities)
+        self._local: List[int] = [0] * len(self.cities)
+        self._members: List[List[int]] = []
+        self._distances: List[Optional[np.ndarray]] = []
+        self._next_hop: List[Optional[np.ndarray]] = []
+        self._landmarks: List[Optional[np.ndarray]] = []
+        self._build_components()
+
+        # Per-instance caches so large graphs do not pin memory globally.
+        self._shortest = lru_cache(maxsize=4096)(self._search)
+        self.describe = lru_cache(maxsize=4096)(self._describe)
+
+    @classmethod
+    def from_profiles(cls, profiles: Dict[str, dict]) -> "TransportGraph":
+        return cls(
+            connection
+            for profile in profiles.values()
+            for connection in profile.get("transport", {}).get("connections", [])
+        )
+
+    def _node(self, name: str) -> int:
+        index = self._index.get(name)
+        if index is None:
+            index = len(self.cities)
+            self._index[name] = index
+            self.cities.append(name)
+        return index
+
+    # ----------------------------------------------------------- precompute
+    def _build_components(self):
+        for start in range(len(self.cities)):
+            if self._component[start] != -1:
+                continue
+            component = len(self._members)
+            members = []
+            stack = [start]
+            self._component[start] = component
+            while stack:
+                node = stack.pop()
+                self._local[node] = len(members)
+                members.append(node)
+                for neighbour, _ in self._adjacency[node]:
+                    if self._component[neighbour] == -1:
+                        self._component[neighbour] = component
+                        stack.append(neighbour)
+            self._members.append(members)
+
+            if len(members) <= ALL_PAIRS_LIMIT:
+                distances, next_hop = self._all_pairs(members)
+                landmarks = None
+            else:
+                distances, next_hop = None, None
+                landmarks = self._landmark_distances(members)
+            self._distances.append(distances)
+            self._next_hop.append(next_hop)
+            self._landmarks.append(landmarks)
+
+    def _all_pairs(self, members: List[int]):
+        size = len(members)
+        distances = np.full((size, size), np.inf)
+        next_hop = np.full((size, size), -1, dtype=np.int64)
+        np.fill_diagonal(distances, 0.0)
+        next_hop[np.arange(size), np.arange(size)] = np.arange(size)
+
+        for node in members:
+            row = self._local[node]
+            for neighbour, minutes in self._adjacency[node]:
+                column = self._local[neighbour]
+                distances[row, column] = minutes
+                next_hop[row, column] = column
+
+        for via in range(size):
+            through = distances[:, via, None] + distances[None, via, :]
+            better = through < distances
+            distances = np.where(better, through, distances)
+            next_hop = np.where(better, next_hop[:, via, None], next_hop)
+
+        return distances, next_hop
+
+    def _landmark_distances(self, members: List[int]) -> np.ndarray:
+        """Distances from ``LANDMARKS`` spread-out members, one row each.
+
+        Each landmark is the member farthest from those already chosen, so
+        they end up at the edges of the network where they bound best.
+        """
+        rows = []
+        nearest = np.full(len(members), np.inf)
+        landmark = members[0]
+        for _ in range(min(LANDMARKS, len(members))):
+            row = np.full(len(members), np.inf)
+            for node, distance in self._dijkstra(landmark).items():
+                row[self._local[node]] = distance
+            rows.append(row)
+            nearest = np.minimum(nearest, row)
+            landmark = members[int(np.argmax(nearest))]
+        return np.array(rows)
+
+    def _dijkstra(self, source: int) -> Dict[int, int]:
+        distances = {source: 0}
+        heap = [(0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue
+            for neighbour, minutes in self._adjacency[node]:
+                candidate = distance + minutes
+                if candidate < distances.get(neighbour, float("inf")):
+                    distances[neighbour] = candidate
+                    heapq.heappush(heap, (candidate, neighbour))
+        return distances
+
+    def _search(self, origin: int, destination: int) -> Tuple[int, List[int]]:
+        """A* from ``origin`` to ``destination`` in the same large component."""
+        landmarks = self._landmarks[self._component[origin]]
+        local = self._local
+        target = landmarks[:, local[destination]]
+
+        def estimate(node: int) -> float:
+            # Triangle inequality: |d(L, t) - d(L, v)| <= d(v, t) for every landmark L
+            return float(np.abs(target - landmarks[:, local[node]]).max())
+
+        distances = {origin: 0}
+        previous: Dict[int, int] = {}
+        heap = [(estimate(origin), 0, origin)]
+        while heap:
+            _, distance, node = heapq.heappop(heap)
+            if node == destination:
+                break
+            if distance > distances[node]:
+                continue
+            for neighbour, minutes in self._adjacency[node]:
+                candidate = distance + minutes
+                if candidate < distances.get(neighbour, float("inf")):
+                    distances[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(heap, (candidate + estimate(neighbour), candidate, neighbour))
+
+        path = [destination]
+        while path[-1] != origin:
+            path.append(previous[path[-1]])
+        return distances[destination], path[::-1]
+
+    # -------------------------------------------------------------- lookups
+    def _path(self, origin: int, destination: int) -> Optional[List[int]]:
+        component = self._component[origin]
+        if component != self._component[destination]:
+            return None
+
+        next_hop = self._next_hop[component]
+        if next_hop is not None:
+            members = self._members[component]
+            local, target = self._local[origin], self._local[destination]
+            path = [origin]
+            while local != target:
+                local = int(next_hop[local, target])
+                path.append(members[local])
+            return path
+
+        return list(self._shortest(origin, destination)[1])
+
+    def minutes(self, origin: str, destination: str) -> Optional[int]:
+        """Shortest travel time in minutes, or ``None`` when not connected."""
+        a, b = self._index.get(origin), self._index.get(destination)
+        if a is None or b is None or self._component[a] != self._component[b]:
+            return None
+        distances = self._distances[self._component[a]]
+        if distances is not None:
+            return int(distances[self._local[a], self._local[b]])
+        if a == b:
+            return 0
+        return int(self._shortest(a, b)[0])
+
+    def route(self, origin: str, destination: str) -> Optional[Route]:
+        """Return the fastest route between two cities, or ``None``."""
+        a, b = self._index.get(origin), self._index.get(destination)
+        if a is None or b is None or a == b:
+            return None
+        path = self._path(a, b)
+        if path is None:
+            return None
+
+        legs = []
+        for start, end in zip(path, path[1:]):
+            minutes, detail = self._edges[(start, end)]
+            legs.append(Leg(self.cities[start], self.cities[end], minutes, detail))
+        return Route(
+            tuple(self.cities[node] for node in path),
+            sum(leg.minutes for leg in legs),
+            tuple(legs),
+        )
+
+    def _describe(self, origin: str, destination: str) -> Optional[str]:
+        """Human-readable connection text, e.g. "Munich → Salzburg: Railjet 1h30".
+
+        Exposed as ``describe`` (memoised per instance).
+        """
+        route = self.route(origin, destination)
+        if route is None:
+            return None
+
+        if route.is_direct:
+            text = self._texts.get((self._index[origin], self._index[destination]))
+            return text or f"{origin} → {destination}: {route.legs[0].detail}"
+
+        via = ", ".join(route.path[1:-1])
+        legs = " + ".join(f"{leg.detail} to {leg.destination}" for leg in route.legs)
+        return (
+            f"{origin} → {destination} via {via}: {legs} "
+            f"(about {format_duration(route.minutes)} in total)"
+        )
+
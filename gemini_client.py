@@ -1,49 +1,347 @@
 """
 Gemini API client for the Christmas Market Travel Agent.
 """
-import google.generativeai as genai
-from config import GEMINI_API_KEY
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_BACKEND,
+    GEMINI_BREAKER_COOLDOWN_SECONDS,
+    GEMINI_BREAKER_FAILURE_RATIO,
+    GEMINI_CACHE_MAX_MB,
+    GEMINI_CACHE_PATH,
+    GEMINI_CACHE_TTL_SECONDS,
+    GEMINI_HEDGE_QUANTILE,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_STUB_FAILURE_RATE,
+    GEMINI_STUB_LATENCY,
+    GEMINI_STUB_MAX_RPS,
+    GEMINI_STUB_SEED,
+    GEMINI_TIMEOUT_SECONDS,
+)
+from gemini_stub import LatencyProfile, StubGenerativeModel
+from metrics import GEMINI_HEDGES, GEMINI_LATENCY, GEMINI_REJECTIONS, REGISTRY
+from resilience import CircuitBreaker, LatencyTracker
+from response_cache import ResponseCache, response_key
+import asyncio
 import logging
+import threading
+import time
+import weakref
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class GeminiUnavailableError(RuntimeError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+class GeminiTimeoutError(TimeoutError):
+    """Raised when no answer arrives before the call's deadline."""
+
+
 class GeminiClient:
     """Client for interacting with Google's Gemini API."""
     
-    def __init__(self, api_key: str = None):
-        """Initialize the Gemini client."""
+    def __init__(
+        self,
+        api_key: str = None,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        response_cache: ResponseCache = None,
+        backend: str = GEMINI_BACKEND,
+        model=None,
+    ):
+        """
+        Initialize the Gemini client.
+        
+        ``backend`` is ``"api"`` (Google's service, needs an API key) or
+        ``"stub"`` (deterministic local stand-in for load tests). Any object
+        with ``generate_content``/``generate_content_async`` can be passed as
+        ``model`` instead.
+        """
         self.api_key = api_key or GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("Gemini API key is required. Set GEMINI_API_KEY in .env file or pass it directly.")
+        self.backend = backend
+        self.model_name = 'gemini-pro'
+        if model is not None:
+            self.model = model
+        elif backend == "stub":
+            self.model = StubGenerativeModel(
+                self.model_name,
+                latency=LatencyProfile(GEMINI_STUB_LATENCY),
+                failure_rate=GEMINI_STUB_FAILURE_RATE,
+                max_rps=GEMINI_STUB_MAX_RPS,
+                seed=GEMINI_STUB_SEED,
+            )
+        elif backend == "api":
+            if not self.api_key:
+                raise ValueError("Gemini API key is required. Set GEMINI_API_KEY in .env file or pass it directly.")
+            # Imported on first use: the SDK takes most of a second to load
+            # and curated-only or stub runs never need it.
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self.model = genai.GenerativeModel(self.model_name)
+        else:
+            raise ValueError(f"Unknown Gemini backend: {backend}")
         
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        # Keep answers from different backends apart in the shared cache
+        if backend == "api" and model is None:
+            self.cache_namespace = self.model_name
+        else:
+            self.cache_namespace = f"{backend}/{self.model_name}"
+        if response_cache is None and GEMINI_CACHE_PATH:
+            try:
+                response_cache = ResponseCache(
+                    GEMINI_CACHE_PATH,
+                    max_bytes=int(GEMINI_CACHE_MAX_MB * 1024 * 1024),
+                    ttl_seconds=GEMINI_CACHE_TTL_SECONDS,
+                )
+            except Exception as exc:
+                logger.warning("Gemini response cache unavailable: %s", exc)
+        self.response_cache = response_cache
+        self.max_concurrency = max_concurrency
+        self.timeout = GEMINI_TIMEOUT_SECONDS
+        self.hedge_quantile = GEMINI_HEDGE_QUANTILE
+        self.breaker = CircuitBreaker(
+            failure_ratio=GEMINI_BREAKER_FAILURE_RATIO,
+            cooldown_seconds=GEMINI_BREAKER_COOLDOWN_SECONDS,
+        )
+        self.latencies = LatencyTracker()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        REGISTRY.register_collector("gemini_breaker", self._breaker_metrics)
+        # asyncio primitives belong to a single event loop, so keep one per loop
+        self._semaphores = weakref.WeakKeyDictionary()
         logger.info("Gemini client initialized successfully")
     
-    def generate_response(self, prompt: str, temperature: float = 0.7) -> str:
+    def generate_response(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> str:
         """
         Generate a response using Gemini API.
         
         Args:
             prompt: The input prompt for the AI
             temperature: Controls randomness (0.0 to 1.0)
+            timeout: Deadline in seconds (defaults to ``GEMINI_TIMEOUT_SECONDS``)
         
         Returns:
             Generated response text
+        
+        Raises:
+            GeminiUnavailableError: the circuit breaker is open
+            GeminiTimeoutError: no answer arrived before the deadline
         """
+        cache_key = self._cache_key(prompt, temperature)
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        self._check_breaker()
+        deadline = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        recorded = False
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=temperature,
-                )
-            )
-            return response.text
+            text = self._call_with_deadline(prompt, temperature, deadline)
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
+            recorded = True
+            self._record_failure(e, time.perf_counter() - start)
             raise
+        else:
+            recorded = True
+            self._record_success(time.perf_counter() - start)
+        finally:
+            if not recorded:
+                # Interrupted without an outcome; free a half-open probe slot
+                self.breaker.release()
+        self._remember(cache_key, text)
+        return text
+    
+    async def generate_response_async(self, prompt: str, temperature: float = 0.7, timeout: float = None) -> str:
+        """
+        Async counterpart of :meth:`generate_response`.
+        
+        At most ``max_concurrency`` calls are in flight per event loop; further
+        callers wait on a semaphore instead of piling onto the upstream API.
+        The deadline covers the upstream call, not the wait for the semaphore.
+        """
+        cache_key = self._cache_key(prompt, temperature)
+        cached = self._cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        self._check_breaker()
+        deadline = self.timeout if timeout is None else timeout
+        recorded = False
+        try:
+            async with self._semaphore():
+                start = time.perf_counter()
+                try:
+                    text = await self._call_with_deadline_async(prompt, temperature, deadline)
+                except Exception as e:
+                    recorded = True
+                    self._record_failure(e, time.perf_counter() - start)
+                    raise
+                recorded = True
+                self._record_success(time.perf_counter() - start)
+        finally:
+            if not recorded:
+                # Cancelled (e.g. a stage timeout) while waiting or calling;
+                # free a half-open probe slot so the breaker can probe again
+                self.breaker.release()
+        self._remember(cache_key, text)
+        return text
+    
+    def available(self) -> bool:
+        """``False`` while the circuit breaker rejects calls.
+
+        Checked by the combined ``generated_sections`` stage, which then keeps
+        the curated text; the agents themselves never call Gemini.
+        """
+        return not self.breaker.is_open()
+    
+    # ------------------------------------------------------------------ helpers
+    def _breaker_metrics(self):
+        return [
+            ("gemini_circuit_open", "gauge", "1 while the Gemini circuit breaker rejects calls",
+             [("gemini_circuit_open", {}, 1.0 if self.breaker.is_open() else 0.0)]),
+            ("gemini_circuit_trips_total", "counter", "Times the Gemini circuit breaker opened",
+             [("gemini_circuit_trips_total", {}, self.breaker.trips)]),
+        ]
+    
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            GEMINI_REJECTIONS.inc()
+            raise GeminiUnavailableError("Gemini circuit breaker is open")
+    
+    def _record_success(self, elapsed: float):
+        GEMINI_LATENCY.observe(elapsed, outcome="ok")
+        self.latencies.add(elapsed)
+        self.breaker.record_success()
+    
+    def _record_failure(self, error: Exception, elapsed: float):
+        timed_out = isinstance(error, GeminiTimeoutError)
+        GEMINI_LATENCY.observe(elapsed, outcome="timeout" if timed_out else "error")
+        self.breaker.record_failure()
+        logger.error(f"Error generating response: {str(error)}")
+    
+    def _hedge_delay(self):
+        if not self.hedge_quantile:
+            return None
+        return self.latencies.quantile(self.hedge_quantile)
+    
+    def _generate(self, prompt: str, temperature: float) -> str:
+        return self.model.generate_content(
+            prompt,
+            generation_config={"temperature": temperature},
+        ).text
+    
+    async def _generate_async(self, prompt: str, temperature: float) -> str:
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config={"temperature": temperature},
+        )
+        return response.text
+    
+    def _call_with_deadline(self, prompt: str, temperature: float, deadline) -> str:
+        """Run the upstream call in the client's pool, hedging once if it is slow.
+        
+        A call still running at the deadline is abandoned, not killed; its
+        thread finishes in the background.
+        """
+        hedge_after = self._hedge_delay()
+        if not deadline and hedge_after is None:
+            return self._generate(prompt, temperature)
+        
+        executor = self._get_executor()
+        end = time.monotonic() + deadline if deadline else None
+        pending = {executor.submit(self._generate, prompt, temperature)}
+        if hedge_after is not None:
+            wait_for = hedge_after if end is None else min(hedge_after, max(0.0, end - time.monotonic()))
+            done, _ = wait(pending, timeout=wait_for)
+            if not done and (end is None or time.monotonic() < end):
+                GEMINI_HEDGES.inc()
+                pending.add(executor.submit(self._generate, prompt, temperature))
+        
+        error = None
+        while pending:
+            remaining = None if end is None else end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = error or future.exception()
+        if error is not None and not pending:
+            raise error
+        raise GeminiTimeoutError(f"Gemini did not answer within {deadline:.1f}s")
+    
+    async def _call_with_deadline_async(self, prompt: str, temperature: float, deadline) -> str:
+        hedge_after = self._hedge_delay()
+        if not deadline and hedge_after is None:
+            return await self._generate_async(prompt, temperature)
+        
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline if deadline else None
+        pending = {asyncio.ensure_future(self._generate_async(prompt, temperature))}
+        try:
+            if hedge_after is not None:
+                wait_for = hedge_after if end is None else min(hedge_after, max(0.0, end - loop.time()))
+                done, _ = await asyncio.wait(pending, timeout=wait_for)
+                if not done and (end is None or loop.time() < end):
+                    GEMINI_HEDGES.inc()
+                    pending.add(asyncio.ensure_future(self._generate_async(prompt, temperature)))
+            
+            error = None
+            while pending:
+                remaining = None if end is None else end - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            if error is not None and not pending:
+                raise error
+            raise GeminiTimeoutError(f"Gemini did not answer within {deadline:.1f}s")
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Separate from the pipeline pool so hung upstream calls cannot starve stages
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="gemini",
+                    )
+        return self._executor
+    
+    def _cache_key(self, prompt: str, temperature: float):
+        if self.response_cache is None:
+            return None
+        return response_key(self.cache_namespace, prompt, temperature)
+    
+    def _cached(self, cache_key):
+        if cache_key is None:
+            return None
+        return self.response_cache.get(cache_key)
+    
+    def _remember(self, cache_key, text: str):
+        # Empty answers are usually blocked or truncated; don't pin them.
+        if cache_key is not None and text:
+            self.response_cache.put(cache_key, text)
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
     
     def generate_structured_response(self, prompt: str, context: dict = None) -> str:
         """
@@ -56,10 +354,15 @@ class GeminiClient:
         Returns:
             Generated response text
         """
-        full_prompt = prompt
-        if context:
-            context_str = "\n".join([f"{k}: {v}" for k, v in context.items()])
-            full_prompt = f"{prompt}\n\nContext:\n{context_str}"
-        
-        return self.generate_response(full_prompt)
-
+        return self.generate_response(self._with_context(prompt, context))
+    
+    async def generate_structured_response_async(self, prompt: str, context: dict = None) -> str:
+        """Async counterpart of :meth:`generate_structured_response`."""
+        return await self.generate_response_async(self._with_context(prompt, context))
+    
+    @staticmethod
+    def _with_context(prompt: str, context: dict = None) -> str:
+        if not context:
+            return prompt
+        context_str = "\n".join([f"{k}: {v}" for k, v in context.items()])
+        return f"{prompt}\n\nContext:\n{context_str}"
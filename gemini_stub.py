@@ -0,0 +1,168 @@
+"""
+In-process stand-in for ``google.generativeai.GenerativeModel``.
+
+Used for load tests and CI where no API key or network is available. Answers
+are deterministic for a given prompt and temperature; latency, throughput
+limits and failures follow a configurable, seeded profile so runs can be
+reproduced.
+"""
+from typing import Callable, Optional
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+
+
+# Prompts asking for "=== section ===" blocks get one block per section back.
+SECTION_MARKER = re.compile(r"^=== ([a-z_]+) ===$", re.MULTILINE)
+
+
+class StubUpstreamError(RuntimeError):
+    """Simulated upstream failure (the API's 5xx/transport errors)."""
+
+
+class StubRateLimitError(StubUpstreamError):
+    """Simulated 429: the stub's throughput limit was exceeded."""
+
+
+class LatencyProfile:
+    """Latency distribution parsed from a spec string (all values in seconds).
+
+    * ``"0"`` or ``"fixed:0.5"`` - constant
+    * ``"uniform:0.2,1.5"`` - uniform between two bounds
+    * ``"exponential:0.8"`` - exponential with the given mean
+    * ``"lognormal:0.8,0.5"`` - log-normal with the given median and sigma,
+      the usual shape of LLM response times (long right tail)
+    """
+
+    def __init__(self, spec: str = "0"):
+        self.spec = spec.strip() or "0"
+        kind, _, raw = self.spec.partition(":")
+        if not raw:
+            kind, raw = "fixed", kind
+        try:
+            params = [float(value) for value in raw.split(",") if value.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec!r}") from None
+
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind] or min(params) < 0:
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        self.kind = kind
+        self.params = params
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.params[0]) if self.params[0] else 0.0
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median else 0.0
+
+
+class _Response:
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def default_responder(model_name: str, prompt: str, temperature: Optional[float]) -> str:
+    """Deterministic placeholder answer derived from the prompt."""
+    digest = hashlib.sha256(f"{model_name}|{temperature}|{prompt}".encode("utf-8")).hexdigest()[:12]
+    sections = SECTION_MARKER.findall(prompt)
+    if sections:
+        return "\n".join(
+            f"=== {section} ===\n[{model_name} stub {digest}] {section.replace('_', ' ')} for this trip."
+            for section in sections
+        )
+    first_line = next((line.strip() for line in prompt.splitlines() if line.strip()), "")
+    return f"[{model_name} stub {digest}] {first_line[:200]}"
+
+
+class StubGenerativeModel:
+    """Drop-in for ``GenerativeModel.generate_content``/``generate_content_async``.
+
+    ``max_rps`` (0 = unlimited) is enforced with a token bucket holding at
+    least one call, so rates below 1 allow one call every ``1 / max_rps``
+    seconds; calls beyond it raise :class:`StubRateLimitError` after their latency, like a rejected
+    upstream request would. ``failure_rate`` is the probability that a call
+    raises :class:`StubUpstreamError`.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gemini-pro",
+        latency: Optional[LatencyProfile] = None,
+        failure_rate: float = 0.0,
+        max_rps: float = 0.0,
+        seed: int = 0,
+        responder: Callable[[str, str, Optional[float]], str] = default_responder,
+    ):
+        if not 0.0 <= failure_rate <= 1.0:
+            raise ValueError("failure_rate must be between 0 and 1")
+        if max_rps < 0:
+            raise ValueError("max_rps must not be negative")
+        self.model_name = model_name
+        self.latency = latency or LatencyProfile()
+        self.failure_rate = failure_rate
+        self.max_rps = max_rps
+        self.responder = responder
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # A bucket smaller than one token would never admit a call
+        self._capacity = max(max_rps, 1.0)
+        self._tokens = self._capacity
+        self._refilled = time.monotonic()
+
+    def _plan_call(self):
+        """Draw this call's delay and outcome (``None`` or an exception)."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency.sample(self._rng)
+            failed = self._rng.random() < self.failure_rate
+            limited = not self._take_token()
+        if limited:
+            return delay, StubRateLimitError("Stub throughput limit exceeded")
+        if failed:
+            return delay, StubUpstreamError("Stub upstream failure")
+        return delay, None
+
+    def _take_token(self) -> bool:
+        if not self.max_rps:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._refilled) * self.max_rps)
+        self._refilled = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def _answer(self, prompt: str, generation_config) -> _Response:
+        temperature = getattr(generation_config, "temperature", None)
+        if temperature is None and isinstance(generation_config, dict):
+            temperature = generation_config.get("temperature")
+        return _Response(self.responder(self.model_name, str(prompt), temperature))
+
+    def generate_content(self, prompt, generation_config=None, **_):
+        delay, error = self._plan_call()
+        if delay:
+            time.sleep(delay)
+        if error:
+            raise error
+        return self._answer(prompt, generation_config)
+
+    async def generate_content_async(self, prompt, generation_config=None, **_):
+        delay, error = self._plan_call()
+        if delay:
+            await asyncio.sleep(delay)
+        if error:
+            raise error
+        return self._answer(prompt, generation_config)
@@ -0,0 +1,236 @@
+"""
+Background planning jobs.
+
+A submitted request is handed to a small worker pool and answered with a job
+id straight away, so slow plans (e.g. with Gemini) never hold a request
+thread; clients poll the job until it has succeeded or failed.
+
+Job state lives in SQLite, so with several server processes sharing one
+database file any of them can answer a poll, whichever ran the job. The store
+is bounded: jobs expire ``ttl_seconds`` after they finish (or, if their
+process died, after they were created) and only the newest ``max_jobs`` are
+kept. An empty path keeps the store in memory, private to the process.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import json
+import logging
+import math
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from admission import MAX_RETRY_AFTER, SERVICE_TIME_SMOOTHING, AdmissionRejected
+from metrics import JOB_REJECTIONS, REGISTRY
+from plan_format import dumps
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "succeeded", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created);
+"""
+
+
+class JobStore:
+    """Bounded, expiring job table in a SQLite file (or in memory)."""
+
+    def __init__(self, path: str = "", max_jobs: int = 1024, ttl_seconds: float = 900):
+        self.path = path or ":memory:"
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not cross fork(); reopen in child processes.
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def create(self, job_id: str, request: dict):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            self._evict(connection, now)
+            connection.execute(
+                "INSERT INTO jobs (id, status, request, created) VALUES (?, 'queued', ?, ?)",
+                (job_id, dumps(request).decode("utf-8"), now),
+            )
+
+    def start(self, job_id: str):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (time.time(), job_id)
+            )
+
+    def finish(self, job_id: str, result: Any = None, error: Optional[str] = None):
+        status = "failed" if error is not None else "succeeded"
+        payload = dumps(result).decode("utf-8") if error is None else None
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?",
+                (status, payload, error, time.time(), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the job as a dictionary, or ``None`` if unknown or expired."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT status, request, result, error, created, started, finished FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, request, result, error, created, started, finished = row
+        if time.time() - (finished or created) > self.ttl_seconds:
+            return None
+        return {
+            "id": job_id,
+            "status": status,
+            "request": json.loads(request),
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "created": created,
+            "started": started,
+            "finished": finished,
+        }
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE COALESCE(finished, created) >= ? GROUP BY status",
+                (time.time() - self.ttl_seconds,),
+            ).fetchall()
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        connection.execute("DELETE FROM jobs WHERE COALESCE(finished, created) < ?", (now - self.ttl_seconds,))
+        # Make room for the job about to be inserted
+        connection.execute(
+            "DELETE FROM jobs WHERE id IN (SELECT id FROM jobs ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (max(self.max_jobs - 1, 0),),
+        )
+
+
+class JobRunner:
+    """Runs submitted requests on a thread pool and records them in a :class:`JobStore`.
+
+    At most ``max_pending`` jobs may be queued or running in this process;
+    further submissions raise :class:`AdmissionRejected` with a suggested
+    retry delay.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[dict], Any],
+        store: JobStore,
+        workers: int = 4,
+        max_pending: int = 256,
+        name: str = "plan",
+    ):
+        self.run = run
+        self.store = store
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self.name = name
+        self.pending = 0
+        self._service_seconds = 0.0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        REGISTRY.register_collector(f"jobs_{name}", self._metrics)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        # Threads do not survive fork(); every process starts its own pool
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-job")
+            self._pid = os.getpid()
+            self.pending = 0
+        return self._executor
+
+    def retry_after(self) -> int:
+        estimate = self._service_seconds * (self.pending + 1) / self.workers
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    def submit(self, request: dict) -> str:
+        """Queue ``request`` and return its job id."""
+        with self._lock:
+            pool = self._pool()
+            if self.pending >= self.max_pending:
+                JOB_REJECTIONS.inc(queue=self.name)
+                raise AdmissionRejected("queue_full", self.retry_after())
+            self.pending += 1
+        job_id = secrets.token_urlsafe(16)
+        try:
+            self.store.create(job_id, request)
+            pool.submit(self._execute, job_id, request)
+        except BaseException:
+            with self._lock:
+                self.pending -= 1
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def _execute(self, job_id: str, request: dict):
+        start = time.monotonic()
+        try:
+            self.store.start(job_id)
+            result = self.run(request)
+        except Exception as exc:
+            logger.error("Job %s failed: %s", job_id, exc)
+            self._record(job_id, error=str(exc) or exc.__class__.__name__)
+        else:
+            self._record(job_id, result=result)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self._service_seconds += SERVICE_TIME_SMOOTHING * (
+                    time.monotonic() - start - self._service_seconds
+                )
+
+    def _record(self, job_id: str, result: Any = None, error: Optional[str] = None):
+        try:
+            self.store.finish(job_id, result, error)
+        except Exception as exc:
+            logger.error("Could not record the outcome of job %s: %s", job_id, exc)
+
+    def _metrics(self):
+        labels = {"queue": self.name}
+        try:
+            counts = self.store.counts()
+        except sqlite3.Error as exc:
+            logger.warning("Job store unavailable for metrics: %s", exc)
+            counts = {}
+        return [
+            ("travel_jobs_pending", "gauge", "Jobs queued or running in this process",
+             [("travel_jobs_pending", labels, self.pending)]),
+            ("travel_jobs", "gauge", "Jobs in the job store by status",
+             [("travel_jobs", {**labels, "status": status}, count) for status, count in counts.items()]),
+        ]
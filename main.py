@@ -1,16 +1,23 @@
 """
 Main entry point for the Christmas Market Travel Agent.
-Provides a user-friendly CLI interface.
+Provides a user-friendly CLI interface, plus a non-interactive batch mode:
+
+    python main.py batch preferences.jsonl -o plans.jsonl --workers 8
 """
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import IO, Iterator, List, Optional, Tuple
+import argparse
+import json
+import math
 import os
 import sys
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
-from rich.table import Table
-from rich.markdown import Markdown
+import threading
+import time
 from travel_agent import ChristmasMarketTravelAgent
 from config import SUPPORTED_LANGUAGES
+from plan_format import compact_plan, dumps
 import logging
 
 # Configure logging
@@ -20,11 +27,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-console = Console()
+
+@lru_cache(maxsize=None)
+def get_console():
+    """Shared rich console; rich is only imported for the interactive UI."""
+    from rich.console import Console
+    return Console()
 
 
 def print_welcome():
     """Print welcome message."""
+    from rich.panel import Panel
+    console = get_console()
     welcome_text = """
 🎄 **Christmas Market Travel Agent** 🎄
 
@@ -36,6 +50,8 @@ I'll help you plan the perfect Christmas market adventure across Europe!
 
 def collect_user_preferences() -> dict:
     """Collect user preferences through interactive prompts."""
+    from rich.prompt import Prompt
+    console = get_console()
     console.print("\n[bold]Let's gather some information about your trip:[/bold]\n")
     
     preferences = {}
@@ -104,6 +120,8 @@ def collect_user_preferences() -> dict:
 
 def display_travel_plan(travel_plan: dict):
     """Display the complete travel plan in a formatted way."""
+    from rich.panel import Panel
+    console = get_console()
     console.print("\n" + "="*80)
     console.print("[bold green]Your Personalized Christmas Market Travel Plan[/bold green]")
     console.print("="*80 + "\n")
@@ -162,8 +180,10 @@ def display_travel_plan(travel_plan: dict):
         ))
 
 
-def main():
-    """Main function to run the travel agent."""
+def run_interactive():
+    """Interactive planning session; loops until the user is done."""
+    from rich.prompt import Confirm
+    console = get_console()
     try:
         print_welcome()
         
@@ -176,34 +196,35 @@ def main():
             console.print("GEMINI_API_KEY=your_api_key_here")
             return
         
-        # Initialize travel agent
+        # Initialize travel agent once; it is reused for every plan
         console.print("[cyan]Initializing travel agent...[/cyan]\n")
         agent = ChristmasMarketTravelAgent(api_key)
         
-        # Collect user preferences
-        preferences = collect_user_preferences()
-        
-        # Confirm before processing
-        console.print("\n")
-        if not Confirm.ask("[cyan]Ready to create your travel plan?[/cyan]"):
-            console.print("[yellow]Cancelled by user.[/yellow]")
-            return
+        while True:
+            # Collect user preferences
+            preferences = collect_user_preferences()
+            
+            # Confirm before processing
+            console.print("\n")
+            if not Confirm.ask("[cyan]Ready to create your travel plan?[/cyan]"):
+                console.print("[yellow]Cancelled by user.[/yellow]")
+                return
+            
+            # Process request
+            console.print("\n[bold cyan]Creating your personalized travel plan...[/bold cyan]")
+            console.print("[dim]This may take a moment...[/dim]\n")
+            
+            travel_plan = agent.process_request(preferences)
+            
+            # Display results
+            display_travel_plan(travel_plan)
+            
+            # Ask if user wants to save or modify
+            console.print("\n")
+            if not Confirm.ask("[cyan]Would you like to create another travel plan?[/cyan]"):
+                break
         
-        # Process request
-        console.print("\n[bold cyan]Creating your personalized travel plan...[/bold cyan]")
-        console.print("[dim]This may take a moment...[/dim]\n")
-        
-        travel_plan = agent.process_request(preferences)
-        
-        # Display results
-        display_travel_plan(travel_plan)
-        
-        # Ask if user wants to save or modify
-        console.print("\n")
-        if Confirm.ask("[cyan]Would you like to create another travel plan?[/cyan]"):
-            main()
-        else:
-            console.print("\n[bold green]Thank you for using Christmas Market Travel Agent! Safe travels! 🎄[/bold green]")
+        console.print("\n[bold green]Thank you for using Christmas Market Travel Agent! Safe travels! 🎄[/bold green]")
     
     except KeyboardInterrupt:
         console.print("\n[yellow]Interrupted by user.[/yellow]")
@@ -214,6 +235,178 @@ def main():
         sys.exit(1)
 
 
+# Batch mode: missing preference keys get the interactive prompts' defaults
+PREFERENCE_DEFAULTS = {
+    'departure_city': "Berlin",
+    'travel_dates': "December 2024",
+    'duration': "5 days",
+    'budget': "Mid-range",
+    'interests': ["food", "culture"],
+    'pace': "moderate",
+    'travel_companions': "Couple",
+    'language': "en",
+}
+# Submitted-but-unwritten records per worker; bounds memory on large inputs
+BATCH_WINDOW_PER_WORKER = 4
+
+# Each pool worker (thread or process) builds its agent once and keeps it warm
+_worker = threading.local()
+
+
+def _init_worker(api_key: Optional[str], log_level: str):
+    logging.getLogger().setLevel(log_level)
+    _worker.agent = ChristmasMarketTravelAgent(api_key)
+
+
+def _plan_record(line_number: int, line: str, output_format: str) -> Tuple[bytes, bool, float]:
+    """Plan one JSONL record; returns ``(output line, ok, seconds)``."""
+    start = time.perf_counter()
+    record_id = line_number
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object of preferences")
+        record_id = record.pop('id', line_number)
+        preferences = {**PREFERENCE_DEFAULTS, **record}
+        travel_plan = _worker.agent.process_request(preferences)
+        payload = {
+            "id": record_id,
+            "line": line_number,
+            "travel_plan": compact_plan(travel_plan) if output_format == "compact" else travel_plan,
+            "user_preferences": preferences,
+        }
+        ok = True
+    except Exception as e:
+        payload = {"id": record_id, "line": line_number, "error": str(e)}
+        ok = False
+    return dumps(payload) + b"\n", ok, time.perf_counter() - start
+
+
+def _read_records(stream: IO[str]) -> Iterator[Tuple[int, str]]:
+    for line_number, line in enumerate(stream, 1):
+        if line.strip():
+            yield line_number, line
+
+
+def _run_batch_pool(executor, records, output: IO[bytes], output_format: str,
+                    ordered: bool, window: int) -> Tuple[int, int, List[float]]:
+    """Feed ``records`` through ``executor`` and write results as they are ready.
+    
+    At most ``window`` records are in flight. Ordered output writes each
+    result once every earlier one has been written; unordered output writes
+    results as soon as they complete.
+    """
+    pending = deque()
+    written = failed = 0
+    latencies: List[float] = []
+    
+    def write(future):
+        nonlocal written, failed
+        line, ok, seconds = future.result()
+        output.write(line)
+        output.flush()
+        written += 1
+        failed += not ok
+        latencies.append(seconds)
+    
+    def drain(limit: int):
+        nonlocal pending
+        while len(pending) > limit:
+            if ordered:
+                write(pending.popleft())
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                write(future)
+            pending = deque(future for future in pending if future not in done)
+    
+    for line_number, line in records:
+        pending.append(executor.submit(_plan_record, line_number, line, output_format))
+        drain(window - 1)
+    drain(0)
+    return written, failed, latencies
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Plan every JSONL record in ``args.input``; returns the exit status."""
+    workers = args.workers or os.cpu_count() or 1
+    api_key = os.getenv("GEMINI_API_KEY")
+    log_level = args.log_level.upper()
+    logging.getLogger().setLevel(log_level)
+    
+    pool_class = ProcessPoolExecutor if args.executor == "process" else ThreadPoolExecutor
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    
+    start = time.perf_counter()
+    try:
+        with pool_class(max_workers=workers, initializer=_init_worker, initargs=(api_key, log_level)) as executor:
+            written, failed, latencies = _run_batch_pool(
+                executor,
+                _read_records(source),
+                output,
+                args.format,
+                ordered=not args.unordered,
+                window=workers * BATCH_WINDOW_PER_WORKER,
+            )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+    elapsed = time.perf_counter() - start
+    
+    report = [
+        f"Planned {written} records ({failed} failed) in {elapsed:.2f}s "
+        f"with {workers} {args.executor} workers: {written / elapsed if elapsed else 0.0:.1f} plans/s"
+    ]
+    if latencies:
+        latencies.sort()
+        report.append(
+            "Per-plan latency: "
+            + ", ".join(f"p{int(q * 100)} {_percentile(latencies, q) * 1000:.1f}ms" for q in (0.5, 0.95, 0.99))
+            + f", max {latencies[-1] * 1000:.1f}ms"
+        )
+    print("\n".join(report), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Christmas Market Travel Agent")
+    subcommands = parser.add_subparsers(dest="command")
+    
+    batch = subcommands.add_parser(
+        "batch",
+        help="Plan trips for JSONL preference records without prompting",
+        description=(
+            "Read one JSON object of preferences per line (keys as collected by the "
+            "interactive prompts, plus an optional 'id') and write one JSON plan per line."
+        ),
+    )
+    batch.add_argument("input", nargs="?", default="-", help="JSONL file of preferences, '-' for stdin (default)")
+    batch.add_argument("-o", "--output", default="-", help="JSONL file for plans, '-' for stdout (default)")
+    batch.add_argument("-w", "--workers", type=int, default=0, help="Pool size (default: CPU count)")
+    batch.add_argument(
+        "--executor", choices=("process", "thread"), default="process",
+        help="Worker pool type; threads suit Gemini-backed runs that mostly wait on the network",
+    )
+    batch.add_argument("--unordered", action="store_true", help="Write plans as they finish instead of in input order")
+    batch.add_argument("--format", choices=("compact", "full"), default="compact", help="Plan shape in the output")
+    batch.add_argument("--log-level", default="WARNING", help="Log level while planning (default: WARNING)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main function to run the travel agent."""
+    args = parse_args(argv)
+    if args.command == "batch":
+        sys.exit(run_batch(args))
+    run_interactive()
+
+
 if __name__ == "__main__":
     main()
-
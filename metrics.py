@@ -0,0 +1,333 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Instrumentation is cheap enough to leave on for every request: a counter
+increment or histogram observation is a dict lookup plus a few list updates
+under a lock. Nothing is exported unless ``/api/metrics`` is scraped.
+"""
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+import threading
+import time
+import weakref
+
+# Seconds; covers curated lookups (sub-millisecond) up to slow Gemini calls.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+# Quantiles are computed over this many most recent observations per series.
+QUANTILE_WINDOW = 1024
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. fallbacks taken."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        if not items and not self.labelnames:
+            return [(self.name, {}, 0.0)]
+        return [(self.name, dict(key), value) for key, value in items]
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count", "recent")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=QUANTILE_WINDOW)
+
+
+class Histogram(_Metric):
+    """Latency distribution with cumulative buckets and recent p50/p95/p99.
+
+    Buckets and ``_sum``/``_count`` cover the whole process lifetime, so they
+    aggregate across workers in Prometheus. The ``<name>_quantile`` gauges are
+    computed locally over the last ``QUANTILE_WINDOW`` observations.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+            series.recent.append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            recent = sorted(series.recent) if series else []
+        return self._pick(recent, q)
+
+    @staticmethod
+    def _pick(ordered: List[float], q: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            snapshot = [
+                (dict(key), list(series.counts), series.total, series.count)
+                for key, series in self._series.items()
+            ]
+
+        samples: List[Sample] = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def quantile_samples(self) -> List[Sample]:
+        with self._lock:
+            snapshot = [(dict(key), sorted(series.recent)) for key, series in self._series.items()]
+        return [
+            (f"{self.name}_quantile", {**labels, "quantile": str(q)}, self._pick(recent, q))
+            for labels, recent in snapshot
+            for q in QUANTILES
+            if recent
+        ]
+
+
+# A collector returns ``(name, kind, documentation, samples)`` families computed
+# at scrape time, e.g. cache statistics owned by another object.
+Family = Tuple[str, str, str, List[Sample]]
+Collector = Callable[[], Iterable[Family]]
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for ``/api/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Optional[Collector]]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, key: str, collector: Collector):
+        """Add (or replace) a scrape-time collector.
+
+        Bound methods are held weakly so registering does not keep their
+        owner alive.
+        """
+        if hasattr(collector, "__self__"):
+            reference = weakref.WeakMethod(collector)
+        else:
+            reference = lambda: collector  # noqa: E731
+        with self._lock:
+            self._collectors[key] = reference
+
+    def families(self) -> List[Family]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+
+        families: List[Family] = []
+        for metric in metrics:
+            families.append((metric.name, metric.kind, metric.documentation, metric.samples()))
+            if isinstance(metric, Histogram):
+                families.append((
+                    f"{metric.name}_quantile",
+                    "gauge",
+                    f"{metric.documentation} (recent p50/p95/p99)",
+                    metric.quantile_samples(),
+                ))
+        for reference in collectors:
+            collector = reference()
+            if collector is not None:
+                families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format (version 0.0.4)."""
+        lines: List[str] = []
+        for name, kind, documentation, samples in self.families():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "travel_stage_duration_seconds",
+    "Time spent in each planning stage",
+    ("stage",),
+)
+PLAN_LATENCY = REGISTRY.histogram(
+    "travel_plan_duration_seconds",
+    "End-to-end time of process_request",
+    ("cache",),
+)
+GEMINI_LATENCY = REGISTRY.histogram(
+    "gemini_request_duration_seconds",
+    "Latency of Gemini generate calls",
+    ("outcome",),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "travel_plan_coalesced_total",
+    "Plan requests answered by waiting on an identical in-flight request",
+)
+GEMINI_HEDGES = REGISTRY.counter(
+    "gemini_hedged_requests_total",
+    "Second requests sent because the first exceeded the hedging latency",
+)
+GEMINI_REJECTIONS = REGISTRY.counter(
+    "gemini_circuit_rejections_total",
+    "Gemini calls skipped because the circuit breaker was open",
+)
+FALLBACKS = REGISTRY.counter(
+    "travel_fallbacks_total",
+    "Curated fallback content served instead of a stage's regular result",
+    ("stage", "reason"),
+)
+BATCH_PLANS = REGISTRY.counter(
+    "travel_batch_plans_total",
+    "Plans returned by process_batch: cache hits, freshly built, or copies of a duplicate in the batch",
+    ("source",),
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "travel_admission_wait_seconds",
+    "Time admitted plan requests spent queued for a slot",
+    ("lane",),
+)
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "travel_admission_rejections_total",
+    "Plan requests shed with 503 because the queue was full or the queue-time deadline passed",
+    ("reason", "lane"),
+)
+JOB_REJECTIONS = REGISTRY.counter(
+    "travel_job_rejections_total",
+    "Job submissions refused with 503 because too many jobs were pending",
+    ("queue",),
+)
+
+
+def cache_families(caches: Dict[str, Tuple[int, int]]) -> List[Family]:
+    """Hit/miss counters and hit ratio for ``{cache name: (hits, misses)}``."""
+    hits, misses, ratios = [], [], []
+    for cache, (hit_count, miss_count) in caches.items():
+        labels = {"cache": cache}
+        total = hit_count + miss_count
+        hits.append(("travel_cache_hits_total", labels, hit_count))
+        misses.append(("travel_cache_misses_total", labels, miss_count))
+        ratios.append(("travel_cache_hit_ratio", labels, hit_count / total if total else 0.0))
+    return [
+        ("travel_cache_hits_total", "counter", "Cache lookups answered from the cache", hits),
+        ("travel_cache_misses_total", "counter", "Cache lookups that had to compute a value", misses),
+        ("travel_cache_hit_ratio", "gauge", "Hits divided by lookups since start", ratios),
+    ]
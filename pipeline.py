@@ -0,0 +1,260 @@
+"""
+Stage graph and scheduler used to run independent agents concurrently.
+
+Each stage declares the named inputs it needs. The scheduler starts every stage
+whose inputs are available in a shared thread pool, so the wall-clock time of a
+request follows the critical path of the graph instead of the sum of all stages.
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+from config import PIPELINE_MAX_WORKERS
+from metrics import FALLBACKS, STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used to run pipeline stages."""
+    global _shared_executor
+    if _shared_executor is None:
+        with _executor_lock:
+            if _shared_executor is None:
+                _shared_executor = ThreadPoolExecutor(
+                    max_workers=PIPELINE_MAX_WORKERS,
+                    thread_name_prefix="stage",
+                )
+    return _shared_executor
+
+
+class StageTimeoutError(TimeoutError):
+    """Raised when a stage exceeds its timeout and has no fallback."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of work in the planning pipeline.
+
+    ``run`` (and ``fallback``) are called with one keyword argument per name in
+    ``inputs``. Inputs refer either to other stages or to seed values passed to
+    :meth:`StageScheduler.run`. ``run_async`` is an optional coroutine function
+    with the same signature, used by :meth:`StageScheduler.run_async` for
+    stages that wait on I/O.
+    """
+
+    name: str
+    run: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Optional[Callable[..., Any]] = None
+    run_async: Optional[Callable[..., Awaitable[Any]]] = None
+
+
+class StageGraph:
+    """A validated, acyclic set of stages."""
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> Tuple[str, ...]:
+        order = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Stage graph has a cycle through '{name}'")
+            state[name] = 1
+            for dependency in self.stages[name].inputs:
+                if dependency in self.stages:
+                    visit(dependency)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return tuple(order)
+
+    def external_inputs(self) -> set:
+        """Inputs that must be supplied as seeds rather than by a stage."""
+        return {
+            dependency
+            for stage in self.stages.values()
+            for dependency in stage.inputs
+            if dependency not in self.stages
+        }
+
+
+class StageScheduler:
+    """Runs a :class:`StageGraph` in a thread pool with per-stage timeouts.
+
+    A timed-out stage is replaced by its fallback result; the worker thread
+    is left to finish in the background since Python threads cannot be killed.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[ThreadPoolExecutor] = None,
+        default_timeout: Optional[float] = None,
+    ):
+        self._executor = executor
+        self.default_timeout = default_timeout
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor or get_shared_executor()
+
+    def _timeout_for(self, stage: Stage) -> Optional[float]:
+        return stage.timeout if stage.timeout is not None else self.default_timeout
+
+    @staticmethod
+    def _check_seeds(graph: StageGraph, seeds: Dict[str, Any]):
+        missing = graph.external_inputs() - set(seeds)
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {', '.join(sorted(missing))}")
+
+    def run(self, graph: StageGraph, seeds: Dict[str, Any]) -> Dict[str, Any]:
+        """Run all stages and return a mapping of stage name to result."""
+        values = dict(self.iter_run(graph, seeds))
+        return {name: values[name] for name in graph.order}
+
+    def iter_run(self, graph: StageGraph, seeds: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        """Run all stages, yielding ``(stage name, result)`` as each one finishes.
+
+        Results arrive in completion order, so callers can forward a section
+        while slower stages are still running.
+        """
+        self._check_seeds(graph, seeds)
+
+        values: Dict[str, Any] = dict(seeds)
+        waiting = list(graph.order)
+        running: Dict[Any, Tuple[Stage, Dict[str, Any], Optional[float]]] = {}
+
+        try:
+            while waiting or running:
+                for name in list(waiting):
+                    stage = graph.stages[name]
+                    if all(dependency in values for dependency in stage.inputs):
+                        waiting.remove(name)
+                        kwargs = {dependency: values[dependency] for dependency in stage.inputs}
+                        timeout = self._timeout_for(stage)
+                        deadline = time.monotonic() + timeout if timeout else None
+                        future = self.executor.submit(self._call, stage, kwargs)
+                        running[future] = (stage, kwargs, deadline)
+
+                deadlines = [deadline for _, _, deadline in running.values() if deadline]
+                wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                finished = []
+                for future in done:
+                    stage, kwargs, _ = running.pop(future)
+                    try:
+                        values[stage.name] = future.result()
+                    except Exception as exc:
+                        logger.error("Stage '%s' failed: %s", stage.name, exc)
+                        values[stage.name] = self._fallback(stage, kwargs, exc)
+                    finished.append(stage.name)
+
+                now = time.monotonic()
+                for future, (stage, kwargs, deadline) in list(running.items()):
+                    if deadline and now >= deadline:
+                        running.pop(future)
+                        future.cancel()
+                        logger.warning("Stage '%s' timed out; using fallback", stage.name)
+                        values[stage.name] = self._fallback(
+                            stage, kwargs, StageTimeoutError(f"Stage '{stage.name}' timed out")
+                        )
+                        finished.append(stage.name)
+
+                for name in finished:
+                    yield name, values[name]
+        finally:
+            # The consumer may stop early (e.g. a client disconnects mid-stream)
+            for future in running:
+                future.cancel()
+
+    async def run_async(self, graph: StageGraph, seeds: Dict[str, Any]) -> Dict[str, Any]:
+        """Run all stages from the current event loop.
+
+        Stages with ``run_async`` (those waiting on Gemini) are awaited on the
+        loop itself; the CPU-bound curated stages run in the shared thread pool.
+        Either way every stage is bounded by its timeout and the loop is never
+        blocked, so many plans can be in flight without a thread per request.
+        """
+        self._check_seeds(graph, seeds)
+
+        values: Dict[str, Any] = dict(seeds)
+        waiting = list(graph.order)
+        running: Dict[asyncio.Future, Tuple[Stage, Dict[str, Any]]] = {}
+
+        try:
+            while waiting or running:
+                for name in list(waiting):
+                    stage = graph.stages[name]
+                    if all(dependency in values for dependency in stage.inputs):
+                        waiting.remove(name)
+                        kwargs = {dependency: values[dependency] for dependency in stage.inputs}
+                        task = asyncio.ensure_future(self._invoke_async(stage, kwargs))
+                        running[task] = (stage, kwargs)
+
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    stage, kwargs = running.pop(task)
+                    try:
+                        values[stage.name] = task.result()
+                    except Exception as exc:
+                        logger.error("Stage '%s' failed: %s", stage.name, exc)
+                        values[stage.name] = self._fallback(stage, kwargs, exc)
+        finally:
+            for task in running:
+                task.cancel()
+
+        return {name: values[name] for name in graph.order}
+
+    @staticmethod
+    def _call(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        with STAGE_LATENCY.time(stage=stage.name):
+            return stage.run(**kwargs)
+
+    @staticmethod
+    def _fallback(stage: Stage, kwargs: Dict[str, Any], exc: Exception) -> Any:
+        """Return the stage's fallback result, or re-raise ``exc`` without one."""
+        if not stage.fallback:
+            raise exc
+        reason = "timeout" if isinstance(exc, StageTimeoutError) else "error"
+        FALLBACKS.inc(stage=stage.name, reason=f"stage_{reason}")
+        return stage.fallback(**kwargs)
+
+    async def _invoke_async(self, stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        if stage.run_async is None:
+            # Curated stages are CPU-bound; run them in the pool so the event
+            # loop keeps serving other plans meanwhile
+            awaitable = asyncio.get_running_loop().run_in_executor(self.executor, self._call, stage, kwargs)
+        else:
+            awaitable = self._call_async(stage, kwargs)
+        try:
+            return await asyncio.wait_for(awaitable, self._timeout_for(stage))
+        except asyncio.TimeoutError:
+            logger.warning("Stage '%s' timed out", stage.name)
+            raise StageTimeoutError(f"Stage '{stage.name}' timed out") from None
+
+    @staticmethod
+    async def _call_async(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        with STAGE_LATENCY.time(stage=stage.name):
+            return await stage.run_async(**kwargs)
@@ -0,0 +1,161 @@
+"""
+Plan-level result cache for the Christmas Market Travel Agent.
+
+Plans built from curated data are deterministic for a given set of
+preferences, so identical requests can be answered from memory.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+import logging
+import threading
+import time
+
+from data import catalog_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Preferences that influence the generated plan. Anything else (e.g. budget_value,
+# travel_companions) is echoed back but never changes the agents' output.
+PLAN_KEY_FIELDS = (
+    "interests",
+    "budget",
+    "pace",
+    "duration_days",
+    "duration",
+    "start_date",
+    "end_date",
+    "language",
+    "departure_city",
+)
+
+
+def plan_cache_key(preferences: dict) -> Tuple[Hashable, ...]:
+    """Build a canonical, hashable key from the plan-relevant preferences.
+
+    Values come from client JSON, so nested objects and mixed-type lists are
+    accepted too.
+    """
+    key = []
+    for field in PLAN_KEY_FIELDS:
+        value = preferences.get(field)
+        if field == "interests":
+            interests = value if isinstance(value, (list, tuple, set)) else (value,) if value else ()
+            value = tuple(sorted((_freeze(interest) for interest in interests), key=repr))
+        else:
+            value = _freeze(value)
+        key.append(value)
+    return tuple(key)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable, order-independent stand-in for a JSON value."""
+    if isinstance(value, dict):
+        return tuple(sorted(((str(name), _freeze(item)) for name, item in value.items()), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return tuple(sorted((_freeze(item) for item in value), key=repr))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class PlanCache:
+    """Thread-safe LRU cache with per-entry TTL.
+
+    Entries are dropped when the ``fingerprint`` of the data they were built
+    from changes: it is re-checked at most every ``revalidate_interval``
+    seconds so the hot path stays a dictionary lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = 3600,
+        revalidate_interval: float = 5.0,
+        fingerprint: Callable[[], str] = catalog_fingerprint,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_interval = revalidate_interval
+        self._fingerprint = fingerprint
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._catalog_version = fingerprint()
+        self._next_revalidation = time.monotonic() + revalidate_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None``."""
+        now = time.monotonic()
+        if now >= self._next_revalidation:
+            self._revalidate(now)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether ``key`` has a live entry; unlike :meth:`get` this updates no statistics."""
+        entry = self._entries.get(key)
+        return entry is not None and (entry[0] is None or time.monotonic() < entry[0])
+
+    def put(self, key: Hashable, value: Any):
+        """Store ``value``, evicting the least recently used entries if full."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def _revalidate(self, now: float):
+        self._next_revalidation = now + self.revalidate_interval
+        version = self._fingerprint()
+        if version != self._catalog_version:
+            logger.info("Market profiles changed; clearing plan cache")
+            self._catalog_version = version
+            self.invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,113 @@
+"""
+Response shapes and JSON encoding for travel plans.
+
+The legacy ``/api/plan`` body repeats every section: once as text, again in
+``raw_data`` together with its structured fields (``raw_response`` and the
+echoed preferences are left out there). The compact shape carries each value
+once.
+"""
+from typing import Any, Dict, Iterable, Optional
+import json
+
+try:  # Optional: roughly 5-10x faster encoding for large plans
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Plan section -> key holding its rendered text
+SECTION_TEXT_FIELDS = {
+    "market_recommendations": "recommendations",
+    "itinerary": "itinerary",
+    "transport": "transport_options",
+    "accommodations": "accommodations",
+    "cultural_insights": "cultural_insights",
+}
+# Stage-result keys that only repeat data available elsewhere in the response
+REDUNDANT_FIELDS = frozenset({"raw_response", "preferences", "user_preferences"})
+
+
+def section_text(section: str, result) -> str:
+    """Rendered text of a plan section (the summary is already a string)."""
+    if isinstance(result, dict):
+        return result.get(SECTION_TEXT_FIELDS[section], "")
+    return result or ""
+
+
+def compact_section(section: str, result) -> Dict[str, Any]:
+    """``{"text": ..., <structured fields>}`` without repeated data."""
+    if not isinstance(result, dict):
+        return {"text": result or ""}
+    text_field = SECTION_TEXT_FIELDS[section]
+    compact = {"text": result.get(text_field, "")}
+    for key, value in result.items():
+        if key != text_field and key not in REDUNDANT_FIELDS:
+            compact[key] = value
+    return compact
+
+
+def raw_plan(travel_plan: dict) -> Dict[str, Any]:
+    """The plan for the legacy ``raw_data`` field, minus fields that only repeat data."""
+    return {
+        section: (
+            {key: value for key, value in result.items() if key not in REDUNDANT_FIELDS}
+            if isinstance(result, dict)
+            else result
+        )
+        for section, result in travel_plan.items()
+    }
+
+
+def compact_plan(travel_plan: dict) -> Dict[str, Any]:
+    """Lean plan: one entry per section plus the summary."""
+    plan = {
+        section: compact_section(section, travel_plan.get(section, {}))
+        for section in SECTION_TEXT_FIELDS
+    }
+    plan["summary"] = travel_plan.get("summary", "")
+    return plan
+
+
+def parse_fields(value: Optional[str]) -> Optional[list]:
+    """Split a ``fields=`` query value ("itinerary.days,summary") into paths."""
+    if not value:
+        return None
+    paths = [field.strip() for field in value.split(",") if field.strip()]
+    return paths or None
+
+
+def project(payload: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the dotted ``fields`` of ``payload``; unknown paths are skipped.
+
+    Projected values are the payload's own objects, not copies.
+    """
+    projected: Dict[str, Any] = {}
+    for path in fields:
+        keys = path.split(".")
+        value = payload
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            source, target = payload, projected
+            for key in keys[:-1]:
+                source = source[key]
+                if target.get(key) is source:
+                    break  # an enclosing path already selected the whole object
+                target = target.setdefault(key, {})
+            else:
+                target[keys[-1]] = value
+    return projected
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode ``payload`` as compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        check_circular=False,
+        default=str,
+    ).encode("utf-8")
@@ -0,0 +1,122 @@
+"""
+Building blocks for keeping tail latency bounded when an upstream degrades.
+"""
+from collections import deque
+from typing import Optional
+import math
+import threading
+import time
+
+# Breaker decisions look at this many most recent calls...
+BREAKER_WINDOW = 20
+# ...and only once at least this many have been seen.
+BREAKER_MIN_CALLS = 10
+# Hedging needs this many successful latencies before it estimates a percentile.
+HEDGE_MIN_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """Closed -> open on sustained errors -> half-open probe -> closed.
+
+    While open, :meth:`allow` returns ``False`` so callers can go straight to
+    their fallback instead of waiting for another timeout. After
+    ``cooldown_seconds`` one probe call is let through; its outcome closes
+    the breaker again or restarts the cooldown. A probe that ends without an
+    outcome (e.g. cancelled) must call :meth:`release`; one that never
+    reports back is replaced after another ``cooldown_seconds``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_ratio: float = 0.5, cooldown_seconds: float = 30.0,
+                 window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS):
+        self.failure_ratio = failure_ratio
+        self.cooldown_seconds = cooldown_seconds
+        self.min_calls = min_calls
+        self.state = self.CLOSED
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and now - self._opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight(now):
+                self._probing = True
+                self._probe_started = now
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """``True`` while calls are rejected: cooling down, or a probe is in flight."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                return now - self._opened_at < self.cooldown_seconds
+            return self.state == self.HALF_OPEN and self._probe_in_flight(now)
+
+    def release(self):
+        """Give up a call admitted by :meth:`allow` without recording an outcome."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+
+    def _probe_in_flight(self, now: float) -> bool:
+        return self._probing and now - self._probe_started < self.cooldown_seconds
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (
+                self.state == self.CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_ratio
+            ):
+                self._trip()
+
+    def _trip(self):
+        self.state = self.OPEN
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._outcomes.clear()
+
+
+class LatencyTracker:
+    """Recent successful latencies, used to pick a hedging delay."""
+
+    def __init__(self, size: int = 256):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
@@ -0,0 +1,137 @@
+"""
+Persistent cache for model responses, backed by SQLite.
+
+Identical prompts sent with the same model and temperature are answered from
+disk, including across restarts and deploys. The store is bounded in size
+(least recently used entries are evicted first) and entries can expire
+after a TTL. Several worker processes may share one database file.
+"""
+from typing import Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Size is enforced every this many writes rather than on each one.
+EVICTION_INTERVAL = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def response_key(model: str, prompt: str, temperature: float) -> str:
+    """Stable hash of everything that determines a response."""
+    payload = json.dumps([model, prompt, round(float(temperature), 6)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded, optionally expiring key/value store in a SQLite file.
+
+    Storage errors are logged and treated as misses, so a broken or full disk
+    never fails a request.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            # Limits may have changed since the file was written
+            self._evict(self._connect(), time.time())
+
+    def _connect(self) -> sqlite3.Connection:
+        # SQLite connections must not cross fork(); reopen in child processes.
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT value, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+        except sqlite3.Error as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value.encode("utf-8")), now, now),
+                )
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict(connection, now)
+        except sqlite3.Error as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        if self.ttl_seconds:
+            connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk entries from least recently used until enough space is freed.
+        excess, cutoff = total - self.max_bytes, None
+        for size, accessed in connection.execute("SELECT size, accessed FROM responses ORDER BY accessed"):
+            excess -= size
+            cutoff = accessed
+            if excess <= 0:
+                break
+        if cutoff is not None:
+            removed = connection.execute("DELETE FROM responses WHERE accessed <= ?", (cutoff,)).rowcount
+            logger.info("Response cache evicted %d entries", removed)
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
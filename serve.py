@@ -0,0 +1,136 @@
+"""
+Production entry point for the API server.
+
+    python serve.py                          # one worker per CPU
+    python serve.py --workers 8 --threads 8 --bind 0.0.0.0:8000
+
+On Linux/macOS this runs gunicorn with ``preload_app``: the Flask app, the
+market catalog and the travel agent are built and warmed up once in the
+master process, then forked into the workers, which share those pages
+copy-on-write. The port only opens after warm-up, and ``/api/ready`` answers
+200 from then on.
+
+Signals (sent to the master process):
+
+* ``HUP``  - graceful reload: start fresh workers, let old ones finish their
+  in-flight requests, then stop them
+* ``TERM`` - graceful shutdown within ``--graceful-timeout``
+* ``USR2`` then ``TERM`` to the old master - zero-downtime upgrade to new code
+  (a preloaded app is not re-imported on ``HUP``)
+
+On Windows, or when gunicorn is not installed, it falls back to werkzeug's
+threaded server in a single process; ``/api/ready`` turns green once the
+background warm-up finishes.
+"""
+from typing import List, Optional
+import argparse
+import logging
+import os
+import sys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the Christmas Market Travel Agent API")
+    parser.add_argument(
+        "--bind", default=f"0.0.0.0:{os.getenv('PORT', '5000')}",
+        help="Address to listen on (default: 0.0.0.0:$PORT)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+        help="Worker processes (default: $WEB_CONCURRENCY or the CPU count)",
+    )
+    parser.add_argument(
+        "--threads", type=int, default=int(os.getenv("WEB_THREADS", "0")),
+        help="Request threads per worker (default: $WEB_THREADS, or enough for admission control's "
+             "slots plus queue so excess requests are shed instead of waiting in the socket backlog)",
+    )
+    parser.add_argument(
+        "--timeout", type=int, default=120,
+        help="Seconds a worker may stay silent before it is restarted",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=30,
+        help="Seconds workers get to finish in-flight requests on reload or shutdown",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=0,
+        help="Recycle a worker after this many requests (0 = never)",
+    )
+    parser.add_argument(
+        "--no-preload", action="store_true",
+        help="Build the agent in every worker instead of once before forking",
+    )
+    return parser.parse_args(argv)
+
+
+def default_threads() -> int:
+    from config import PLAN_MAX_CONCURRENCY, PLAN_MAX_QUEUE
+    if PLAN_MAX_CONCURRENCY <= 0:
+        return 4
+    return PLAN_MAX_CONCURRENCY + PLAN_MAX_QUEUE
+
+
+def serve_gunicorn(args: argparse.Namespace):
+    from gunicorn.app.base import BaseApplication
+
+    class TravelAgentApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # With preload this runs once in the master before forking
+            import api_server
+            if self.cfg.preload_app:
+                api_server.warm_up()
+            else:
+                api_server.start_warm_up()
+            return api_server.app
+
+    threads = args.threads or default_threads()
+    TravelAgentApplication({
+        "bind": args.bind,
+        "workers": args.workers or os.cpu_count() or 1,
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "preload_app": not args.no_preload,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "accesslog": "-",
+    }).run()
+
+
+def serve_threaded(args: argparse.Namespace):
+    from werkzeug.serving import run_simple
+    import api_server
+
+    host, _, port = args.bind.rpartition(":")
+    logger.info(f"Serving on {args.bind} with werkzeug's threaded server (single process)")
+    api_server.start_warm_up()
+    run_simple(host or "0.0.0.0", int(port), api_server.app, threaded=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if sys.platform != "win32":
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            logger.warning("gunicorn is not installed; falling back to a single-process server")
+        else:
+            serve_gunicorn(args)
+            return
+    serve_threaded(args)
+
+
+if __name__ == "__main__":
+    main()
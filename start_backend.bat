@@ -1,5 +1,5 @@
 @echo off
 echo Starting Christmas Market Travel Agent API Server...
-python api_server.py
+python serve.py
 pause
 
@@ -1,4 +1,4 @@
 #!/bin/bash
 echo "Starting Christmas Market Travel Agent API Server..."
-python3 api_server.py
+python3 serve.py
 
@@ -0,0 +1,148 @@
+"""
+Cold-start timing for the CLI and the API server.
+
+Reports how long each import, the catalog and agent construction and the
+first plans take, so changes that slow down time-to-first-response show up
+before they reach autoscaled servers or short batch jobs:
+
+    python startup_timing.py               # CLI / batch path
+    python startup_timing.py --api         # API server path (Flask test client)
+    python startup_timing.py --top 15      # plus the slowest module imports
+    python startup_timing.py --json        # machine-readable output
+
+Run it as a fresh process: modules that are already imported cost nothing.
+"""
+from typing import Callable, List, Optional, Tuple
+import argparse
+import json
+import logging
+import re
+import subprocess
+import sys
+import time
+
+SAMPLE_PREFERENCES = {
+    "departure_city": "Berlin",
+    "travel_dates": "December 2025",
+    "duration": "5 days",
+    "budget": "Mid-range",
+    "interests": ["food", "culture"],
+    "pace": "moderate",
+    "travel_companions": "Couple",
+    "language": "en",
+}
+SAMPLE_PAYLOAD = {
+    "startDate": "2025-12-15",
+    "endDate": "2025-12-20",
+    "departureCity": "Berlin",
+    "budget": [1500],
+    "interests": ["food", "culture"],
+    "pace": "moderate",
+    "language": "en",
+}
+IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+Phase = Tuple[str, float]
+
+
+class Timeline:
+    """Runs phases in order and records their wall-clock durations."""
+
+    def __init__(self):
+        self.phases: List[Phase] = []
+
+    def run(self, name: str, fn: Callable[[], object]):
+        start = time.perf_counter()
+        result = fn()
+        self.phases.append((name, time.perf_counter() - start))
+        return result
+
+
+def cli_phases(timeline: Timeline):
+    config = timeline.run("import config", lambda: __import__("config"))
+    timeline.run("import data", lambda: __import__("data"))
+    timeline.run("import agents", lambda: __import__("agents"))
+    travel_agent = timeline.run("import travel_agent", lambda: __import__("travel_agent"))
+    data = sys.modules["data"]
+    timeline.run("build catalog", data.get_catalog)
+    agent = timeline.run(
+        "construct agent",
+        lambda: travel_agent.ChristmasMarketTravelAgent(config.GEMINI_API_KEY),
+    )
+    timeline.run("first plan", lambda: agent.process_request(dict(SAMPLE_PREFERENCES)))
+    timeline.run(
+        "second plan (other preferences)",
+        lambda: agent.process_request({**SAMPLE_PREFERENCES, "interests": ["history"], "budget": "Luxury"}),
+    )
+
+
+def api_phases(timeline: Timeline):
+    timeline.run("import flask", lambda: __import__("flask"))
+    api_server = timeline.run("import api_server", lambda: __import__("api_server"))
+    client = api_server.app.test_client()
+    timeline.run("first GET /api/health", lambda: client.get("/api/health"))
+    timeline.run("first POST /api/plan", lambda: client.post("/api/plan", json=SAMPLE_PAYLOAD))
+    timeline.run(
+        "second POST /api/plan (other payload)",
+        lambda: client.post("/api/plan", json={**SAMPLE_PAYLOAD, "interests": ["history"], "budget": [3000]}),
+    )
+
+
+def slowest_imports(module: str, limit: int) -> List[Tuple[str, float, float]]:
+    """``(module, self seconds, cumulative seconds)`` from ``python -X importtime``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:limit]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the travel agent")
+    parser.add_argument("--api", action="store_true", help="Time the API server path instead of the CLI path")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest module imports")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.INFO)
+
+    timeline = Timeline()
+    (api_phases if args.api else cli_phases)(timeline)
+    imports = slowest_imports("api_server" if args.api else "travel_agent", args.top) if args.top else []
+
+    if args.json:
+        print(json.dumps({
+            "target": "api" if args.api else "cli",
+            "phases": [{"phase": name, "ms": round(seconds * 1000, 2)} for name, seconds in timeline.phases],
+            "total_ms": round(sum(seconds for _, seconds in timeline.phases) * 1000, 2),
+            "slowest_imports": [
+                {"module": module, "self_ms": round(own * 1000, 2), "cumulative_ms": round(total * 1000, 2)}
+                for module, own, total in imports
+            ],
+        }, indent=2))
+        return 0
+
+    elapsed = 0.0
+    print(f"{'phase':<40}{'ms':>10}{'since start':>14}")
+    for name, seconds in timeline.phases:
+        elapsed += seconds
+        print(f"{name:<40}{seconds * 1000:>10.1f}{elapsed * 1000:>14.1f}")
+    if imports:
+        print(f"\n{'slowest imports':<52}{'self ms':>10}{'cumulative':>12}")
+        for module, own, total in imports:
+            print(f"{module:<52}{own * 1000:>10.1f}{total * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
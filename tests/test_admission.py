@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def controller(max_concurrency=2, max_queue=2, queue_timeout=1.0):
+    return AdmissionController(max_concurrency, max_queue, queue_timeout, name=f"test{time.monotonic_ns()}")
+
+
+def occupy(admission, count):
+    return [admission.enter("default") for _ in range(count)]
+
+
+def wait_until(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+class Waiter(threading.Thread):
+    """Acquire in the background; records "admitted" or the rejection reason."""
+
+    def __init__(self, admission, lane="default", weight=1):
+        super().__init__(daemon=True)
+        self.admission, self.lane, self.weight = admission, lane, weight
+        self.outcome = None
+        self.release = None
+
+    def run(self):
+        try:
+            self.release = self.admission.enter(self.lane, self.weight)
+            self.outcome = "admitted"
+        except AdmissionRejected as exc:
+            self.outcome = exc.reason
+
+
+def test_disabled_controller_admits_everything():
+    admission = controller(max_concurrency=0)
+    for _ in range(10):
+        admission.enter()
+    assert admission.active == 0
+
+
+def test_full_queue_is_shed_immediately():
+    admission = controller(max_queue=0)
+    occupy(admission, 2)
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.enter()
+    assert rejected.value.reason == "queue_full"
+    assert rejected.value.retry_after >= 1
+    assert time.monotonic() - start < 0.1
+
+
+def test_queued_request_times_out():
+    admission = controller(queue_timeout=0.05)
+    occupy(admission, 2)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.enter()
+    assert rejected.value.reason == "queue_timeout"
+    assert admission.queued() == 0
+
+
+def test_released_slot_goes_to_the_priority_lane_first():
+    admission = controller()
+    releases = occupy(admission, 2)
+    default = Waiter(admission, "default")
+    default.start()
+    wait_until(lambda: admission.queued() == 1)
+    priority = Waiter(admission, "priority")
+    priority.start()
+    wait_until(lambda: admission.queued() == 2)
+
+    releases[0]()
+    priority.join(1.0)
+    assert priority.outcome == "admitted"
+    assert default.outcome is None
+    releases[1]()
+    default.join(1.0)
+    assert default.outcome == "admitted"
+
+
+def test_queue_bound_covers_all_lanes_and_priority_sheds_lower_lanes():
+    admission = controller(max_queue=2)
+    occupy(admission, 2)
+    waiters = [Waiter(admission, "background"), Waiter(admission, "default")]
+    for waiter in waiters:
+        waiter.start()
+    wait_until(lambda: admission.queued() == 2)
+
+    priority = Waiter(admission, "priority")
+    priority.start()
+    # The newest waiter of the lowest lane makes room
+    waiters[0].join(1.0)
+    assert waiters[0].outcome == "queue_full"
+    assert admission.queued() == 2
+
+    # With only higher or equal lanes queued, a full queue rejects outright
+    with pytest.raises(AdmissionRejected):
+        admission.enter("default")
+    assert admission.queued() == 2
+
+
+def test_weighted_request_takes_several_slots_and_is_not_overtaken():
+    admission = controller(max_concurrency=4, max_queue=8)
+    releases = occupy(admission, 3)
+    batch = Waiter(admission, weight=3)
+    batch.start()
+    wait_until(lambda: admission.queued() == 1)
+    small = Waiter(admission)
+    small.start()
+    wait_until(lambda: admission.queued() == 2)
+    # One slot is free, but the small request queued behind the batch waits
+    assert admission.active == 3
+
+    for release in releases:
+        release()
+    batch.join(1.0)
+    small.join(1.0)
+    assert (batch.outcome, small.outcome) == ("admitted", "admitted")
+    assert admission.active == 4
+
+
+def test_weight_is_capped_at_max_concurrency():
+    admission = controller(max_concurrency=2)
+    release = admission.enter(weight=50)
+    assert admission.active == 2
+    release()
+    assert admission.active == 0
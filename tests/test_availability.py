@@ -0,0 +1,68 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from data import AvailabilityIndex
+from data.availability import parse_date_range, season_interval
+
+
+def random_index(size, seed=0):
+    rng = random.Random(seed)
+    cities = [f"City {index}" for index in range(size)]
+    ranges = []
+    for _ in cities:
+        if rng.random() < 0.1:
+            ranges.append(None)
+            continue
+        start = date(2025, 11, 1) + timedelta(days=rng.randint(0, 50))
+        ranges.append((start, start + timedelta(days=rng.randint(0, 45))))
+    return AvailabilityIndex(cities, ranges), ranges
+
+
+def brute_force(ranges, start, end):
+    low, high = season_interval(start, end)
+    found = []
+    for index, date_range in enumerate(ranges):
+        if date_range is None:
+            found.append(index)
+            continue
+        interval_low, interval_high = season_interval(*date_range)
+        if interval_low <= high and interval_high >= low:
+            found.append(index)
+    return found
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlapping_matches_a_brute_force_scan(seed):
+    index, ranges = random_index(500, seed)
+    rng = random.Random(seed)
+    for _ in range(200):
+        start = date(2025, 10, 15) + timedelta(days=rng.randint(0, 100))
+        end = start + timedelta(days=rng.randint(0, 14))
+        assert index.overlapping(start, end) == brute_force(ranges, start, end)
+
+
+def test_open_during_agrees_with_overlapping_and_keeps_order():
+    index, _ = random_index(300, seed=7)
+    rng = random.Random(7)
+    for _ in range(100):
+        start = date(2025, 11, 1) + timedelta(days=rng.randint(0, 60))
+        end = start + timedelta(days=rng.randint(0, 7))
+        cities = rng.sample(index.cities, 8) + ["Unknown town"]
+        open_ids = set(index.overlapping(start, end))
+        expected = [city for city in cities if city == "Unknown town" or index._ids[city] in open_ids]
+        assert index.open_during(cities, start, end) == expected
+
+
+def test_later_seasons_match_the_recorded_dates():
+    index = AvailabilityIndex(["Vienna"], [parse_date_range("15 Nov – 26 Dec, 2025")])
+    assert index.is_open("Vienna", date(2026, 12, 1))
+    assert not index.is_open("Vienna", date(2026, 12, 30))
+    assert index.overlapping(date(2027, 12, 20), date(2027, 12, 28)) == [0]
+
+
+def test_parse_date_range_handles_ranges_across_new_year():
+    assert parse_date_range("21 Nov – 1 Jan, 2026") == (date(2025, 11, 21), date(2026, 1, 1))
+    assert parse_date_range("29 Nov – 24 Dec, 2025") == (date(2025, 11, 29), date(2025, 12, 24))
+    assert parse_date_range("all winter") is None
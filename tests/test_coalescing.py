@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from coalescing import SingleFlight
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(index):
+        try:
+            results[index] = target()
+        except Exception as exc:
+            errors[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(2.0)
+    return results, errors
+
+
+def test_identical_calls_share_one_computation():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(2.0)
+        return "plan"
+
+    def request():
+        return flight.do("key", compute)
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    while not flight.in_flight():
+        pass
+    threading.Timer(0.1, release.set).start()
+    results, _ = run_concurrently(5, request)
+    leader.join(2.0)
+    assert len(calls) == 1
+    assert results == [("plan", True)] * 5
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiter_and_the_key_is_freed():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(2.0)
+        raise RuntimeError("upstream down")
+
+    threading.Timer(0.1, release.set).start()
+    _, errors = run_concurrently(4, lambda: flight.do("key", compute))
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert flight.do("key", lambda: "recovered") == ("recovered", False)
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    with pytest.raises(ZeroDivisionError):
+        flight.do("c", lambda: 1 / 0)
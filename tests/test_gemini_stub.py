@@ -0,0 +1,32 @@
+import pytest
+
+from gemini_stub import LatencyProfile, StubGenerativeModel, StubRateLimitError
+
+
+def test_rate_below_one_per_second_still_admits_calls():
+    model = StubGenerativeModel(max_rps=0.5)
+    assert model._take_token()
+    assert not model._take_token()
+    model._refilled -= 2.0
+    assert model._take_token()
+
+
+def test_bucket_allows_a_burst_of_max_rps_calls():
+    model = StubGenerativeModel(max_rps=5)
+    assert sum(model._take_token() for _ in range(10)) == 5
+
+
+def test_limited_call_raises_rate_limit_error():
+    model = StubGenerativeModel(max_rps=1)
+    model.generate_content("first")
+    with pytest.raises(StubRateLimitError):
+        model.generate_content("second")
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        StubGenerativeModel(max_rps=-1)
+    with pytest.raises(ValueError):
+        StubGenerativeModel(failure_rate=2)
+    with pytest.raises(ValueError):
+        LatencyProfile("uniform:1")
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionRejected
+from jobs import JobRunner, JobStore
+
+
+def wait_for_status(runner, job_id, statuses=("succeeded", "failed"), timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = runner.get(job_id)
+        if job and job["status"] in statuses:
+            return job
+        assert time.monotonic() < deadline, f"job stuck in {job and job['status']}"
+        time.sleep(0.01)
+
+
+def test_job_result_is_stored(tmp_path):
+    runner = JobRunner(lambda request: {"echo": request}, JobStore(str(tmp_path / "jobs.sqlite3")), name="echo")
+    job_id = runner.submit({"city": "Vienna"})
+    job = wait_for_status(runner, job_id)
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"echo": {"city": "Vienna"}}
+    assert job["request"] == {"city": "Vienna"}
+    assert job["started"] is not None and job["finished"] is not None
+
+
+def test_failed_job_records_the_error():
+    def fail(request):
+        raise ValueError("no markets")
+
+    runner = JobRunner(fail, JobStore(), name="fail")
+    job = wait_for_status(runner, runner.submit({}))
+    assert job["status"] == "failed"
+    assert job["error"] == "no markets"
+    assert job["result"] is None
+
+
+def test_submissions_beyond_max_pending_are_rejected():
+    gate = threading.Event()
+    runner = JobRunner(lambda request: gate.wait(2.0), JobStore(), workers=1, max_pending=2, name="gated")
+    try:
+        runner.submit({})
+        runner.submit({})
+        with pytest.raises(AdmissionRejected) as rejected:
+            runner.submit({})
+        assert rejected.value.reason == "queue_full"
+    finally:
+        gate.set()
+
+
+def test_unknown_and_expired_jobs_are_gone():
+    store = JobStore(ttl_seconds=0.05)
+    runner = JobRunner(lambda request: "done", store, name="expiring")
+    job_id = runner.submit({})
+    wait_for_status(runner, job_id)
+    assert runner.get("missing") is None
+    time.sleep(0.06)
+    assert runner.get(job_id) is None
+
+
+def test_store_keeps_only_the_newest_jobs():
+    store = JobStore(max_jobs=2)
+    for job_id in ("a", "b", "c"):
+        store.create(job_id, {})
+    assert store.get("a") is None
+    assert store.get("b") is not None and store.get("c") is not None
+    assert store.counts()["queued"] == 2
+
+
+def test_store_file_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    JobStore(path).create("shared", {"x": 1})
+    assert JobStore(path).get("shared")["request"] == {"x": 1}
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pipeline import Stage, StageGraph, StageScheduler, StageTimeoutError
+
+
+@pytest.fixture
+def scheduler():
+    return StageScheduler(default_timeout=2.0)
+
+
+def test_stages_run_after_their_inputs(scheduler):
+    graph = StageGraph([
+        Stage("total", lambda double, triple: double + triple, inputs=("double", "triple")),
+        Stage("double", lambda value: value * 2, inputs=("value",)),
+        Stage("triple", lambda value: value * 3, inputs=("value",)),
+    ])
+    assert scheduler.run(graph, {"value": 2}) == {"double": 4, "triple": 6, "total": 10}
+
+
+def test_independent_stages_run_concurrently(scheduler):
+    barrier = threading.Barrier(3, timeout=1.0)
+    def meet(name):
+        return lambda: (barrier.wait(), name)[1]
+
+    graph = StageGraph([Stage(name, meet(name)) for name in ("a", "b", "c")])
+    # Each stage waits for the other two; run one after another they would time out
+    assert scheduler.run(graph, {}) == {"a": "a", "b": "b", "c": "c"}
+
+
+def test_failing_stage_uses_its_fallback(scheduler):
+    def broken(value):
+        raise RuntimeError("boom")
+
+    graph = StageGraph([
+        Stage("broken", broken, inputs=("value",), fallback=lambda value: f"fallback {value}"),
+        Stage("after", lambda broken: broken.upper(), inputs=("broken",)),
+    ])
+    assert scheduler.run(graph, {"value": 1}) == {"broken": "fallback 1", "after": "FALLBACK 1"}
+
+
+def test_failing_stage_without_fallback_raises(scheduler):
+    graph = StageGraph([Stage("broken", lambda: 1 / 0)])
+    with pytest.raises(ZeroDivisionError):
+        scheduler.run(graph, {})
+
+
+def test_slow_stage_times_out_to_its_fallback(scheduler):
+    graph = StageGraph([
+        Stage("slow", lambda: time.sleep(1.0) or "late", timeout=0.05, fallback=lambda: "fallback"),
+    ])
+    start = time.monotonic()
+    assert scheduler.run(graph, {}) == {"slow": "fallback"}
+    assert time.monotonic() - start < 0.5
+
+
+def test_slow_stage_without_fallback_raises_timeout(scheduler):
+    graph = StageGraph([Stage("slow", lambda: time.sleep(1.0), timeout=0.05)])
+    with pytest.raises(StageTimeoutError):
+        scheduler.run(graph, {})
+
+
+def test_iter_run_yields_in_completion_order(scheduler):
+    graph = StageGraph([
+        Stage("slow", lambda: time.sleep(0.2) or "slow"),
+        Stage("fast", lambda: "fast"),
+    ])
+    assert [name for name, _ in scheduler.iter_run(graph, {})] == ["fast", "slow"]
+
+
+def test_graph_validation():
+    with pytest.raises(ValueError, match="Duplicate"):
+        StageGraph([Stage("a", lambda: 1), Stage("a", lambda: 2)])
+    with pytest.raises(ValueError, match="cycle"):
+        StageGraph([Stage("a", lambda b: b, inputs=("b",)), Stage("b", lambda a: a, inputs=("a",))])
+
+
+def test_missing_seed_is_rejected(scheduler):
+    graph = StageGraph([Stage("a", lambda value: value, inputs=("value",))])
+    with pytest.raises(ValueError, match="value"):
+        scheduler.run(graph, {})
+
+
+def test_run_async_awaits_async_stages_and_pools_sync_ones(scheduler):
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value + 1
+
+    graph = StageGraph([
+        Stage("fetched", lambda value: None, inputs=("value",), run_async=fetch),
+        Stage("blocking", lambda value: time.sleep(0.1) or value, inputs=("value",)),
+        Stage("total", lambda fetched, blocking: fetched + blocking, inputs=("fetched", "blocking")),
+    ])
+
+    async def main():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.ensure_future(heartbeat())
+        try:
+            return await scheduler.run_async(graph, {"value": 1}), ticks
+        finally:
+            beat.cancel()
+
+    results, ticks = asyncio.run(main())
+    assert results == {"fetched": 2, "blocking": 1, "total": 3}
+    # The blocking stage ran in the pool, so the loop kept ticking meanwhile
+    assert ticks >= 3
+
+
+def test_run_async_times_out_to_fallback(scheduler):
+    async def hang():
+        await asyncio.sleep(1.0)
+
+    graph = StageGraph([
+        Stage("hung", lambda: None, timeout=0.05, fallback=lambda: "fallback", run_async=hang),
+        Stage("blocking", lambda: time.sleep(1.0), timeout=0.05, fallback=lambda: "pooled fallback"),
+    ])
+    assert asyncio.run(scheduler.run_async(graph, {})) == {"hung": "fallback", "blocking": "pooled fallback"}
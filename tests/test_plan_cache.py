@@ -0,0 +1,62 @@
+import time
+
+from plan_cache import PlanCache, plan_cache_key
+
+
+def test_key_ignores_interest_order_and_irrelevant_fields():
+    first = {"interests": ["food", "culture"], "budget": "Mid-range", "budget_value": 1500}
+    second = {"interests": ["culture", "food"], "budget": "Mid-range", "travel_companions": 2}
+    assert plan_cache_key(first) == plan_cache_key(second)
+
+
+def test_key_distinguishes_plan_relevant_fields():
+    base = {"interests": ["food"], "duration_days": 3}
+    assert plan_cache_key(base) != plan_cache_key({**base, "duration_days": 4})
+    assert plan_cache_key(base) != plan_cache_key({**base, "start_date": "2025-12-15"})
+
+
+def test_key_accepts_unhashable_and_mixed_values():
+    preferences = {
+        "interests": ["food", 3, None, {"kind": "music"}],
+        "departure_city": {"name": "Berlin", "country": "DE"},
+        "duration": [1, [2, 3]],
+    }
+    key = plan_cache_key(preferences)
+    hash(key)
+    reordered = {**preferences, "departure_city": {"country": "DE", "name": "Berlin"}}
+    assert plan_cache_key(reordered) == key
+
+
+def test_key_treats_a_single_interest_like_a_list():
+    assert plan_cache_key({"interests": "food"}) == plan_cache_key({"interests": ["food"]})
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PlanCache(max_entries=2, ttl_seconds=None, fingerprint=lambda: "v1")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = PlanCache(max_entries=4, ttl_seconds=0.05, fingerprint=lambda: "v1")
+    cache.put("a", 1)
+    assert "a" in cache
+    time.sleep(0.06)
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_fingerprint_change_clears_the_cache():
+    version = ["v1"]
+    cache = PlanCache(max_entries=4, ttl_seconds=None, revalidate_interval=0, fingerprint=lambda: version[0])
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    version[0] = "v2"
+    assert cache.get("a") is None
+    assert cache.invalidations == 1
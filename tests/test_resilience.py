@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+import gemini_client
+from gemini_client import GeminiClient, GeminiUnavailableError
+from gemini_stub import LatencyProfile, StubGenerativeModel
+from resilience import CircuitBreaker, LatencyTracker
+
+
+def tripped_breaker(cooldown: float = 0.05) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_ratio=0.5, cooldown_seconds=cooldown, window=4, min_calls=4)
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_breaker_opens_on_sustained_failures():
+    breaker = CircuitBreaker(failure_ratio=0.5, cooldown_seconds=60, window=4, min_calls=4)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.is_open()
+    assert breaker.trips == 1
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = tripped_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.is_open()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_restarts_the_cooldown():
+    breaker = tripped_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_released_probe_frees_the_half_open_slot():
+    breaker = tripped_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert not breaker.is_open()
+    assert breaker.allow()
+
+
+def test_abandoned_probe_is_replaced_after_a_cooldown():
+    breaker = tripped_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_latency_quantile_needs_enough_samples():
+    tracker = LatencyTracker()
+    for value in range(1, 11):
+        tracker.add(value / 10)
+    assert tracker.quantile(0.9, min_samples=20) is None
+    assert tracker.quantile(0.9, min_samples=10) == pytest.approx(0.9)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(gemini_client, "GEMINI_CACHE_PATH", "")
+    client = GeminiClient(backend="stub", model=StubGenerativeModel(latency=LatencyProfile("fixed:1")))
+    client.hedge_quantile = 0
+    client.breaker = tripped_breaker()
+    return client
+
+
+def test_open_breaker_rejects_without_calling_upstream(client):
+    client.breaker.cooldown_seconds = 60
+    assert not client.available()
+    with pytest.raises(GeminiUnavailableError):
+        client.generate_response("hello")
+    assert client.model.calls == 0
+
+
+def test_cancelled_async_probe_releases_the_breaker(client):
+    time.sleep(0.06)
+
+    async def probe():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.generate_response_async("hello"), 0.05)
+
+    asyncio.run(probe())
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.available()
+    assert client.breaker.allow()
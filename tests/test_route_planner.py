@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from itertools import permutations
+import random
+
+import pytest
+
+from agents.route_planner import RoutePlanner, trip_length, trip_route
+from data import MarketCatalog, TransportGraph, get_catalog
+
+
+def random_graph(size, seed):
+    rng = random.Random(seed)
+    cities = [f"C{index}" for index in range(size)]
+    connections = [
+        f"{a} → {b}: Train {rng.randint(10, 300)} min"
+        for index, a in enumerate(cities)
+        for b in cities[index + 1:]
+        if rng.random() < 0.6
+    ]
+    return TransportGraph(connections), cities
+
+
+def best_cost(planner, cities):
+    return min(planner.total_minutes(order) for order in permutations(cities))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_exact_order_is_optimal(seed):
+    graph, cities = random_graph(7, seed)
+    planner = RoutePlanner(graph)
+    order = planner.order(tuple(cities))
+    assert sorted(order) == sorted(cities)
+    assert planner.total_minutes(order) == best_cost(planner, cities)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_heuristic_order_visits_every_city_once(seed):
+    graph, cities = random_graph(12, seed)
+    planner = RoutePlanner(graph, exact_limit=4)
+    order = planner.order(tuple(cities))
+    assert sorted(order) == sorted(cities)
+
+
+def test_plan_drops_low_ranked_cities_and_spreads_days():
+    graph, cities = random_graph(6, seed=0)
+    plan = RoutePlanner(graph).plan(cities, 4)
+    assert sorted(plan.order) == sorted(cities[:4])
+    assert len(plan.days) == 4
+
+    plan = RoutePlanner(graph).plan(cities[:2], 5)
+    assert sorted(plan.days.count(city) for city in cities[:2]) == [2, 3]
+    # Spare days go to the top recommendation
+    assert plan.days.count(cities[0]) == 3
+
+
+def test_trip_length_is_clamped():
+    assert trip_length({}, ["A"]) == 3
+    assert trip_length({"duration_days": 30}, ["A"]) == 10
+    assert trip_length({}, ["A", "B", "C", "D"]) == 4
+
+
+@pytest.fixture(scope="module")
+def catalog() -> MarketCatalog:
+    return get_catalog()
+
+
+def test_trip_route_skips_markets_closed_for_the_whole_trip(catalog):
+    window = (date(2025, 11, 20), date(2025, 11, 22))
+    markets = list(catalog.cities[:6])
+    open_markets = catalog.availability.open_during(markets, *window)
+    preferences = {"start_date": "2025-11-20", "end_date": "2025-11-22", "duration_days": 3}
+    route = trip_route(catalog, preferences, markets)
+    assert set(route.order) <= set(open_markets or markets)
+
+
+def test_trip_route_picks_the_direction_with_fewer_closed_days(catalog):
+    markets = list(catalog.cities[:4])
+    for offset in range(0, 60, 3):
+        start = date(2025, 11, 10) + timedelta(days=offset)
+        preferences = {"start_date": start.isoformat(), "duration_days": 6}
+        route = trip_route(catalog, preferences, markets)
+
+        def closed(days):
+            return sum(
+                not catalog.availability.is_open(city, start + timedelta(days=index))
+                for index, city in enumerate(days)
+            )
+
+        assert closed(route.days) <= closed(route.days[::-1])
+        assert list(dict.fromkeys(route.days)) == list(route.order)
+
+
+def test_all_sections_cover_the_routed_cities():
+    from travel_agent import ChristmasMarketTravelAgent
+
+    agent = ChristmasMarketTravelAgent(plan_cache=None)
+    preferences = {"interests": ["food", "culture"], "start_date": "2026-11-20", "end_date": "2026-11-22"}
+    plan = agent.process_request(dict(preferences, duration_days=3))
+    itinerary = list(dict.fromkeys(day["city"] for day in plan["itinerary"]["days"]))
+    assert [tip["city"] for tip in plan["transport"]["local_tips"]] == itinerary
+    assert [stay["city"] for stay in plan["accommodations"]["stays"]] == itinerary
+    assert [insight["city"] for insight in plan["cultural_insights"]["cities"]] == itinerary
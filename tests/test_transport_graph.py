@@ -0,0 +1,75 @@
+import heapq
+import random
+
+import pytest
+
+from data import TransportGraph
+from data import transport_graph
+from data.transport_graph import format_duration, parse_duration
+
+
+def random_connections(size, seed=0):
+    rng = random.Random(seed)
+    connections = []
+    for index in range(1, size):
+        # A spanning chain plus random shortcuts keeps the graph connected
+        connections.append(f"C{index - 1} → C{index}: Train {rng.randint(20, 200)} min")
+        if rng.random() < 0.5:
+            other = rng.randrange(size)
+            if other != index:
+                connections.append(f"C{index} → C{other}: Bus {rng.randint(1, 5)}h{rng.randint(0, 59):02d}")
+    return connections
+
+
+def dijkstra(graph, origin):
+    adjacency = {}
+    for (a, b), (minutes, _) in graph._edges.items():
+        adjacency.setdefault(graph.cities[a], []).append((graph.cities[b], minutes))
+    distances = {origin: 0}
+    heap = [(0, origin)]
+    while heap:
+        distance, city = heapq.heappop(heap)
+        if distance > distances[city]:
+            continue
+        for neighbour, minutes in adjacency.get(city, ()):
+            if distance + minutes < distances.get(neighbour, float("inf")):
+                distances[neighbour] = distance + minutes
+                heapq.heappush(heap, (distance + minutes, neighbour))
+    return distances
+
+
+@pytest.mark.parametrize("all_pairs_limit", [512, 10])
+def test_shortest_routes_match_dijkstra(monkeypatch, all_pairs_limit):
+    # The small limit forces the landmark A* path used for large components
+    monkeypatch.setattr(transport_graph, "ALL_PAIRS_LIMIT", all_pairs_limit)
+    graph = TransportGraph(random_connections(80))
+    rng = random.Random(1)
+    for _ in range(60):
+        origin, destination = rng.sample(graph.cities, 2)
+        expected = dijkstra(graph, origin)[destination]
+        assert graph.minutes(origin, destination) == expected
+        route = graph.route(origin, destination)
+        assert route.path[0] == origin and route.path[-1] == destination
+        assert route.minutes == expected == sum(leg.minutes for leg in route.legs)
+
+
+def test_disconnected_cities_have_no_route():
+    graph = TransportGraph(["A → B: Train 1h", "C → D: Train 2h"])
+    assert graph.minutes("A", "C") is None
+    assert graph.route("A", "D") is None
+    assert graph.describe("A", "Nowhere") is None
+
+
+def test_describe_direct_and_multi_leg_routes():
+    graph = TransportGraph(["Munich → Salzburg: Railjet 1h30", "Salzburg → Vienna: Railjet 2h30"])
+    assert graph.describe("Munich", "Salzburg") == "Munich → Salzburg: Railjet 1h30"
+    assert graph.describe("Munich", "Vienna") == (
+        "Munich → Vienna via Salzburg: Railjet 1h30 to Salzburg + Railjet 2h30 to Vienna (about 4h in total)"
+    )
+
+
+def test_duration_parsing_round_trips():
+    assert parse_duration("ICE 1h05 hourly") == 65
+    assert parse_duration("Tram 35 min") == 35
+    assert parse_duration("Night bus") is None
+    assert [format_duration(minutes) for minutes in (35, 60, 65)] == ["35 min", "1h", "1h05"]
@@ -8,19 +8,53 @@ from agents import (
     AccommodationAgent,
     CulturalAgent
 )
+from agents.route_planner import trip_route
+from coalescing import SingleFlight
+from combined_prompt import COMBINED_SECTIONS, build_combined_prompt, parse_sections
+from config import (
+    CHRISTMAS_MARKETS,
+    GEMINI_BACKEND,
+    GEMINI_PLAN_MODE,
+    GEMINI_TIMEOUT_SECONDS,
+    PLAN_CACHE_SIZE,
+    PLAN_COALESCE_REQUESTS,
+    PLAN_CACHE_TTL_SECONDS,
+    STAGE_TIMEOUT_SECONDS,
+)
+from data import MarketCatalog, MarketNameMatcher, get_catalog
 from gemini_client import GeminiClient
+from metrics import BATCH_PLANS, COALESCED_REQUESTS, FALLBACKS, PLAN_LATENCY, REGISTRY, cache_families
+from pipeline import Stage, StageGraph, StageScheduler
+from plan_cache import PlanCache, plan_cache_key
+from plan_format import REDUNDANT_FIELDS, SECTION_TEXT_FIELDS
+from typing import Any, Dict, Iterator, List, Tuple
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Stage results that become sections of the finished plan, in display order
+PLAN_SECTIONS = (
+    "market_recommendations",
+    "itinerary",
+    "transport",
+    "accommodations",
+    "cultural_insights",
+)
+
 
 class ChristmasMarketTravelAgent:
     """Main travel agent that coordinates all specialized agents."""
     
-    def __init__(self, api_key: str = None):
-        """Initialize the travel agent with all sub-agents."""
+    def __init__(self, api_key: str = None, plan_cache: PlanCache = None, catalog: MarketCatalog = None):
+        """Initialize the travel agent with all sub-agents.
+        
+        ``catalog`` defaults to the shared catalog compiled from
+        ``MARKET_PROFILES``; benchmarks pass synthetic ones.
+        """
         self.gemini_client = None
-        if api_key:
+        if api_key or GEMINI_BACKEND == "stub":
             try:
                 self.gemini_client = GeminiClient(api_key)
                 logger.info("Gemini client initialized successfully")
@@ -32,12 +66,35 @@ class ChristmasMarketTravelAgent:
         else:
             logger.info("No Gemini API key supplied. Using curated market data.")
         
+        # All agents read the same compiled, read-only market catalog
+        self.catalog = catalog or get_catalog()
+        
         # Initialize all agents (they gracefully fall back if gemini_client is None)
-        self.market_agent = MarketRecommendationAgent(self.gemini_client)
-        self.itinerary_agent = ItineraryAgent(self.gemini_client)
-        self.transport_agent = TransportAgent(self.gemini_client)
-        self.accommodation_agent = AccommodationAgent(self.gemini_client)
-        self.cultural_agent = CulturalAgent(self.gemini_client)
+        self.market_agent = MarketRecommendationAgent(self.gemini_client, self.catalog)
+        self.itinerary_agent = ItineraryAgent(self.gemini_client, self.catalog)
+        self.transport_agent = TransportAgent(self.gemini_client, self.catalog)
+        self.accommodation_agent = AccommodationAgent(self.gemini_client, self.catalog)
+        self.cultural_agent = CulturalAgent(self.gemini_client, self.catalog)
+        
+        # Only needed when a stage hands back free text (e.g. a Gemini answer)
+        self.market_matcher = MarketNameMatcher(
+            list(self.catalog.cities)
+            + [city for cities in CHRISTMAS_MARKETS.values() for city in cities]
+        )
+        
+        # Transport, accommodation and cultural stages only need the selected
+        # markets, so they run concurrently once market selection completes.
+        self.stage_graph = self._build_stage_graph()
+        self.scheduler = StageScheduler(default_timeout=STAGE_TIMEOUT_SECONDS)
+        
+        if plan_cache is None and PLAN_CACHE_SIZE > 0:
+            # Plans are built from this catalog snapshot, not the live profiles
+            plan_cache = PlanCache(
+                PLAN_CACHE_SIZE, PLAN_CACHE_TTL_SECONDS, fingerprint=lambda: self.catalog.fingerprint
+            )
+        self.plan_cache = plan_cache
+        self.in_flight = SingleFlight() if PLAN_COALESCE_REQUESTS else None
+        REGISTRY.register_collector("travel_agent_caches", self._cache_metrics)
         
         logger.info("Christmas Market Travel Agent initialized")
     
@@ -59,65 +116,99 @@ class ChristmasMarketTravelAgent:
         Returns:
             Complete travel plan dictionary
         """
+        start = time.perf_counter()
         try:
             logger.info("Processing travel request...")
+
+            cache_key, cached = self._lookup_plan(user_preferences)
+            if cached is not None:
+                PLAN_LATENCY.observe(time.perf_counter() - start, cache="hit")
+                return cached
+
+            if self.in_flight is None:
+                travel_plan, _ = self._build_plan(cache_key, user_preferences)
+                shared = False
+            else:
+                # Identical requests arriving together wait for the first one
+                (travel_plan, recommended_markets), shared = self.in_flight.do(
+                    cache_key or plan_cache_key(user_preferences),
+                    lambda: self._build_plan(cache_key, user_preferences),
+                )
+                if shared:
+                    COALESCED_REQUESTS.inc()
+                    user_preferences["recommended_markets"] = list(recommended_markets)
+                    travel_plan = self._rebind_plan(travel_plan, user_preferences)
             
-            # Step 1: Get market recommendations
-            logger.info("Getting market recommendations...")
-            market_recommendations = self.market_agent.recommend_markets(user_preferences)
-            
-            # Extract recommended markets from response
-            recommended_markets = self._extract_markets_from_response(
-                market_recommendations.get("recommendations", "")
-            )
-            
-            if not recommended_markets:
-                # Fallback to default markets
-                recommended_markets = ["Nuremberg", "Munich", "Vienna"]
-            
-            user_preferences["recommended_markets"] = recommended_markets
-            
-            # Step 2: Create itinerary
-            logger.info("Creating itinerary...")
-            itinerary = self.itinerary_agent.create_itinerary(
-                user_preferences,
-                recommended_markets
-            )
-            
-            # Step 3: Get transport options
-            logger.info("Getting transport options...")
-            transport = self.transport_agent.get_transport_options(
-                itinerary,
-                user_preferences
-            )
-            
-            # Step 4: Get accommodation recommendations
-            logger.info("Getting accommodation recommendations...")
-            accommodations = self.accommodation_agent.get_accommodation_recommendations(
-                itinerary,
-                user_preferences
+            PLAN_LATENCY.observe(
+                time.perf_counter() - start,
+                cache="coalesced" if shared else "miss",
             )
+            logger.info("Travel request processed successfully")
+            return travel_plan
             
-            # Step 5: Get cultural insights
-            logger.info("Getting cultural insights...")
-            cultural_info = self.cultural_agent.get_cultural_insights(
-                recommended_markets,
-                user_preferences
+        except Exception as e:
+            logger.error(f"Error processing travel request: {str(e)}")
+            raise
+    
+    def stream_request(self, user_preferences: dict) -> Iterator[Tuple[str, Any]]:
+        """
+        Streaming counterpart of :meth:`process_request`.
+        
+        Yields ``(section, result)`` for each of ``PLAN_SECTIONS`` as soon as its
+        stage finishes, then ``("summary", text)`` once the plan is complete.
+        """
+        start = time.perf_counter()
+        logger.info("Processing travel request (streaming)...")
+
+        cache_key, cached = self._lookup_plan(user_preferences)
+        if cached is not None:
+            for section in PLAN_SECTIONS:
+                yield section, cached[section]
+            PLAN_LATENCY.observe(time.perf_counter() - start, cache="hit")
+            yield "summary", cached["summary"]
+            return
+
+        results = {}
+        for name, value in self.scheduler.iter_run(
+            self.stage_graph,
+            {"preferences": user_preferences},
+        ):
+            results[name] = value
+            if name in PLAN_SECTIONS:
+                yield name, value
+
+        travel_plan = self._compile_plan(results, user_preferences)
+        self._store_plan(cache_key, travel_plan, results)
+
+        PLAN_LATENCY.observe(time.perf_counter() - start, cache="miss")
+        logger.info("Travel request processed successfully")
+        yield "summary", travel_plan["summary"]
+    
+    async def process_request_async(self, user_preferences: dict) -> dict:
+        """
+        Async counterpart of :meth:`process_request` for ASGI servers.
+        
+        Runs the same stage graph from the caller's event loop: Gemini calls
+        are awaited on the loop and curated stages run in the shared stage
+        pool, so many plans can be in flight at once without blocking it.
+        """
+        start = time.perf_counter()
+        try:
+            logger.info("Processing travel request (async)...")
+
+            cache_key, cached = self._lookup_plan(user_preferences)
+            if cached is not None:
+                PLAN_LATENCY.observe(time.perf_counter() - start, cache="hit")
+                return cached
+
+            results = await self.scheduler.run_async(
+                self.stage_graph,
+                {"preferences": user_preferences},
             )
+            travel_plan = self._compile_plan(results, user_preferences)
+            self._store_plan(cache_key, travel_plan, results)
             
-            # Compile complete travel plan
-            travel_plan = {
-                "market_recommendations": market_recommendations,
-                "itinerary": itinerary,
-                "transport": transport,
-                "accommodations": accommodations,
-                "cultural_insights": cultural_info,
-                "summary": self._generate_summary(
-                    recommended_markets,
-                    user_preferences
-                )
-            }
-            
+            PLAN_LATENCY.observe(time.perf_counter() - start, cache="miss")
             logger.info("Travel request processed successfully")
             return travel_plan
             
@@ -125,22 +216,380 @@ class ChristmasMarketTravelAgent:
             logger.error(f"Error processing travel request: {str(e)}")
             raise
     
-    def _extract_markets_from_response(self, response: str) -> list:
-        """Extract market names from the AI response."""
-        # Simple extraction - can be enhanced with NLP
-        markets = []
-        common_markets = [
-            "Nuremberg", "Munich", "Dresden", "Cologne", "Frankfurt", "Berlin",
-            "Vienna", "Salzburg", "Innsbruck", "Strasbourg", "Colmar", "Paris",
-            "Prague", "Zurich", "Brussels", "Bruges"
+    def process_batch(self, preferences_batch: List[dict]) -> List[dict]:
+        """
+        Plan many requests at once; plans are returned in input order.
+        
+        Identical preference sets are planned once, all uncached ones are
+        scored in a single matrix pass, and the curated stages run in the
+        calling thread, where per-city fragments rendered for one plan are
+        reused by the next. With combined Gemini generation the unique plans
+        go through :meth:`process_request_async` concurrently on a private
+        event loop, so the batch costs about one Gemini round trip rather
+        than one per plan; call it from a thread without a running loop.
+        """
+        start = time.perf_counter()
+        groups: Dict[Any, List[int]] = {}
+        for index, preferences in enumerate(preferences_batch):
+            groups.setdefault(plan_cache_key(preferences), []).append(index)
+        
+        plans: List[dict] = [None] * len(preferences_batch)
+        pending: List[Tuple[Any, List[int]]] = []
+        for cache_key, indices in groups.items():
+            first = indices[0]
+            cached = self._cached_plan(cache_key, preferences_batch[first])
+            if cached is None:
+                pending.append((cache_key, indices))
+            else:
+                plans[first] = cached
+                BATCH_PLANS.inc(source="hit")
+        
+        if pending:
+            firsts = [preferences_batch[indices[0]] for _, indices in pending]
+            if GEMINI_PLAN_MODE == "combined" and self.gemini_client is not None:
+                built = asyncio.run(self._process_many_async(firsts))
+            else:
+                built = []
+                recommendations = self.market_agent.recommend_markets_batch(firsts)
+                for (cache_key, _), preferences, market_recommendations in zip(pending, firsts, recommendations):
+                    results = self._run_stages_inline(preferences, market_recommendations)
+                    travel_plan = self._compile_plan(results, preferences)
+                    self._store_plan(cache_key, travel_plan, results)
+                    built.append(travel_plan)
+            for (_, indices), travel_plan in zip(pending, built):
+                plans[indices[0]] = travel_plan
+            BATCH_PLANS.inc(len(pending), source="miss")
+        
+        for indices in groups.values():
+            first = indices[0]
+            markets = preferences_batch[first]["recommended_markets"]
+            for index in indices[1:]:
+                preferences_batch[index]["recommended_markets"] = list(markets)
+                plans[index] = self._rebind_plan(plans[first], preferences_batch[index])
+        BATCH_PLANS.inc(len(preferences_batch) - len(groups), source="duplicate")
+        
+        logger.info(
+            "Planned a batch of %d requests (%d unique, %d built) in %.1f ms",
+            len(preferences_batch), len(groups), len(pending), (time.perf_counter() - start) * 1000,
+        )
+        return plans
+    
+    async def _process_many_async(self, preferences_batch: List[dict]) -> List[dict]:
+        return list(await asyncio.gather(
+            *(self.process_request_async(preferences) for preferences in preferences_batch)
+        ))
+    
+    def has_cached_plan(self, user_preferences: dict) -> bool:
+        """Whether :meth:`process_request` would answer from the plan cache."""
+        return self.plan_cache is not None and plan_cache_key(user_preferences) in self.plan_cache
+    
+    def warm_up(self, user_preferences: dict):
+        """
+        Run every curated stage once in the calling thread.
+        
+        Builds the catalog's lazy indexes and fills the route and connection
+        lookup caches without calling Gemini or starting pool threads, so it
+        is safe in a server's master process before workers are forked.
+        """
+        start = time.perf_counter()
+        self._run_stages_inline(dict(user_preferences))
+        logger.info("Travel agent warmed up in %.1f ms", (time.perf_counter() - start) * 1000)
+    
+    def _run_stages_inline(self, preferences: dict, market_recommendations: dict = None) -> dict:
+        """Run the curated stages in the calling thread; returns results by stage name."""
+        if market_recommendations is None:
+            market_recommendations = self._recommend_markets(preferences)
+        markets = self._select_markets(market_recommendations, preferences)
+        return {
+            "market_recommendations": market_recommendations,
+            "recommended_markets": markets,
+            "itinerary": self._create_itinerary(preferences, markets),
+            "transport": self._get_transport(preferences, markets),
+            "accommodations": self._get_accommodations(preferences, markets),
+            "cultural_insights": self._get_cultural_insights(preferences, markets),
+        }
+    
+    def _build_plan(self, cache_key, user_preferences: dict):
+        """Run the stage graph; return ``(plan, recommended markets)``."""
+        results = self.scheduler.run(
+            self.stage_graph,
+            {"preferences": user_preferences},
+        )
+        travel_plan = self._compile_plan(results, user_preferences)
+        self._store_plan(cache_key, travel_plan, results)
+        return travel_plan, tuple(results["recommended_markets"])
+    
+    def _cache_metrics(self):
+        """Hit/miss counts of the plan, Gemini response and route lookup caches."""
+        caches = {}
+        if self.plan_cache is not None:
+            stats = self.plan_cache.stats()
+            caches["plan"] = (stats["hits"], stats["misses"])
+        response_cache = getattr(self.gemini_client, "response_cache", None)
+        if response_cache is not None:
+            caches["gemini_response"] = (response_cache.hits, response_cache.misses)
+        for name, cached in (
+            ("route_order", self.itinerary_agent.route_planner.order),
+            ("connection_text", self.catalog.transport_graph.describe),
+        ):
+            info = cached.cache_info()
+            caches[name] = (info.hits, info.misses)
+        return cache_families(caches)
+    
+    def _lookup_plan(self, user_preferences: dict):
+        """Return ``(cache_key, plan)``; the plan is ``None`` on a cache miss."""
+        if self.plan_cache is None:
+            return None, None
+
+        cache_key = plan_cache_key(user_preferences)
+        return cache_key, self._cached_plan(cache_key, user_preferences)
+    
+    def _cached_plan(self, cache_key, user_preferences: dict):
+        if self.plan_cache is None:
+            return None
+        entry = self.plan_cache.get(cache_key)
+        if entry is None:
+            return None
+
+        logger.info("Serving travel plan from cache")
+        travel_plan, recommended_markets = entry
+        user_preferences["recommended_markets"] = list(recommended_markets)
+        return self._rebind_plan(travel_plan, user_preferences)
+    
+    def _store_plan(self, cache_key, travel_plan: dict, results: dict):
+        if cache_key is not None and self.plan_cache is not None:
+            self.plan_cache.put(
+                cache_key,
+                (travel_plan, tuple(results["recommended_markets"])),
+            )
+    
+    @staticmethod
+    def _rebind_plan(travel_plan: dict, user_preferences: dict) -> dict:
+        """Copy a cached plan, pointing its echoed preferences at this request."""
+        rebound = {}
+        for section, value in travel_plan.items():
+            if isinstance(value, dict):
+                value = dict(value)
+                for field in ("preferences", "user_preferences"):
+                    if field in value:
+                        value[field] = user_preferences
+            rebound[section] = value
+        return rebound
+    
+    def _compile_plan(self, results: dict, user_preferences: dict) -> dict:
+        """Compile complete travel plan from the stage results."""
+        return {
+            "market_recommendations": results["market_recommendations"],
+            "itinerary": results["itinerary"],
+            "transport": results["transport"],
+            "accommodations": results["accommodations"],
+            "cultural_insights": results["cultural_insights"],
+            "summary": self._generate_summary(
+                results["recommended_markets"],
+                user_preferences
+            )
+        }
+    
+    def _build_stage_graph(self) -> StageGraph:
+        """Declare each agent as a stage together with the inputs it needs."""
+        stages = [
+            Stage(
+                "market_recommendations",
+                self._recommend_markets,
+                inputs=("preferences",),
+                fallback=self._fallback_recommendations,
+            ),
+            Stage(
+                "recommended_markets",
+                self._select_markets,
+                inputs=("market_recommendations", "preferences"),
+            ),
+            Stage(
+                "itinerary",
+                self._create_itinerary,
+                inputs=("preferences", "recommended_markets"),
+                fallback=self._fallback_itinerary,
+            ),
+            Stage(
+                "transport",
+                self._get_transport,
+                inputs=("preferences", "recommended_markets"),
+                fallback=self._fallback_transport,
+            ),
+            Stage(
+                "accommodations",
+                self._get_accommodations,
+                inputs=("preferences", "recommended_markets"),
+                fallback=self._fallback_accommodations,
+            ),
+            Stage(
+                "cultural_insights",
+                self._get_cultural_insights,
+                inputs=("preferences", "recommended_markets"),
+                fallback=self._fallback_cultural_insights,
+            ),
         ]
         
-        response_lower = response.lower()
-        for market in common_markets:
-            if market.lower() in response_lower:
-                markets.append(market)
+        if GEMINI_PLAN_MODE == "combined" and self.gemini_client is not None:
+            # One Gemini call writes all downstream sections; each section
+            # stage overlays its part on the curated result it computed.
+            stages = [
+                self._with_generated_text(stage) if stage.name in COMBINED_SECTIONS else stage
+                for stage in stages
+            ]
+            stages.append(
+                Stage(
+                    "generated_sections",
+                    self._generate_sections,
+                    inputs=("preferences", "recommended_markets"),
+                    run_async=self._generate_sections_async,
+                    # Leave room for one hedged attempt inside the client deadline
+                    timeout=GEMINI_TIMEOUT_SECONDS + 5,
+                    fallback=lambda preferences, recommended_markets: {},
+                )
+            )
+        return StageGraph(stages)
+    
+    def _with_generated_text(self, stage: Stage) -> Stage:
+        """Make ``stage`` wait for the combined Gemini answer and use its text."""
+        def run(preferences, recommended_markets, generated_sections):
+            result = stage.run(preferences=preferences, recommended_markets=recommended_markets)
+            return self._apply_generated(stage.name, result, generated_sections)
+        
+        run_async = None
+        if stage.run_async is not None:
+            async def run_async(preferences, recommended_markets, generated_sections):
+                result = await stage.run_async(preferences=preferences, recommended_markets=recommended_markets)
+                return self._apply_generated(stage.name, result, generated_sections)
+        
+        def fallback(preferences, recommended_markets, generated_sections):
+            result = stage.fallback(preferences=preferences, recommended_markets=recommended_markets)
+            return self._apply_generated(stage.name, result, generated_sections)
         
-        return markets[:5]  # Return top 5
+        return Stage(
+            stage.name,
+            run,
+            inputs=stage.inputs + ("generated_sections",),
+            timeout=stage.timeout,
+            fallback=fallback,
+            run_async=run_async,
+        )
+    
+    def _combined_prompt(self, preferences: dict, recommended_markets: list) -> str:
+        # Name the cities in the order the curated sections visit them
+        route = trip_route(self.catalog, preferences, recommended_markets)
+        return build_combined_prompt(preferences, route.order, self.catalog)
+    
+    @staticmethod
+    def _apply_generated(section: str, result: dict, generated_sections: dict) -> dict:
+        """Swap in the generated text; the structured fields move under ``curated``.
+
+        They describe the curated plan, which the generated text need not
+        match, so they are kept apart from it.
+        """
+        text = generated_sections.get(section)
+        if text is None:
+            if generated_sections:
+                # The call succeeded but this part was missing or unparsable
+                FALLBACKS.inc(stage=section, reason="generated_section_missing")
+            return result
+        text_field = SECTION_TEXT_FIELDS[section]
+        generated = {text_field: text, "raw_response": text, "source": "gemini", "curated": {}}
+        for key, value in result.items():
+            if key in REDUNDANT_FIELDS:
+                generated.setdefault(key, value)
+            elif key != text_field:
+                generated["curated"][key] = value
+        return generated
+    
+    # ------------------------------------------------------------------ stages
+    def _recommend_markets(self, preferences: dict) -> dict:
+        logger.info("Getting market recommendations...")
+        return self.market_agent.recommend_markets(preferences)
+    
+    def _select_markets(self, market_recommendations: dict, preferences: dict) -> list:
+        recommended_markets = list(market_recommendations.get("markets", [])[:5])
+        if not recommended_markets:
+            # Free-text answers carry no ranking, so recover it from the text
+            recommended_markets = self._extract_markets_from_response(
+                market_recommendations.get("recommendations", "")
+            )
+        
+        if not recommended_markets:
+            # Fallback to default markets
+            recommended_markets = ["Nuremberg", "Munich", "Vienna"]
+        
+        preferences["recommended_markets"] = recommended_markets
+        return recommended_markets
+    
+    def _create_itinerary(self, preferences: dict, recommended_markets: list) -> dict:
+        logger.info("Creating itinerary...")
+        return self.itinerary_agent.create_itinerary(preferences, recommended_markets)
+    
+    def _get_transport(self, preferences: dict, recommended_markets: list) -> dict:
+        # The transport agent only reads the markets stored on the preferences.
+        logger.info("Getting transport options...")
+        return self.transport_agent.get_transport_options({}, preferences)
+    
+    def _get_accommodations(self, preferences: dict, recommended_markets: list) -> dict:
+        logger.info("Getting accommodation recommendations...")
+        return self.accommodation_agent.get_accommodation_recommendations({}, preferences)
+    
+    def _get_cultural_insights(self, preferences: dict, recommended_markets: list) -> dict:
+        logger.info("Getting cultural insights...")
+        return self.cultural_agent.get_cultural_insights(recommended_markets, preferences)
+    
+    def _generate_sections(self, preferences: dict, recommended_markets: list) -> dict:
+        """Ask Gemini for every combined section at once; ``{}`` means all curated."""
+        if not self.gemini_client.available():
+            return {}
+        logger.info("Generating plan sections with one Gemini call...")
+        prompt = self._combined_prompt(preferences, recommended_markets)
+        try:
+            response = self.gemini_client.generate_response(prompt, temperature=0.6)
+        except Exception as exc:
+            logger.warning("Combined generation failed (%s); using curated sections", exc)
+            return {}
+        return self._parse_generated(response)
+    
+    async def _generate_sections_async(self, preferences: dict, recommended_markets: list) -> dict:
+        """Async counterpart of :meth:`_generate_sections` for :meth:`process_request_async`."""
+        if not self.gemini_client.available():
+            return {}
+        logger.info("Generating plan sections with one Gemini call (async)...")
+        prompt = self._combined_prompt(preferences, recommended_markets)
+        try:
+            response = await self.gemini_client.generate_response_async(prompt, temperature=0.6)
+        except Exception as exc:
+            logger.warning("Combined generation failed (%s); using curated sections", exc)
+            return {}
+        return self._parse_generated(response)
+    
+    @staticmethod
+    def _parse_generated(response: str) -> dict:
+        sections = parse_sections(response)
+        if not sections:
+            logger.warning("Combined generation returned no usable sections")
+        return sections
+    
+    def _fallback_recommendations(self, preferences: dict) -> dict:
+        return self.market_agent._get_fallback_recommendations(preferences)
+    
+    def _fallback_itinerary(self, preferences: dict, recommended_markets: list) -> dict:
+        return self.itinerary_agent._get_fallback_itinerary(preferences, recommended_markets)
+    
+    def _fallback_transport(self, preferences: dict, recommended_markets: list) -> dict:
+        return self.transport_agent._get_fallback_transport(preferences)
+    
+    def _fallback_accommodations(self, preferences: dict, recommended_markets: list) -> dict:
+        return self.accommodation_agent._get_fallback_accommodations(preferences)
+    
+    def _fallback_cultural_insights(self, preferences: dict, recommended_markets: list) -> dict:
+        return self.cultural_agent._get_fallback_cultural_info(recommended_markets)
+    
+    def _extract_markets_from_response(self, response: str) -> list:
+        """Extract market names from free-text AI responses in a single pass."""
+        return self.market_matcher.find_all(response)[:5]  # Return top 5
     
     def _generate_summary(self, markets: list, preferences: dict) -> str:
         """Generate a summary of the travel plan."""